@@ -1,6 +1,17 @@
 # Copyright (c) 2020 XLAB Steampunk
 
-from sensu_go.clients.root import Client
+from sensu_go.clients.http.deadline import deadline
+from sensu_go.clients.root import AsyncClient, Client
 from sensu_go.clients.resource.operator import And, Equal, In, Matches, NotEqual, NotIn
 
-__all__ = ["And", "Client", "Equal", "In", "Matches", "NotEqual", "NotIn"]
+__all__ = [
+    "And",
+    "AsyncClient",
+    "Client",
+    "Equal",
+    "In",
+    "Matches",
+    "NotEqual",
+    "NotIn",
+    "deadline",
+]
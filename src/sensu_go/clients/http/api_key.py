@@ -1,22 +1,41 @@
 # Copyright (c) 2021 XLAB Steampunk
 
-from typing import Optional
+from typing import Any, Optional
 
-from sensu_go.clients.http.base import HTTPClient
+from sensu_go.clients.http.base import AsyncHTTPClient, HTTPClient
+from sensu_go.typing import Address
 
 
 class ApiKeyClient(HTTPClient):
     def __init__(
         self,
-        address: str,
+        address: Address,
         api_key: str,
         verify: bool = True,
         ca_path: Optional[str] = None,
+        **kwargs: Any,
     ) -> None:
-        super().__init__(address, verify, ca_path)
+        super().__init__(address, verify, ca_path, **kwargs)
 
         self._auth_header_value = "Key " + api_key
 
     @property
     def auth_header_value(self) -> str:
         return self._auth_header_value
+
+
+class AsyncApiKeyClient(AsyncHTTPClient):
+    def __init__(
+        self,
+        address: str,
+        api_key: str,
+        verify: bool = True,
+        ca_path: Optional[str] = None,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(address, verify, ca_path, **kwargs)
+
+        self._auth_header_value = "Key " + api_key
+
+    async def auth_header_value(self) -> str:
+        return self._auth_header_value
@@ -0,0 +1,196 @@
+# Copyright (c) 2021 XLAB Steampunk
+
+import random
+import threading
+import time
+from typing import Collection, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+
+from sensu_go.typing import JSON
+
+LEAST_OUTSTANDING = "least_outstanding"
+EWMA = "ewma"
+STRATEGIES = (LEAST_OUTSTANDING, EWMA)
+
+# Statuses that indicate a problem with the backend itself rather than with our
+# request.
+UNHEALTHY_STATUSES = frozenset((502, 503, 504))
+
+
+class Member:
+    def __init__(self, address: str) -> None:
+        self.address = address.rstrip("/")
+        self.outstanding = 0
+        self.ewma: Optional[float] = None  # Seconds
+        self.failures = 0  # Consecutive ones
+        self.ejected_until: Optional[float] = None
+        self.ejections = 0
+        self.probing = False
+
+    @property
+    def ejected(self) -> bool:
+        return self.ejected_until is not None
+
+    def __repr__(self) -> str:
+        return "Member({})".format(self.address)
+
+
+class Balancer:
+    # Spreads requests across cluster members. The least_outstanding strategy
+    # picks the member with the fewest requests in flight, and the ewma strategy
+    # the one with the lowest exponentially weighted moving average of latency
+    # (multiplied by the number of requests in flight, so that a member that was
+    # fast a while ago does not get flooded).
+    #
+    # Members that fail max_failures times in a row are ejected for
+    # ejection_time seconds (doubling with each consecutive ejection up to
+    # max_ejection_time). Once that time passes, the client probes the member's
+    # /health endpoint before it sends it any more requests.
+    def __init__(
+        self,
+        strategy: str = LEAST_OUTSTANDING,
+        max_failures: int = 2,
+        ejection_time: float = 30.0,
+        max_ejection_time: float = 300.0,
+        ewma_alpha: float = 0.3,
+        probe_timeout: float = 2.0,
+    ) -> None:
+        if strategy not in STRATEGIES:
+            raise ValueError(
+                "Invalid strategy {}. Use one of {}.".format(
+                    strategy, ", ".join(STRATEGIES)
+                )
+            )
+
+        self.strategy = strategy
+        self.max_failures = max_failures
+        self.ejection_time = ejection_time
+        self.max_ejection_time = max_ejection_time
+        self.ewma_alpha = ewma_alpha
+        self.probe_timeout = probe_timeout
+
+        self._lock = threading.Lock()
+        self._members: Dict[str, Member] = {}
+
+    @property
+    def members(self) -> List[Member]:
+        with self._lock:
+            return list(self._members.values())
+
+    def set_members(self, addresses: Sequence[str]) -> None:
+        # Members that remain in the cluster keep their statistics.
+        with self._lock:
+            members = {}
+            for address in addresses:
+                address = address.rstrip("/")
+                members[address] = self._members.get(address) or Member(address)
+            self._members = members
+
+    def due_for_probe(self) -> List[Member]:
+        # Returns ejected members that served their time. Each one is returned
+        # only once, which means that concurrent callers do not probe the same
+        # member twice.
+        now = time.monotonic()
+        with self._lock:
+            due = [
+                m
+                for m in self._members.values()
+                if m.ejected_until is not None
+                and m.ejected_until <= now
+                and not m.probing
+            ]
+            for member in due:
+                member.probing = True
+            return due
+
+    def probed(self, member: Member, healthy: bool) -> None:
+        with self._lock:
+            member.probing = False
+            if healthy:
+                member.ejected_until = None
+                member.ejections = 0
+                member.failures = 0
+            else:
+                self._eject(member)
+
+    def acquire(self, exclude: Collection[str] = ()) -> Member:
+        with self._lock:
+            candidates = [m for m in self._members.values() if not m.ejected]
+            preferred = [m for m in candidates if m.address not in exclude]
+            if preferred:
+                candidates = preferred
+            if not candidates:
+                # Everyone is ejected. Rather than failing outright, we try the
+                # member that should come back first.
+                candidates = [
+                    min(
+                        self._members.values(),
+                        key=lambda m: m.ejected_until or 0.0,
+                    )
+                ]
+
+            member = self._choose(candidates)
+            member.outstanding += 1
+            return member
+
+    def _cost(self, member: Member) -> Tuple[float, int]:
+        if self.strategy == EWMA:
+            # Members without samples get tried first.
+            latency = (member.ewma or 0.0) * (member.outstanding + 1)
+            return latency, member.outstanding
+        return member.outstanding, 0
+
+    def _choose(self, candidates: List[Member]) -> Member:
+        lowest = min(self._cost(m) for m in candidates)
+        # Random tie-breaking spreads idle traffic across all members.
+        return random.choice([m for m in candidates if self._cost(m) == lowest])
+
+    def can_fail_over(self, tried: Collection[str]) -> bool:
+        with self._lock:
+            return any(
+                not m.ejected and m.address not in tried for m in self._members.values()
+            )
+
+    def release(self, member: Member, elapsed: float, failed: bool) -> None:
+        with self._lock:
+            member.outstanding -= 1
+            if failed:
+                member.failures += 1
+                if member.failures >= self.max_failures and not member.ejected:
+                    self._eject(member)
+                return
+
+            member.failures = 0
+            if member.ewma is None:
+                member.ewma = elapsed
+            else:
+                member.ewma += self.ewma_alpha * (elapsed - member.ewma)
+
+    def _eject(self, member: Member) -> None:
+        member.ejected_until = time.monotonic() + min(
+            self.ejection_time * pow(2.0, member.ejections), self.max_ejection_time
+        )
+        member.ejections += 1
+
+
+def member_addresses(seed: str, data: JSON) -> List[str]:
+    # Cluster members API returns etcd client URLs. Backends listen for API
+    # requests on the same hosts, but on a different port, which we take from
+    # the seed address together with the scheme.
+    seed_url = urlsplit(seed)
+    addresses = []
+    members = data.get("members") if isinstance(data, dict) else None
+    for member in members if isinstance(members, list) else []:
+        urls = member.get("clientURLs") if isinstance(member, dict) else None
+        for url in urls if isinstance(urls, list) else []:
+            host = urlsplit(str(url)).hostname
+            if not host:
+                continue
+            if ":" in host:  # IPv6
+                host = "[{}]".format(host)
+            address = "{}://{}".format(seed_url.scheme, host)
+            if seed_url.port:
+                address += ":{}".format(seed_url.port)
+            if address not in addresses:
+                addresses.append(address)
+    return addresses
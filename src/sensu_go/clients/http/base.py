@@ -1,97 +1,787 @@
 # Copyright (c) 2020 XLAB Steampunk
 
 import abc
-import json
-from typing import cast, Dict, Optional, Tuple
+from concurrent import futures
+import contextvars
+import threading
+import time
+from typing import (
+    cast,
+    Any,
+    ContextManager,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
 
-import requests
+try:
+    import httpx
 
-from sensu_go.errors import HTTPError, ResponseError
-from sensu_go.typing import JSON
+    HAS_HTTPX = True
+except ImportError:
+    HAS_HTTPX = False
 
+import requests
 
-class Response:
-    def __init__(self, response: requests.Response) -> None:
-        self.url = response.url
-        self.status = response.status_code
-        self.text = response.text
-        self.headers = dict(response.headers.lower_items())
+from sensu_go.clients.http import deadline
+from sensu_go.clients.http.balancer import (
+    Balancer,
+    member_addresses,
+    Member,
+    UNHEALTHY_STATUSES,
+)
+from sensu_go.clients.http.cache import ResponseCache
+from sensu_go.clients.http.compression import compress_body, CompressionStats
+from sensu_go.clients.http.codec import Codec, default_codec
+from sensu_go.clients.http.hedging import HedgingPolicy
+from sensu_go.clients.http.hooks import NO_SPAN, RequestHook, RequestInfo, Span, span
+from sensu_go.clients.http.limits import ConcurrencyLimiter, RateLimiter
+from sensu_go.clients.http.response import HTTPXResponse, Response
+from sensu_go.clients.http.retry import (
+    CircuitBreaker,
+    IDEMPOTENT_METHODS,
+    RetryPolicy,
+)
+from sensu_go.clients.http.transport import httpx_verify, RequestsTransport, Transport
+from sensu_go.errors import CircuitOpenError, HTTPError, RequestTimeoutError, SensuError
+from sensu_go.typing import Address, Payload
 
-        self._json: JSON
 
-    @property
-    def json(self) -> JSON:
-        if not hasattr(self, "_json"):
-            try:
-                self._json = cast(JSON, json.loads(self.text))
-            except json.decoder.JSONDecodeError:
-                raise ResponseError(
-                    "Cannot decode response", self.url, self.status, self.text
-                )
-        return self._json
-
-    def __str__(self) -> str:
-        return "[{}] {} ({})".format(self.status, self.text, self.headers)
+def _encode_payload(
+    codec: Codec, payload: Payload, headers: Dict[str, str]
+) -> Optional[bytes]:
+    # Callers can pass already serialized payloads (stored events that we are
+    # replaying, for example) to skip the encoding step.
+    if payload is None:
+        return None
+    headers["Content-Type"] = "application/json"
+    if isinstance(payload, bytes):
+        return payload
+    return codec.dumps(payload)
 
 
 class HTTPClient(abc.ABC):
+    # A single client instance can be shared between threads. Connection pool
+    # that backs the session is thread-safe, and the rest of the shared state
+    # (login data, last-use timestamp) is guarded by locks.
     def __init__(
-        self, address: str, verify: bool = True, ca_path: Optional[str] = None
+        self,
+        address: Address,
+        verify: bool = True,
+        ca_path: Optional[str] = None,
+        *,
+        pool_connections: int = 10,
+        pool_maxsize: int = 10,
+        pool_block: bool = False,
+        idle_timeout: Optional[float] = None,
+        codec: Optional[Codec] = None,
+        retry: Optional[RetryPolicy] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        compress_responses: bool = True,
+        compress_requests_threshold: Optional[int] = None,
+        cache: Optional[ResponseCache] = None,
+        timeout: deadline.Timeout = None,
+        transport: Optional[Transport] = None,
+        request_hooks: Sequence[RequestHook] = (),
+        balancer: Optional[Balancer] = None,
+        discover_members: bool = False,
+        hedging: Optional[HedgingPolicy] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        concurrency_limiter: Optional[ConcurrencyLimiter] = None,
     ) -> None:
-        self.address = address.rstrip("/")
+        addresses = [address] if isinstance(address, str) else list(address)
+        if not addresses:
+            raise ValueError("Client needs at least one backend address.")
+
+        # First address identifies the cluster (in the token cache, for example).
+        # If we have more than one address or discover the rest of the cluster
+        # members, the balancer decides where each request goes.
+        self.address = addresses[0].rstrip("/")
+        self.balancer = balancer
+        if self.balancer is None and (len(addresses) > 1 or discover_members):
+            self.balancer = Balancer()
+        if self.balancer is not None:
+            self.balancer.set_members(addresses)
+        self._discovery_pending = discover_members
+        self._discovery_lock = threading.Lock()
+
+        self.codec = codec or default_codec()
+        self.retry = retry
+        self.circuit_breaker = circuit_breaker
+        self.cache = cache
+        # Connect and read timeout for a single request. Deadlines that callers
+        # set using the sensu_go.deadline context manager cap them further.
+        self.timeout = timeout
+        # Hooks observe every request attempt and every high-level operation
+        # (span) that the client performs. We skip all of the bookkeeping when
+        # there are no hooks registered.
+        self.request_hooks = list(request_hooks)
+        # Hedged requests run in a thread pool that we create on first use.
+        self.hedging = hedging
+        self._executor: Optional[futures.ThreadPoolExecutor] = None
+        # Limiters protect the backend from our bulk jobs. Every resource client
+        # sends its requests through this client, so they all share the limits.
+        self.rate_limiter = rate_limiter
+        self.concurrency_limiter = concurrency_limiter
+
+        # Custom transports come with their own TLS and connection pool settings,
+        # which means that verify, ca_path, and pool_* options only apply to the
+        # default transport.
+        self.transport = transport or RequestsTransport(
+            # Requests use single parameter for verification. We split it into two
+            # parameters because this makes interface a bit more readable.
+            ca_path or verify,
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+        )
+
+        # Compressed responses are decompressed on the fly while we read them from
+        # the socket. Request bodies are only compressed if they are at least
+        # compress_requests_threshold bytes long and the threshold is set, since
+        # not every backend (or proxy in front of it) accepts compressed bodies.
+        self._accept_encoding = "gzip" if compress_responses else "identity"
+        self._compress_requests_threshold = compress_requests_threshold
+        self.compression_stats = CompressionStats()
+
+        # Servers and load balancers tend to drop connections that sit idle for
+        # too long. We close pooled connections ourselves after idle_timeout
+        # seconds of inactivity to avoid sending requests over stale sockets.
+        self._idle_timeout = idle_timeout
+        self._last_used = time.monotonic()
+        self._pool_lock = threading.Lock()
+
+    def _reap_idle_connections(self) -> None:
+        with self._pool_lock:
+            now = time.monotonic()
+            idle = now - self._last_used
+            self._last_used = now
+
+        if self._idle_timeout is not None and idle > self._idle_timeout:
+            self.transport.close_idle_connections()
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+        self.transport.close()
+
+    def __enter__(self) -> "HTTPClient":
+        return self
 
-        self.session = requests.Session()
-        # Requests use single parameter for verification. We split it into two
-        # parameters because this makes interface a bit more readable.
-        self.session.verify = ca_path or verify
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    @property
+    def session(self) -> requests.Session:
+        # Session of the default transport. Callers can still use it to set up
+        # proxies, adapters, and similar.
+        if not isinstance(self.transport, RequestsTransport):
+            raise AttributeError(
+                "{} does not use a requests session".format(
+                    type(self.transport).__name__
+                )
+            )
+        return self.transport.session
 
     @property
     @abc.abstractmethod
     def auth_header_value(self) -> str:
         pass
 
+    def _reauthenticate(self, stale_auth_header_value: str) -> bool:
+        # Clients that can obtain new credentials should do that here and return
+        # True to signal that the rejected request is worth repeating.
+        return False
+
+    def span(self, name: str, **attributes: str) -> ContextManager[Optional[Span]]:
+        # Groups requests that belong to a single high-level operation.
+        if not self.request_hooks:
+            return NO_SPAN
+        return span(self.request_hooks, name, attributes)
+
+    def _send(
+        self,
+        method: str,
+        path: str,
+        url: str,
+        data: Optional[bytes],
+        headers: Dict[str, str],
+        query: Optional[Dict[str, str]],
+        auth: Optional[Tuple[str, str]],
+        timeout: deadline.Timeout,
+        attempt: int,
+        stream: bool = False,
+    ) -> Response:
+        info = None
+        if self.request_hooks:
+            info = RequestInfo(method, path, headers, query, attempt)
+            info.bytes_sent = len(data or b"")
+            for hook in self.request_hooks:
+                hook.before_request(info)
+
+        self._reap_idle_connections()
+        start = time.monotonic()
+        try:
+            resp = self.transport.send(
+                method,
+                url,
+                data=data,
+                headers=headers,
+                query=query,
+                auth=auth,
+                timeout=timeout,
+                codec=self.codec,
+                stream=stream,
+            )
+        except HTTPError as e:
+            if info is not None:
+                info.error = e
+                self._after_request(info, start)
+            raise
+        finally:
+            self._last_used = time.monotonic()
+        # We only read streamed bodies later on, so neither the stats nor the
+        # hooks see their size.
+        if not stream:
+            self.compression_stats.record_response(
+                len(resp.content), resp.received_bytes
+            )
+
+        if info is not None:
+            info.status = resp.status
+            info.bytes_received = resp.received_bytes
+            self._after_request(info, start)
+        return resp
+
+    def _after_request(self, info: RequestInfo, start: float) -> None:
+        info.elapsed = time.monotonic() - start
+        for hook in reversed(self.request_hooks):
+            hook.after_request(info)
+
     def _request(
         self,
         method: str,
         path: str,
-        payload: JSON = None,
+        payload: Payload = None,
         headers: Optional[Dict[str, str]] = None,
         query: Optional[Dict[str, str]] = None,
         auth: Optional[Tuple[str, str]] = None,
+        stream: bool = False,
     ) -> Response:
-        headers = headers or {}
-        url = self.address + path
+        headers = dict(headers or {})
+        headers.setdefault("Accept-Encoding", self._accept_encoding)
+        data = _encode_payload(self.codec, payload, headers)
+        if data is not None and self._compress_requests_threshold is not None:
+            size = len(data)
+            data = compress_body(data, headers, self._compress_requests_threshold)
+            self.compression_stats.record_request(size, len(data))
+
+        attempt = 0
+        tried: Set[str] = set()
+        while True:
+            left = deadline.check("{} {}".format(method, path))
+            self._wait_for_limits(method, left)
+            timeout = deadline.limit(self.timeout, deadline.remaining())
+            member = self._acquire_member(tried)
+
+            try:
+                # Losing copy of a streamed request would keep its connection
+                # busy until someone read the body, so we do not hedge those.
+                if (
+                    self.hedging is not None
+                    and self.hedging.applies(method)
+                    and not stream
+                ):
+                    resp = self._send_hedged(
+                        method,
+                        path,
+                        member,
+                        tried,
+                        data,
+                        headers,
+                        query,
+                        auth,
+                        timeout,
+                        attempt,
+                    )
+                else:
+                    resp = self._attempt(
+                        method,
+                        path,
+                        member,
+                        tried,
+                        data,
+                        headers,
+                        query,
+                        auth,
+                        timeout,
+                        attempt,
+                        stream,
+                    )
+            except HTTPError as e:
+                if isinstance(e, CircuitOpenError):
+                    raise
+
+                if self.circuit_breaker:
+                    self.circuit_breaker.record_failure()
+                if member is not None and self._can_fail_over(method, e, tried):
+                    continue
+                if not (self.retry and self.retry.should_retry_error(method, attempt)):
+                    raise
+                self._backoff(self.retry.get_backoff(attempt))
+                attempt += 1
+                continue
+
+            if self.circuit_breaker:
+                if resp.status >= 500:
+                    self.circuit_breaker.record_failure()
+                else:
+                    self.circuit_breaker.record_success()
+
+            if not (
+                self.retry
+                and self.retry.should_retry_status(method, resp.status, attempt)
+            ):
+                return resp
+            resp.close()
+            self._backoff(
+                self.retry.get_backoff(attempt, resp.headers.get("retry-after"))
+            )
+            attempt += 1
+
+    def _attempt(
+        self,
+        method: str,
+        path: str,
+        member: Optional[Member],
+        tried: Set[str],
+        data: Optional[bytes],
+        headers: Dict[str, str],
+        query: Optional[Dict[str, str]],
+        auth: Optional[Tuple[str, str]],
+        timeout: deadline.Timeout,
+        attempt: int,
+        stream: bool = False,
+    ) -> Response:
+        # Callers must wait for limits before they make an attempt.
+        url = (self.address if member is None else member.address) + path
+        start = time.monotonic()
+        try:
+            if self.circuit_breaker:
+                self.circuit_breaker.before_request(url)
+            resp = self._send(
+                method, path, url, data, headers, query, auth, timeout, attempt, stream
+            )
+        except BaseException as e:
+            # Callers record HTTP errors with the circuit breaker. Anything else
+            # means that we do not know how the request went, which must not
+            # leave a trial request unanswered.
+            if self.circuit_breaker and not isinstance(e, HTTPError):
+                self.circuit_breaker.record_failure()
+            failed = isinstance(e, HTTPError) and not isinstance(e, CircuitOpenError)
+            self._release_member(member, start, failed, tried)
+            if self.concurrency_limiter is not None:
+                self.concurrency_limiter.release(start, failed)
+            raise
+
+        self._release_member(member, start, resp.status in UNHEALTHY_STATUSES, tried)
+        if self.concurrency_limiter is not None:
+            self.concurrency_limiter.release(
+                start, resp.status == 429 or resp.status >= 500
+            )
+        return resp
+
+    def _wait_for_limits(self, method: str, left: Optional[float]) -> None:
+        # We wait for at most the time that is left until the deadline. Waiting
+        # is not a backend failure, so we raise outside of the retry loop.
+        if self.rate_limiter is not None and not self.rate_limiter.acquire(
+            method, left
+        ):
+            raise RequestTimeoutError(
+                "Deadline exceeded while waiting for rate limiter"
+            )
+        if (
+            self.concurrency_limiter is not None
+            and not self.concurrency_limiter.acquire(deadline.remaining())
+        ):
+            raise RequestTimeoutError(
+                "Deadline exceeded while waiting for concurrency limiter"
+            )
+
+    def _try_limits(self, method: str) -> bool:
+        # Hedges are optional, so they only go out if the limits allow it right
+        # away.
+        if self.rate_limiter is not None and not self.rate_limiter.acquire(method, 0):
+            return False
+        return self.concurrency_limiter is None or self.concurrency_limiter.acquire(0)
+
+    def _send_hedged(
+        self,
+        method: str,
+        path: str,
+        member: Optional[Member],
+        tried: Set[str],
+        data: Optional[bytes],
+        headers: Dict[str, str],
+        query: Optional[Dict[str, str]],
+        auth: Optional[Tuple[str, str]],
+        timeout: deadline.Timeout,
+        attempt: int,
+    ) -> Response:
+        # The copy that loses the race cannot be interrupted while it waits for
+        # the backend, so neither copy runs on the caller's thread. The original
+        # request gets a thread of its own, which means that hedging does not
+        # limit the number of requests in flight, and only hedges go through
+        # the executor. Hedges take their limiter slot and cluster member once
+        # they start, so a hedge that we cancel (or that finds the original
+        # request done) does not hold on to anything.
+        hedging = cast(HedgingPolicy, self.hedging)
+        exclude = set(tried)
+        if member is not None:
+            exclude.add(member.address)
+
+        def leg(m: Optional[Member], leg_tried: Set[str]) -> Response:
+            start = time.monotonic()
+            # Hooks can modify headers, so each copy needs its own.
+            resp = self._attempt(
+                method,
+                path,
+                m,
+                leg_tried,
+                data,
+                dict(headers),
+                query,
+                auth,
+                timeout,
+                attempt,
+            )
+            hedging.observe(time.monotonic() - start)
+            return resp
+
+        primary: "futures.Future[Response]" = futures.Future()
+
+        def run_primary() -> None:
+            primary.set_running_or_notify_cancel()
+            try:
+                primary.set_result(leg(member, tried))
+            except BaseException as e:
+                primary.set_exception(e)
+
+        # Threads do not inherit context variables (trace context, for example)
+        # from the caller.
+        threading.Thread(
+            target=contextvars.copy_context().run,
+            args=(run_primary,),
+            name="sensu-go-request",
+            daemon=True,
+        ).start()
         try:
-            return Response(
-                self.session.request(
-                    method, url, json=payload, headers=headers, params=query, auth=auth
+            resp = primary.result(timeout=hedging.delay())
+        except futures.TimeoutError:
+            pass
+        else:
+            hedging.record(hedged=False, won=False)
+            return resp
+
+        lock = threading.Lock()
+        sent = closed = False
+
+        def run_hedge() -> Optional[Response]:
+            nonlocal sent
+            with lock:
+                if closed or primary.done() or not self._try_limits(method):
+                    return None
+                sent = True
+            # Losing hedge must not change the set of members that the caller
+            # is using for fail-over decisions.
+            return leg(self._acquire_member(exclude), set(exclude))
+
+        def close_hedge() -> bool:
+            # Returns True if the hedge went out.
+            nonlocal closed
+            with lock:
+                closed = True
+                return sent
+
+        hedge: "futures.Future[Optional[Response]]" = self._hedge_executor().submit(
+            contextvars.copy_context().run, run_hedge
+        )
+        pending: List["futures.Future[Any]"] = [primary, hedge]
+        futures.wait(pending, return_when=futures.FIRST_COMPLETED)
+        if hedge.done() and hedge.exception() is None and hedge.result() is None:
+            # Hedge did not go out.
+            hedging.record(hedged=False, won=False)
+            return primary.result()
+
+        if primary.done() and primary.exception() is None:
+            hedge_won = False
+        elif hedge.done() and hedge.exception() is None:
+            hedge_won = True
+        else:
+            # Failed copy does not win the race if the other one succeeds.
+            futures.wait(pending)
+            hedge_won = (
+                primary.exception() is not None
+                and hedge.exception() is None
+                and hedge.result() is not None
+            )
+
+        if not hedge_won:
+            hedge.cancel()
+            hedging.record(hedged=close_hedge(), won=False)
+            return primary.result()
+        hedging.record(hedged=True, won=True)
+        return cast(Response, hedge.result())
+
+    def _hedge_executor(self) -> futures.ThreadPoolExecutor:
+        with self._pool_lock:
+            if self._executor is None:
+                self._executor = futures.ThreadPoolExecutor(
+                    cast(HedgingPolicy, self.hedging).max_workers,
+                    thread_name_prefix="sensu-go-hedge",
                 )
+            return self._executor
+
+    def _acquire_member(self, tried: Set[str]) -> Optional[Member]:
+        if self.balancer is None:
+            return None
+        for member in self.balancer.due_for_probe():
+            self.balancer.probed(member, self._probe(member))
+        return self.balancer.acquire(tried)
+
+    def _release_member(
+        self, member: Optional[Member], start: float, failed: bool, tried: Set[str]
+    ) -> None:
+        if member is not None and self.balancer is not None:
+            self.balancer.release(member, time.monotonic() - start, failed)
+            tried.add(member.address)
+
+    def _can_fail_over(
+        self, method: str, error: BaseException, tried: Set[str]
+    ) -> bool:
+        # Connection errors mean that the member is down, so we can repeat the
+        # request on a different one. Timeouts are different, since the member
+        # might have processed the request, which is only safe to repeat if the
+        # request is idempotent.
+        if method not in IDEMPOTENT_METHODS and isinstance(error, RequestTimeoutError):
+            return False
+        return self.balancer is not None and self.balancer.can_fail_over(tried)
+
+    def _probe(self, member: Member) -> bool:
+        try:
+            resp = self.transport.send(
+                "GET",
+                member.address + "/health",
+                data=None,
+                headers={},
+                query=None,
+                auth=None,
+                timeout=cast(Balancer, self.balancer).probe_timeout,
+                codec=self.codec,
             )
-        except requests.exceptions.ConnectionError:
-            raise HTTPError("{} {} failed".format(method, url))
+        except HTTPError:
+            return False
+        return resp.status == 200
+
+    def discover_members(self) -> None:
+        # Replaces the list of members with the backends that the cluster reports.
+        # We keep the current members if the discovery fails.
+        if self.balancer is None:
+            raise ValueError("Member discovery requires a balancer.")
+
+        self._discovery_pending = False
+        try:
+            resp = self.request("GET", "/api/core/v2/cluster/members")
+            if resp.status != 200:
+                return
+            addresses = member_addresses(self.address, resp.json)
+        except SensuError:
+            return
+        if addresses:
+            self.balancer.set_members(addresses)
+
+    @staticmethod
+    def _backoff(delay: float) -> None:
+        # There is no point in waiting for a retry that we will not have time for.
+        left = deadline.remaining()
+        if left is not None and delay >= left:
+            raise RequestTimeoutError("Deadline exceeded while waiting to retry")
+        time.sleep(delay)
 
     def request(
         self,
         method: str,
         path: str,
-        payload: JSON = None,
+        payload: Payload = None,
         query: Optional[Dict[str, str]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        stream: bool = False,
     ) -> Response:
-        headers = dict(Authorization=self.auth_header_value)
-        return self._request(method, path, payload, headers, query)
+        if self._discovery_pending:
+            with self._discovery_lock:
+                if self._discovery_pending:
+                    self.discover_members()
+
+        auth_header_value = self.auth_header_value
+        resp = self._request(
+            method,
+            path,
+            payload,
+            dict(headers or {}, Authorization=auth_header_value),
+            query,
+            stream=stream,
+        )
+        if resp.status == 401 and self._reauthenticate(auth_header_value):
+            resp.close()
+            resp = self._request(
+                method,
+                path,
+                payload,
+                dict(headers or {}, Authorization=self.auth_header_value),
+                query,
+                stream=stream,
+            )
+        return resp
 
     def get(
         self,
         path: str,
         query: Optional[Dict[str, str]] = None,
+        stream: bool = False,
     ) -> Response:
-        return self.request("GET", path, query=query)
+        # Streamed responses only read the body when the caller asks for it. The
+        # cache needs the whole body, so it ignores the stream flag.
+        if self.cache is None:
+            return self.request("GET", path, query=query, stream=stream)
+
+        key = self.cache.key(path, query)
+        entry = self.cache.get(key)
+        resp = self.request(
+            "GET", path, query=query, headers=entry.validators if entry else None
+        )
+        if entry and resp.status == 304:
+            # Callers must not see each other's changes to the parsed body.
+            self.cache.record(hit=True)
+            return entry.response.copy()
 
-    def post(self, path: str, payload: JSON) -> Response:
+        self.cache.record(hit=False)
+        if resp.status == 200:
+            self.cache.store(key, resp)
+        return resp
+
+    def post(self, path: str, payload: Payload) -> Response:
+        if self.cache is not None:
+            self.cache.invalidate(path)
         return self.request("POST", path, payload)
 
-    def put(self, path: str, payload: JSON) -> Response:
+    def put(self, path: str, payload: Payload) -> Response:
+        if self.cache is not None:
+            self.cache.invalidate(path)
         return self.request("PUT", path, payload)
 
     def delete(self, path: str) -> Response:
+        if self.cache is not None:
+            self.cache.invalidate(path)
         return self.request("DELETE", path)
+
+
+class AsyncHTTPClient(abc.ABC):
+    def __init__(
+        self,
+        address: str,
+        verify: bool = True,
+        ca_path: Optional[str] = None,
+        *,
+        codec: Optional[Codec] = None,
+        http2: bool = False,
+    ) -> None:
+        if not HAS_HTTPX:
+            raise ImportError(
+                "Asynchronous client requires httpx. Install it by running "
+                "pip install sensu-go[async]."
+            )
+
+        self.address = address.rstrip("/")
+        self.codec = codec or default_codec()
+        # Coroutines that share the client can multiplex their requests over a
+        # single HTTP/2 connection. This requires the h2 package.
+        self.session = httpx.AsyncClient(
+            verify=httpx_verify(ca_path or verify), http2=http2
+        )
+
+    @abc.abstractmethod
+    async def auth_header_value(self) -> str:
+        pass
+
+    async def _reauthenticate(self, stale_auth_header_value: str) -> bool:
+        return False
+
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        payload: Payload = None,
+        headers: Optional[Dict[str, str]] = None,
+        query: Optional[Dict[str, str]] = None,
+        auth: Optional[Tuple[str, str]] = None,
+    ) -> Response:
+        headers = headers or {}
+        url = self.address + path
+        data = _encode_payload(self.codec, payload, headers)
+        try:
+            return HTTPXResponse(
+                await self.session.request(
+                    method,
+                    url,
+                    content=data,
+                    headers=headers,
+                    params=query,
+                    auth=auth,
+                ),
+                self.codec,
+            )
+        except httpx.TransportError:
+            raise HTTPError("{} {} failed".format(method, url))
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        payload: Payload = None,
+        query: Optional[Dict[str, str]] = None,
+    ) -> Response:
+        auth_header_value = await self.auth_header_value()
+        resp = await self._request(
+            method, path, payload, dict(Authorization=auth_header_value), query
+        )
+        if resp.status == 401 and await self._reauthenticate(auth_header_value):
+            headers = dict(Authorization=await self.auth_header_value())
+            resp = await self._request(method, path, payload, headers, query)
+        return resp
+
+    async def get(
+        self,
+        path: str,
+        query: Optional[Dict[str, str]] = None,
+    ) -> Response:
+        return await self.request("GET", path, query=query)
+
+    async def post(self, path: str, payload: Payload) -> Response:
+        return await self.request("POST", path, payload)
+
+    async def put(self, path: str, payload: Payload) -> Response:
+        return await self.request("PUT", path, payload)
+
+    async def delete(self, path: str) -> Response:
+        return await self.request("DELETE", path)
+
+    async def aclose(self) -> None:
+        await self.session.aclose()
+
+
+# Resources can be bound to either of the clients.
+AnyHTTPClient = Union[HTTPClient, AsyncHTTPClient]
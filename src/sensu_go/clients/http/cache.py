@@ -0,0 +1,140 @@
+# Copyright (c) 2021 XLAB Steampunk
+
+import collections
+import threading
+import time
+from typing import TYPE_CHECKING, Dict, FrozenSet, NamedTuple, Optional, Tuple
+
+from sensu_go.errors import ResponseError
+
+if TYPE_CHECKING:
+    from sensu_go.clients.http.response import Response
+
+CacheKey = Tuple[str, FrozenSet[Tuple[str, str]]]
+
+
+class CacheEntry(NamedTuple):
+    response: "Response"
+    etag: Optional[str]
+    last_modified: Optional[str]
+    size: int
+    expires_at: Optional[float]
+
+    @property
+    def validators(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    # Cache for conditional GET requests. We store successful responses together
+    # with their validators (ETag and Last-Modified headers) and let the backend
+    # tell us whether the cached response is still valid.
+    #
+    # Cache evicts the least recently used entries once the total size of cached
+    # bodies exceeds max_bytes. Entries also expire after a TTL that can be set
+    # per path prefix (the longest matching prefix wins). TTL of 0 disables
+    # caching for the matching paths.
+    #
+    # We keep a copy of the response that the caller does not have access to,
+    # and callers get a copy of it each time we serve it. We parse the body once
+    # when we store it, so serving it only copies the parsed data.
+    def __init__(
+        self,
+        max_bytes: int = 16 * 1024 * 1024,
+        default_ttl: Optional[float] = 300.0,
+        ttls: Optional[Dict[str, Optional[float]]] = None,
+    ) -> None:
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.ttls = dict(ttls or {})
+
+        self._lock = threading.Lock()
+        self._entries: "collections.OrderedDict[CacheKey, CacheEntry]" = (
+            collections.OrderedDict()
+        )
+        self._size = 0
+
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(path: str, query: Optional[Dict[str, str]] = None) -> CacheKey:
+        return path, frozenset((query or {}).items())
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def ttl(self, path: str) -> Optional[float]:
+        prefixes = [p for p in self.ttls if path.startswith(p)]
+        if not prefixes:
+            return self.default_ttl
+        return self.ttls[max(prefixes, key=len)]
+
+    def get(self, key: CacheKey) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expires_at is not None and entry.expires_at <= time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def store(self, key: CacheKey, response: "Response") -> None:
+        etag = response.headers.get("etag")
+        last_modified = response.headers.get("last-modified")
+        ttl = self.ttl(key[0])
+        size = len(response.content)
+        if not (etag or last_modified) or ttl == 0 or size > self.max_bytes:
+            return
+
+        # Bodies that are not JSON stay as they are.
+        try:
+            response.json
+        except ResponseError:
+            pass
+        stored = response.copy()
+
+        expires_at = None if ttl is None else time.monotonic() + ttl
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = CacheEntry(
+                stored, etag, last_modified, size, expires_at
+            )
+            self._size += size
+            while self._size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def record(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def invalidate(self, path: str) -> None:
+        # Modifying a resource invalidates cached copies of the resource itself and
+        # of the collection that contains it.
+        parent = path.rsplit("/", 1)[0]
+        with self._lock:
+            for key in [k for k in self._entries if k[0] in (path, parent)]:
+                self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def _remove(self, key: CacheKey) -> None:
+        self._size -= self._entries.pop(key).size
@@ -0,0 +1,75 @@
+# Copyright (c) 2021 XLAB Steampunk
+
+import abc
+import json
+from typing import cast
+
+try:
+    import orjson
+
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+try:
+    import ujson  # type: ignore
+
+    HAS_UJSON = True
+except ImportError:
+    HAS_UJSON = False
+
+from sensu_go.typing import JSON
+
+
+class Codec(metaclass=abc.ABCMeta):
+    # Implementations must raise ValueError (or one of its subclasses) on
+    # invalid input when decoding.
+
+    @abc.abstractmethod
+    def dumps(self, data: JSON) -> bytes:
+        pass
+
+    @abc.abstractmethod
+    def loads(self, data: bytes) -> JSON:
+        pass
+
+
+class StdlibCodec(Codec):
+    def dumps(self, data: JSON) -> bytes:
+        return json.dumps(data, separators=(",", ":")).encode("utf-8")
+
+    def loads(self, data: bytes) -> JSON:
+        return cast(JSON, json.loads(data))
+
+
+class OrjsonCodec(Codec):
+    def __init__(self) -> None:
+        if not HAS_ORJSON:
+            raise ImportError("OrjsonCodec requires orjson. Please install it.")
+
+    def dumps(self, data: JSON) -> bytes:
+        return orjson.dumps(data)
+
+    def loads(self, data: bytes) -> JSON:
+        return cast(JSON, orjson.loads(data))
+
+
+class UjsonCodec(Codec):
+    def __init__(self) -> None:
+        if not HAS_UJSON:
+            raise ImportError("UjsonCodec requires ujson. Please install it.")
+
+    def dumps(self, data: JSON) -> bytes:
+        return cast(bytes, ujson.dumps(data, ensure_ascii=False).encode("utf-8"))
+
+    def loads(self, data: bytes) -> JSON:
+        return cast(JSON, ujson.loads(data))
+
+
+def default_codec() -> Codec:
+    # Pick the fastest codec that is available.
+    if HAS_ORJSON:
+        return OrjsonCodec()
+    if HAS_UJSON:
+        return UjsonCodec()
+    return StdlibCodec()
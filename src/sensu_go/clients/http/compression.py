@@ -0,0 +1,53 @@
+# Copyright (c) 2021 XLAB Steampunk
+
+import gzip
+import threading
+from typing import Dict
+
+
+class CompressionStats:
+    # Counters that show how many bytes compression saved us. Clients that are
+    # shared between threads update them concurrently, hence the lock.
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.request_bytes = 0
+        self.request_bytes_sent = 0
+        self.response_bytes = 0
+        self.response_bytes_received = 0
+
+    def record_request(self, size: int, sent: int) -> None:
+        with self._lock:
+            self.request_bytes += size
+            self.request_bytes_sent += sent
+
+    def record_response(self, size: int, received: int) -> None:
+        with self._lock:
+            self.response_bytes += size
+            self.response_bytes_received += received
+
+    @property
+    def bytes_saved(self) -> int:
+        return (
+            self.request_bytes
+            - self.request_bytes_sent
+            + self.response_bytes
+            - self.response_bytes_received
+        )
+
+    def as_dict(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(
+                request_bytes=self.request_bytes,
+                request_bytes_sent=self.request_bytes_sent,
+                response_bytes=self.response_bytes,
+                response_bytes_received=self.response_bytes_received,
+                bytes_saved=self.bytes_saved,
+            )
+
+
+def compress_body(data: bytes, headers: Dict[str, str], threshold: int) -> bytes:
+    # Compressing tiny payloads costs more than it saves.
+    if len(data) < threshold:
+        return data
+    headers["Content-Encoding"] = "gzip"
+    return gzip.compress(data, compresslevel=6)
@@ -0,0 +1,66 @@
+# Copyright (c) 2021 XLAB Steampunk
+
+import contextlib
+import contextvars
+import time
+from typing import Iterator, Optional, Tuple, Union
+
+from sensu_go.errors import RequestTimeoutError
+
+# Timeout can be a single number that applies to both connecting and reading, or
+# a (connect, read) pair.
+Timeout = Union[None, float, Tuple[float, float]]
+
+_deadline: "contextvars.ContextVar[Optional[float]]" = contextvars.ContextVar(
+    "sensu_go_deadline", default=None
+)
+
+
+def current() -> Optional[float]:
+    # Deadlines are monotonic clock readings, not wall clock timestamps.
+    return _deadline.get()
+
+
+def remaining() -> Optional[float]:
+    at = _deadline.get()
+    return None if at is None else at - time.monotonic()
+
+
+@contextlib.contextmanager
+def deadline_at(at: Optional[float]) -> Iterator[None]:
+    # Nested deadlines can only make the budget smaller, never bigger.
+    outer = _deadline.get()
+    if at is None or (outer is not None and outer <= at):
+        yield
+        return
+
+    token = _deadline.set(at)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def deadline(seconds: Optional[float]) -> "contextlib.AbstractContextManager[None]":
+    # Time budget for all requests that are sent from within the block. Once the
+    # budget runs out, requests fail with the sensu_go.errors.RequestTimeoutError.
+    return deadline_at(None if seconds is None else time.monotonic() + seconds)
+
+
+def check(what: str) -> Optional[float]:
+    left = remaining()
+    if left is not None and left <= 0:
+        raise RequestTimeoutError("Deadline exceeded before {}".format(what))
+    return left
+
+
+def limit(timeout: Timeout, left: Optional[float]) -> Timeout:
+    # Shrinks the per-request timeout so that it does not exceed the remaining
+    # budget.
+    if left is None:
+        return timeout
+    if timeout is None:
+        return left
+    if isinstance(timeout, tuple):
+        return min(timeout[0], left), min(timeout[1], left)
+    return min(timeout, left)
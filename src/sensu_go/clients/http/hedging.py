@@ -0,0 +1,81 @@
+# Copyright (c) 2021 XLAB Steampunk
+
+import collections
+import math
+import threading
+from typing import Collection, Deque, Dict, Optional, Union
+
+from sensu_go.clients.http.retry import IDEMPOTENT_METHODS
+
+
+class HedgingPolicy:
+    # Requests that did not receive a response after the quantile-th fraction of
+    # recent requests did get a duplicate (a hedge), and the first response to
+    # arrive wins. Until we have min_samples latency samples, we wait for
+    # initial_delay seconds before hedging. The delay never drops below
+    # min_delay, which stops us from doubling the load on a fast backend.
+    #
+    # Only idempotent requests can be hedged, since the backend can end up
+    # processing both copies.
+    def __init__(
+        self,
+        quantile: float = 0.95,
+        initial_delay: float = 0.5,
+        min_delay: float = 0.01,
+        window: int = 1000,
+        min_samples: int = 20,
+        methods: Collection[str] = ("GET",),
+        max_workers: int = 10,
+    ) -> None:
+        if not 0 < quantile < 1:
+            raise ValueError("Quantile must be between 0 and 1.")
+        invalid = set(methods) - IDEMPOTENT_METHODS
+        if invalid:
+            raise ValueError(
+                "Cannot hedge non-idempotent methods: {}".format(
+                    ", ".join(sorted(invalid))
+                )
+            )
+
+        self.quantile = quantile
+        self.initial_delay = initial_delay
+        self.min_delay = min_delay
+        self.min_samples = min_samples
+        self.methods = frozenset(methods)
+        self.max_workers = max_workers
+
+        self._lock = threading.Lock()
+        self._latencies: Deque[float] = collections.deque(maxlen=window)
+        self.requests = 0
+        self.hedges = 0
+        self.wins = 0  # Hedges that answered before the original request
+
+    def applies(self, method: str) -> bool:
+        return method in self.methods
+
+    def delay(self) -> float:
+        with self._lock:
+            if len(self._latencies) < self.min_samples:
+                return max(self.initial_delay, self.min_delay)
+            latencies = sorted(self._latencies)
+        index = min(math.ceil(self.quantile * len(latencies)), len(latencies)) - 1
+        return max(latencies[index], self.min_delay)
+
+    def observe(self, elapsed: float) -> None:
+        with self._lock:
+            self._latencies.append(elapsed)
+
+    def record(self, hedged: bool, won: bool) -> None:
+        with self._lock:
+            self.requests += 1
+            self.hedges += hedged
+            self.wins += won
+
+    def as_dict(self) -> Dict[str, Union[int, Optional[float]]]:
+        with self._lock:
+            return dict(
+                requests=self.requests,
+                hedges=self.hedges,
+                wins=self.wins,
+                win_rate=self.wins / self.hedges if self.hedges else None,
+            )
@@ -0,0 +1,130 @@
+# Copyright (c) 2021 XLAB Steampunk
+
+import contextlib
+import re
+import time
+from typing import Any, Dict, Iterator, Optional, Sequence
+
+# API versions, such as v2 or v1beta1. Groups can have more than one segment
+# (core or enterprise/secrets, for example), so we look for the version.
+_VERSION = re.compile(r"v\d+((alpha|beta)\d+)?$")
+
+
+def path_template(path: str) -> str:
+    # Turns concrete paths into templates, which keeps the number of distinct
+    # endpoints that we report low. For example,
+    # /api/core/v2/namespaces/default/checks/my-check becomes
+    # /api/core/v2/namespaces/{namespace}/checks/{name}.
+    parts = path.split("/")
+    if len(parts) < 3 or parts[1] != "api":
+        return path
+    version = next((i for i in range(2, len(parts)) if _VERSION.match(parts[i])), None)
+    if version is None:
+        return path
+
+    kind = version + 1
+    if kind >= len(parts):
+        return path
+    if parts[kind] == "namespaces" and len(parts) > kind + 2:
+        parts[kind + 1] = "{namespace}"
+        kind += 2
+    for i in range(kind + 1, len(parts)):
+        parts[i] = "{name}"
+    return "/".join(parts)
+
+
+class RequestInfo:
+    # Describes a single request attempt. Hooks can modify headers in their
+    # before_request method, and the rest of the fields are filled in once the
+    # attempt is over.
+    def __init__(
+        self,
+        method: str,
+        path: str,
+        headers: Dict[str, str],
+        query: Optional[Dict[str, str]],
+        attempt: int,
+    ) -> None:
+        self.method = method
+        self.path = path
+        self.headers = headers
+        self.query = query
+        self.attempt = attempt
+
+        self.status: Optional[int] = None
+        self.error: Optional[BaseException] = None
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.elapsed = 0.0
+
+        # Hooks can store their per-request state here, keyed by the hook.
+        self.hook_data: Dict[object, Any] = {}
+
+        self._template: Optional[str] = None
+
+    @property
+    def template(self) -> str:
+        if self._template is None:
+            self._template = path_template(self.path)
+        return self._template
+
+
+class Span:
+    # Named operation that can span more than one request (saving a resource,
+    # for example).
+    def __init__(self, name: str, attributes: Dict[str, str]) -> None:
+        self.name = name
+        self.attributes = attributes
+        self.start = time.monotonic()
+        self.elapsed = 0.0
+        self.error: Optional[BaseException] = None
+
+        self.hook_data: Dict[object, Any] = {}
+
+
+class RequestHook:
+    # Base class for request hooks. All methods do nothing by default, which
+    # means that hooks only need to override the ones they care about. Hooks are
+    # called in the order they were registered in and in reverse order once the
+    # request or span is over.
+    def before_request(self, info: RequestInfo) -> None:
+        pass
+
+    def after_request(self, info: RequestInfo) -> None:
+        pass
+
+    def start_span(self, span: Span) -> None:
+        pass
+
+    def end_span(self, span: Span) -> None:
+        pass
+
+
+@contextlib.contextmanager
+def span(
+    hooks: Sequence[RequestHook], name: str, attributes: Dict[str, str]
+) -> Iterator[Span]:
+    s = Span(name, attributes)
+    for hook in hooks:
+        hook.start_span(s)
+    try:
+        yield s
+    except BaseException as e:
+        s.error = e
+        raise
+    finally:
+        s.elapsed = time.monotonic() - s.start
+        for hook in reversed(hooks):
+            hook.end_span(s)
+
+
+class _NoSpan:
+    # Reusable do-nothing context manager that keeps uninstrumented clients fast.
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc_info: object) -> None:
+        pass
+
+
+NO_SPAN = _NoSpan()
@@ -0,0 +1,121 @@
+# Copyright (c) 2021 XLAB Steampunk
+
+import codecs
+import json
+from typing import cast, Generator, Iterable, Iterator
+
+from sensu_go.typing import JSON
+
+CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = " \t\n\r"
+# Characters that can continue a number that we already parsed. The decoder
+# stops before a trailing "3." or "1e+", so at most three of them can be left.
+_NUMBER_TAIL = "0123456789+-.eE"
+_NUMBER_TAIL_LENGTH = 3
+_decoder = json.JSONDecoder()
+
+
+def iter_chunks(content: bytes, size: int = CHUNK_SIZE) -> Generator[bytes, None, None]:
+    view = memoryview(content)
+    for start in range(0, len(content), size):
+        yield bytes(view[start : start + size])
+
+
+class _Buffer:
+    # Decoded text that we did not parse yet. Parsed text gets dropped from time
+    # to time, which keeps the buffer about as big as the biggest element.
+    def __init__(self, chunks: Iterable[bytes]) -> None:
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self.text = ""
+        self.pos = 0
+        self.eof = False
+
+    def read(self) -> bool:
+        # Reads at least as much as we already have in the buffer (or as much as
+        # there is left), which keeps repeated parsing attempts of elements that
+        # span many chunks linear in their size.
+        if self.eof:
+            return False
+        if self.pos > len(self.text) // 2:
+            self.text = self.text[self.pos :]
+            self.pos = 0
+
+        wanted = max(len(self.text) - self.pos, 1)
+        parts = [self.text]
+        read = 0
+        while read < wanted:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                parts.append(self._decoder.decode(b"", final=True))
+                self.eof = True
+                break
+            part = self._decoder.decode(chunk)
+            parts.append(part)
+            read += len(part)
+        self.text = "".join(parts)
+        return True
+
+    def skip_whitespace(self) -> bool:
+        # Returns False if we ran out of input.
+        while True:
+            while self.pos < len(self.text) and self.text[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.text):
+                return True
+            if not self.read():
+                return False
+
+    def expect(self, chars: str) -> str:
+        if not self.skip_whitespace():
+            raise ValueError("Unexpected end of JSON document")
+        char = self.text[self.pos]
+        if char not in chars:
+            raise ValueError(
+                "Expected one of {} at position {}".format(chars, self.pos)
+            )
+        self.pos += 1
+        return char
+
+    def element(self) -> JSON:
+        if not self.skip_whitespace():
+            raise ValueError("Unexpected end of JSON document")
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.text, self.pos)
+            except ValueError:
+                if self.read():
+                    continue
+                raise
+            # Numbers and literals near the end of the buffer might continue in
+            # the next chunk.
+            tail = self.text[end : end + _NUMBER_TAIL_LENGTH]
+            if (
+                self.text[self.pos] not in '{["'
+                and end + _NUMBER_TAIL_LENGTH > len(self.text)
+                and not tail.strip(_NUMBER_TAIL)
+            ):
+                if self.read():
+                    continue
+            self.pos = end
+            return cast(JSON, value)
+
+
+def iter_array(chunks: Iterable[bytes]) -> Iterator[JSON]:
+    # Parses a JSON array incrementally and yields its elements as soon as they
+    # are complete. We only ever keep a single element and the text it spans in
+    # memory. Raises ValueError on invalid input, same as json.loads.
+    buffer = _Buffer(chunks)
+    buffer.expect("[")
+    if not buffer.skip_whitespace():
+        raise ValueError("Unexpected end of JSON document")
+    if buffer.text[buffer.pos] == "]":
+        buffer.pos += 1
+    else:
+        while True:
+            yield buffer.element()
+            if buffer.expect(",]") == "]":
+                break
+    if buffer.skip_whitespace():
+        raise ValueError("Extra data after JSON array")
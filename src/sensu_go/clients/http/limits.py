@@ -0,0 +1,146 @@
+# Copyright (c) 2021 XLAB Steampunk
+
+import threading
+import time
+from typing import Dict, Optional, Union
+
+READ_METHODS = frozenset(("GET", "HEAD", "OPTIONS"))
+
+
+class TokenBucket:
+    # Allows rate requests per second on average and bursts of up to burst
+    # requests. Callers reserve tokens in advance, which means that the bucket
+    # can go into debt and waiting callers get served in order.
+    def __init__(self, rate: float, burst: Optional[float] = None) -> None:
+        if rate <= 0:
+            raise ValueError("Rate must be positive.")
+
+        self.rate = rate
+        self.burst = max(burst or rate, 1.0)
+
+        self._lock = threading.Lock()
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        # Returns False if we would need to wait for longer than timeout seconds.
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self._tokens + (now - self._updated) * self.rate, self.burst
+            )
+            self._updated = now
+
+            wait = max(-(self._tokens - 1) / self.rate, 0.0)
+            if timeout is not None and wait > timeout:
+                return False
+            self._tokens -= 1
+
+        if wait > 0:
+            time.sleep(wait)
+        return True
+
+
+class RateLimiter:
+    # Separate token buckets for reads and writes. Writes are much more expensive
+    # for the backend (each one ends up as an etcd transaction), so we usually
+    # want to allow fewer of them. Methods without a rate are not limited.
+    def __init__(
+        self,
+        reads: Optional[float] = None,
+        writes: Optional[float] = None,
+        burst: Optional[float] = None,
+    ) -> None:
+        self.reads = None if reads is None else TokenBucket(reads, burst)
+        self.writes = None if writes is None else TokenBucket(writes, burst)
+
+    def acquire(self, method: str, timeout: Optional[float] = None) -> bool:
+        bucket = self.reads if method in READ_METHODS else self.writes
+        return bucket is None or bucket.acquire(timeout)
+
+
+class ConcurrencyLimiter:
+    # Adaptive limit on the number of requests in flight (AIMD). Each successful
+    # request that completes without a latency spike raises the limit by about
+    # one per limit requests, and each overload signal (429 and 5xx responses,
+    # failed requests, or latency that exceeds latency_tolerance times the
+    # baseline latency) multiplies it by backoff_ratio. Requests that were
+    # already in flight when we last cut the limit do not cut it again, which
+    # stops a single overload from driving the limit down to min_limit.
+    def __init__(
+        self,
+        initial_limit: int = 10,
+        min_limit: int = 1,
+        max_limit: int = 100,
+        backoff_ratio: float = 0.5,
+        latency_tolerance: float = 2.0,
+    ) -> None:
+        if not 1 <= min_limit <= initial_limit <= max_limit:
+            raise ValueError("Limits must satisfy 1 <= min <= initial <= max.")
+        if not 0 < backoff_ratio < 1:
+            raise ValueError("Backoff ratio must be between 0 and 1.")
+
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff_ratio = backoff_ratio
+        self.latency_tolerance = latency_tolerance
+
+        self._condition = threading.Condition()
+        self._limit = float(initial_limit)
+        self._in_flight = 0
+        self._baseline: Optional[float] = None  # Seconds
+        self._last_backoff = 0.0
+        self.backoffs = 0
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        with self._condition:
+            if not self._condition.wait_for(
+                lambda: self._in_flight < int(self._limit), timeout
+            ):
+                return False
+            self._in_flight += 1
+            return True
+
+    def release(self, start: float, overloaded: bool) -> None:
+        now = time.monotonic()
+        elapsed = now - start
+        with self._condition:
+            self._in_flight -= 1
+            if not overloaded:
+                overloaded = self._is_latency_spike(elapsed)
+
+            if overloaded:
+                if start >= self._last_backoff:
+                    self._limit = max(self._limit * self.backoff_ratio, self.min_limit)
+                    self._last_backoff = now
+                    self.backoffs += 1
+            else:
+                self._limit = min(self._limit + 1 / self._limit, self.max_limit)
+            self._condition.notify_all()
+
+    def _is_latency_spike(self, elapsed: float) -> bool:
+        # Baseline follows the fastest responses down immediately and drifts up
+        # slowly, which lets it adapt when the backend gets slower for good.
+        if self._baseline is None or elapsed < self._baseline:
+            self._baseline = elapsed
+            return False
+        spike = elapsed > self._baseline * self.latency_tolerance
+        self._baseline += 0.01 * (elapsed - self._baseline)
+        return spike
+
+    def as_dict(self) -> Dict[str, Union[int, Optional[float]]]:
+        with self._condition:
+            return dict(
+                limit=self.limit,
+                in_flight=self._in_flight,
+                backoffs=self.backoffs,
+                baseline_latency=self._baseline,
+            )
@@ -0,0 +1,196 @@
+# Copyright (c) 2021 XLAB Steampunk
+
+import bisect
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sensu_go.clients.http.hooks import RequestHook, RequestInfo, Span
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_bound(bound: float) -> str:
+    return "+Inf" if bound == float("inf") else repr(bound)
+
+
+class Histogram:
+    # Latency histogram with fixed bucket bounds (in seconds). Counts are not
+    # cumulative here, we only sum them up when exporting.
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)  # Last one is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self) -> List[Tuple[float, int]]:
+        result = []
+        total = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+    def quantile(self, q: float) -> Optional[float]:
+        # Upper bound of the bucket that contains the q-th observation.
+        if self.count == 0:
+            return None
+        rank = q * self.count
+        for bound, total in self.cumulative():
+            if total >= rank:
+                return bound
+        return None  # pragma: no cover
+
+    def as_dict(self) -> Dict[str, Any]:
+        return dict(
+            count=self.count,
+            sum=self.sum,
+            buckets={_format_bound(b): total for b, total in self.cumulative()},
+        )
+
+
+class _Stats:
+    def __init__(self, buckets: Sequence[float]) -> None:
+        self.latency = Histogram(buckets)
+        self.errors = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return dict(latency=self.latency.as_dict(), errors=self.errors)
+
+
+class _RequestStats(_Stats):
+    def __init__(self, buckets: Sequence[float]) -> None:
+        super().__init__(buckets)
+        self.statuses: Dict[int, int] = {}
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return dict(
+            super().as_dict(),
+            statuses=dict(self.statuses),
+            bytes_sent=self.bytes_sent,
+            bytes_received=self.bytes_received,
+        )
+
+
+def _labels(**labels: str) -> str:
+    return ",".join(
+        '{}="{}"'.format(k, v.replace("\\", "\\\\").replace('"', '\\"'))
+        for k, v in labels.items()
+    )
+
+
+class MetricsCollector(RequestHook):
+    # Collects per-endpoint request latencies, error counts, and transferred
+    # bytes, and per-operation span latencies. Requests that raise an exception
+    # or end with a 5xx status count as errors. Endpoints are identified by the
+    # request method and path template.
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self._buckets = buckets
+        self._lock = threading.Lock()
+        self._requests: Dict[Tuple[str, str], _RequestStats] = {}
+        self._spans: Dict[str, _Stats] = {}
+
+    def after_request(self, info: RequestInfo) -> None:
+        key = info.method, info.template
+        with self._lock:
+            stats = self._requests.get(key)
+            if stats is None:
+                stats = self._requests[key] = _RequestStats(self._buckets)
+            stats.latency.observe(info.elapsed)
+            stats.bytes_sent += info.bytes_sent
+            stats.bytes_received += info.bytes_received
+            if info.status is not None:
+                stats.statuses[info.status] = stats.statuses.get(info.status, 0) + 1
+            if info.error is not None or (info.status or 0) >= 500:
+                stats.errors += 1
+
+    def end_span(self, span: Span) -> None:
+        with self._lock:
+            stats = self._spans.get(span.name)
+            if stats is None:
+                stats = self._spans[span.name] = _Stats(self._buckets)
+            stats.latency.observe(span.elapsed)
+            if span.error is not None:
+                stats.errors += 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self._requests.clear()
+            self._spans.clear()
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(
+                requests={
+                    "{} {}".format(*key): stats.as_dict()
+                    for key, stats in sorted(self._requests.items())
+                },
+                spans={
+                    name: stats.as_dict() for name, stats in sorted(self._spans.items())
+                },
+            )
+
+    def prometheus(self, prefix: str = "sensu_go") -> str:
+        # Prometheus text exposition format.
+        lines = []
+        with self._lock:
+            requests = sorted(self._requests.items())
+            spans = sorted(self._spans.items())
+
+            name = prefix + "_request_duration_seconds"
+            lines.append("# TYPE {} histogram".format(name))
+            for (method, endpoint), stats in requests:
+                labels = _labels(method=method, endpoint=endpoint)
+                lines.extend(_histogram_lines(name, labels, stats.latency))
+
+            name = prefix + "_requests_total"
+            lines.append("# TYPE {} counter".format(name))
+            for (method, endpoint), stats in requests:
+                for status, count in sorted(stats.statuses.items()):
+                    labels = _labels(
+                        method=method, endpoint=endpoint, status=str(status)
+                    )
+                    lines.append("{}{{{}}} {}".format(name, labels, count))
+
+            for suffix, attr in (
+                ("_request_errors_total", "errors"),
+                ("_request_sent_bytes_total", "bytes_sent"),
+                ("_request_received_bytes_total", "bytes_received"),
+            ):
+                name = prefix + suffix
+                lines.append("# TYPE {} counter".format(name))
+                for (method, endpoint), stats in requests:
+                    labels = _labels(method=method, endpoint=endpoint)
+                    lines.append(
+                        "{}{{{}}} {}".format(name, labels, getattr(stats, attr))
+                    )
+
+            name = prefix + "_span_duration_seconds"
+            lines.append("# TYPE {} histogram".format(name))
+            for span_name, span_stats in spans:
+                labels = _labels(span=span_name)
+                lines.extend(_histogram_lines(name, labels, span_stats.latency))
+
+            name = prefix + "_span_errors_total"
+            lines.append("# TYPE {} counter".format(name))
+            for span_name, span_stats in spans:
+                labels = _labels(span=span_name)
+                lines.append("{}{{{}}} {}".format(name, labels, span_stats.errors))
+
+        return "\n".join(lines) + "\n"
+
+
+def _histogram_lines(name: str, labels: str, histogram: Histogram) -> List[str]:
+    lines = [
+        '{}_bucket{{{},le="{}"}} {}'.format(name, labels, _format_bound(bound), total)
+        for bound, total in histogram.cumulative()
+    ]
+    lines.append("{}_sum{{{}}} {}".format(name, labels, histogram.sum))
+    lines.append("{}_count{{{}}} {}".format(name, labels, histogram.count))
+    return lines
@@ -0,0 +1,96 @@
+# Copyright (c) 2021 XLAB Steampunk
+
+import hashlib
+import threading
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from sensu_go.clients.http.base import HTTPClient
+from sensu_go.typing import Address
+
+
+def _freeze(value: Any) -> Hashable:
+    # Options such as request hooks come in lists, which are not hashable. Other
+    # unhashable options are compared by identity.
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, Hashable):
+        return value
+    return ("id", id(value))
+
+
+def client_key(
+    address: Address,
+    api_key: Optional[str],
+    username: Optional[str],
+    password: Optional[str],
+    verify: bool,
+    ca_path: Optional[str],
+    **kwargs: Any,
+) -> Hashable:
+    # We do not keep credentials in keys, only their digest.
+    addresses = [address] if isinstance(address, str) else list(address)
+    secret = "{}\0{}\0{}".format(api_key or "", username or "", password or "")
+    return (
+        tuple(a.rstrip("/") for a in addresses),
+        hashlib.sha256(secret.encode()).hexdigest(),
+        verify,
+        ca_path,
+        _freeze(kwargs),
+    )
+
+
+class ClientRegistry:
+    # Hands out the same HTTP client to everyone who asks for a client with the
+    # same address, credentials, and settings. Clients share the connection pool
+    # and the access token, which means that the number of connections and logins
+    # does not grow with the number of places that create a client. Each acquire
+    # must be paired with a release, and the last release closes the client.
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._clients: Dict[Hashable, HTTPClient] = {}
+        self._refs: Dict[int, Tuple[Hashable, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+    def acquire(self, key: Hashable, factory: Callable[[], HTTPClient]) -> HTTPClient:
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                client = self._clients[key] = factory()
+                self._refs[id(client)] = key, 0
+            key, refs = self._refs[id(client)]
+            self._refs[id(client)] = key, refs + 1
+            return client
+
+    def release(self, client: HTTPClient) -> None:
+        with self._lock:
+            if id(client) not in self._refs:
+                raise ValueError("Client is not registered.")
+            key, refs = self._refs[id(client)]
+            if refs > 1:
+                self._refs[id(client)] = key, refs - 1
+                return
+            del self._refs[id(client)]
+            del self._clients[key]
+        client.close()
+
+    def references(self, client: HTTPClient) -> int:
+        with self._lock:
+            return self._refs.get(id(client), (None, 0))[1]
+
+    def close(self) -> None:
+        # Closes all clients regardless of their reference counts. Useful at
+        # shutdown and in tests.
+        with self._lock:
+            clients: List[HTTPClient] = list(self._clients.values())
+            self._clients.clear()
+            self._refs.clear()
+        for client in clients:
+            client.close()
+
+
+# Registry that Client(..., shared=True) uses.
+default_registry = ClientRegistry()
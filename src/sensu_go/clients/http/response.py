@@ -0,0 +1,222 @@
+# Copyright (c) 2020 XLAB Steampunk
+
+import copy
+from typing import cast, Dict, Generator, Iterator, Optional
+
+import requests
+import urllib3
+
+try:
+    import httpx
+
+    HAS_HTTPX = True
+except ImportError:
+    HAS_HTTPX = False
+
+from sensu_go.clients.http.codec import Codec, StdlibCodec
+from sensu_go.clients.http.json_stream import CHUNK_SIZE, iter_array, iter_chunks
+from sensu_go.errors import HTTPError, RequestTimeoutError, ResponseError
+from sensu_go.typing import JSON
+
+
+def is_read_timeout(error: requests.exceptions.RequestException) -> bool:
+    # Read timeouts that happen while requests reads the body come wrapped in a
+    # ConnectionError.
+    return isinstance(error, requests.exceptions.Timeout) or any(
+        isinstance(arg, urllib3.exceptions.ReadTimeoutError) for arg in error.args
+    )
+
+
+def _received_bytes(response: requests.Response, size: int) -> int:
+    # The underlying urllib3 response knows how many (possibly compressed) bytes
+    # we read from the socket.
+    try:
+        return int(response.raw.tell())
+    except (AttributeError, TypeError, ValueError):
+        return size
+
+
+class Response:
+    # Responses can be big (think event lists with lengthy check outputs), so we
+    # keep the raw body around and only decode it or parse it when (and if)
+    # someone asks for it. Same goes for the headers. Streamed responses go one
+    # step further and leave the body on the connection until someone reads it.
+    def __init__(
+        self,
+        response: requests.Response,
+        codec: Codec = StdlibCodec(),
+        stream: bool = False,
+    ) -> None:
+        self.url = response.url
+        self.status = response.status_code
+
+        self._codec = codec
+        self._encoding = response.encoding
+        self._raw_headers = response.headers
+
+        self._stream: Optional[requests.Response] = response
+        self._content: Optional[bytes] = None
+        # Size of the decoded body and the number of bytes that we received.
+        # Streamed responses only know them once we read the whole body.
+        self.size: Optional[int] = None
+        self.received_bytes = 0
+        if not stream:
+            self._load()
+
+        self._text: str
+        self._headers: Dict[str, str]
+        self._json: JSON
+
+    def _read(self) -> bytes:
+        return cast(requests.Response, self._stream).content
+
+    def _read_chunks(self, chunk_size: int) -> Iterator[bytes]:
+        try:
+            yield from cast(requests.Response, self._stream).iter_content(chunk_size)
+        except requests.exceptions.RequestException as e:
+            if is_read_timeout(e):
+                raise RequestTimeoutError("Reading {} timed out".format(self.url))
+            raise HTTPError("Reading {} failed".format(self.url))
+
+    def _count_received(self) -> int:
+        return _received_bytes(cast(requests.Response, self._stream), self.size or 0)
+
+    def _load(self) -> None:
+        self._content = self._read()
+        self.size = len(self._content)
+        self.received_bytes = self._count_received()
+        self._stream = None
+
+    @property
+    def content(self) -> bytes:
+        # Reads the rest of a streamed body. We cannot do that once
+        # iter_json_array started reading it.
+        if self._content is None:
+            self._load()
+        return cast(bytes, self._content)
+
+    def close(self) -> None:
+        # Returns the connection of a streamed response that we do not want to
+        # read to the pool.
+        if self._stream is not None:
+            self._stream.close()
+
+    @property
+    def text(self) -> str:
+        if not hasattr(self, "_text"):
+            self._text = self.content.decode(self._encoding or "utf-8", "replace")
+        return self._text
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        if not hasattr(self, "_headers"):
+            self._headers = dict(self._raw_headers.lower_items())
+        return self._headers
+
+    @property
+    def json(self) -> JSON:
+        if not hasattr(self, "_json"):
+            try:
+                # JSON decoders can handle bytes directly, which saves us from
+                # creating a decoded copy of the body.
+                self._json = self._codec.loads(self.content)
+            except ValueError:
+                raise ResponseError(
+                    "Cannot decode response", self.url, self.status, self.text
+                )
+        return self._json
+
+    def copy(self) -> "Response":
+        # Shares the raw body, but not the parsed JSON. Resources modify their
+        # data in place, so each caller needs its own copy of it.
+        response = copy.copy(self)
+        if hasattr(self, "_json"):
+            response._json = copy.deepcopy(self._json)
+        return response
+
+    def iter_json_array(
+        self, chunk_size: int = CHUNK_SIZE
+    ) -> Generator[JSON, None, None]:
+        # Parses the body chunk by chunk and yields array elements one at a time,
+        # which means that we never hold more than one of them in memory. Bodies
+        # of streamed responses are read from the connection as we go, so we do
+        # not hold the whole body either. Unlike the json property, this bypasses
+        # the codec and does not cache results.
+        if self._content is not None:
+            try:
+                yield from iter_array(iter_chunks(self._content, chunk_size))
+            except ValueError:
+                raise ResponseError(
+                    "Cannot decode response", self.url, self.status, self.text
+                )
+            return
+
+        size = 0
+
+        def chunks() -> Iterator[bytes]:
+            nonlocal size
+            for chunk in self._read_chunks(chunk_size):
+                size += len(chunk)
+                yield chunk
+
+        try:
+            yield from iter_array(chunks())
+        except ValueError:
+            # Text that we already parsed is gone.
+            raise ResponseError(
+                "Cannot decode streamed response", self.url, self.status, ""
+            )
+        finally:
+            self.close()
+        self.size = size
+        self.received_bytes = self._count_received()
+
+    def __str__(self) -> str:
+        return "[{}] {} ({})".format(self.status, self.text, self.headers)
+
+
+class HTTPXResponse(Response):
+    # httpx responses carry the same information as the requests ones, but store
+    # it in slightly different places.
+    def __init__(
+        self,
+        response: "httpx.Response",
+        codec: Codec = StdlibCodec(),
+        stream: bool = False,
+    ) -> None:
+        self.url = str(response.url)
+        self.status = response.status_code
+
+        self._codec = codec
+        self._encoding = response.encoding
+        self._httpx_headers = response.headers
+
+        self._httpx_stream = response
+        self._content = None
+        self.size = None
+        self.received_bytes = 0
+        if not stream:
+            self._load()
+
+    def _read(self) -> bytes:
+        return self._httpx_stream.read()
+
+    def _read_chunks(self, chunk_size: int) -> Iterator[bytes]:
+        try:
+            yield from self._httpx_stream.iter_bytes(chunk_size)
+        except httpx.TimeoutException:
+            raise RequestTimeoutError("Reading {} timed out".format(self.url))
+        except httpx.HTTPError:
+            raise HTTPError("Reading {} failed".format(self.url))
+
+    def _count_received(self) -> int:
+        return self._httpx_stream.num_bytes_downloaded
+
+    def close(self) -> None:
+        self._httpx_stream.close()
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        if not hasattr(self, "_headers"):
+            self._headers = {k.lower(): v for k, v in self._httpx_headers.items()}
+        return self._headers
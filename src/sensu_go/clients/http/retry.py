@@ -0,0 +1,137 @@
+# Copyright (c) 2021 XLAB Steampunk
+
+import email.utils
+import random
+import threading
+import time
+from typing import Collection, Optional
+
+from sensu_go.errors import CircuitOpenError
+
+# Methods that we can safely send more than once because repeating them does not
+# change the outcome.
+IDEMPOTENT_METHODS = frozenset(("GET", "HEAD", "OPTIONS", "PUT", "DELETE"))
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    # Retry-After header can contain either the number of seconds or a date.
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        date = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, date.timestamp() - time.time())
+
+
+class RetryPolicy:
+    def __init__(
+        self,
+        total: int = 3,
+        backoff_factor: float = 0.5,
+        max_backoff: float = 30.0,
+        jitter: bool = True,
+        status_forcelist: Collection[int] = (429, 502, 503, 504),
+        non_idempotent_status_forcelist: Collection[int] = (429,),
+        retry_non_idempotent_errors: bool = False,
+        respect_retry_after: bool = True,
+    ) -> None:
+        # Idempotent requests are retried on connection errors and on all
+        # statuses from the status_forcelist. Non-idempotent requests (POST, for
+        # example) are only retried on statuses that guarantee the backend did not
+        # process the request and, if explicitly enabled, on connection errors.
+        self.total = total
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.status_forcelist = frozenset(status_forcelist)
+        self.non_idempotent_status_forcelist = frozenset(
+            non_idempotent_status_forcelist
+        )
+        self.retry_non_idempotent_errors = retry_non_idempotent_errors
+        self.respect_retry_after = respect_retry_after
+
+    def should_retry_error(self, method: str, attempt: int) -> bool:
+        if attempt >= self.total:
+            return False
+        return method in IDEMPOTENT_METHODS or self.retry_non_idempotent_errors
+
+    def should_retry_status(self, method: str, status: int, attempt: int) -> bool:
+        if attempt >= self.total:
+            return False
+        if method in IDEMPOTENT_METHODS:
+            return status in self.status_forcelist
+        return status in self.non_idempotent_status_forcelist
+
+    def get_backoff(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        if self.respect_retry_after:
+            delay = parse_retry_after(retry_after)
+            if delay is not None:
+                return min(delay, self.max_backoff)
+
+        # Exponential backoff with full jitter spreads retries of many clients
+        # that failed at the same time.
+        backoff = min(self.backoff_factor * pow(2.0, attempt), self.max_backoff)
+        if self.jitter:
+            return random.uniform(0, backoff)
+        return backoff
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0) -> None:
+        # After failure_threshold consecutive failures, the breaker opens and
+        # rejects all requests for reset_timeout seconds. After that, it lets a
+        # single trial request through and closes again if that request succeeds.
+        # Trials that do not report back within reset_timeout seconds do not
+        # count, and the breaker lets another one through.
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+
+    @property
+    def state(self) -> str:
+        return self._state
+
+    def before_request(self, url: str) -> None:
+        with self._lock:
+            if self._state == self.CLOSED:
+                return
+            # In the half-open state, _opened_at marks the start of the trial.
+            now = time.monotonic()
+            if now - self._opened_at >= self.reset_timeout:
+                self._state = self.HALF_OPEN
+                self._opened_at = now
+                return
+
+        raise CircuitOpenError(
+            "Backend at {} is unavailable, not sending request".format(url)
+        )
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if (
+                self._state == self.HALF_OPEN
+                or self._failures >= self.failure_threshold
+            ):
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
@@ -0,0 +1,112 @@
+# Copyright (c) 2021 XLAB Steampunk
+
+import abc
+import contextlib
+import hashlib
+import json
+import os
+import tempfile
+from typing import Any, ContextManager, Dict, Iterator, NamedTuple, Optional
+
+try:
+    import fcntl
+
+    HAS_FCNTL = True
+except ImportError:  # Windows
+    HAS_FCNTL = False
+
+
+class Tokens(NamedTuple):
+    access_token: str
+    refresh_token: str
+    # Unix timestamp. None means we do not know when the access token expires.
+    expires_at: Optional[float]
+
+
+class TokenCache(metaclass=abc.ABCMeta):
+    @abc.abstractmethod
+    def lock(self, address: str, username: str) -> ContextManager[None]:
+        pass
+
+    @abc.abstractmethod
+    def load(self, address: str, username: str) -> Optional[Tokens]:
+        pass
+
+    @abc.abstractmethod
+    def store(self, address: str, username: str, tokens: Tokens) -> None:
+        pass
+
+
+def _default_path() -> str:
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(cache_home, "sensu-go", "tokens.json")
+
+
+class FileTokenCache(TokenCache):
+    # Stores tokens in a JSON file that only the current user can read. Processes
+    # that share the cache serialize their logins using an exclusive lock on a
+    # separate lock file, which means that only one of them hits the /auth
+    # endpoint and the rest reuse its tokens.
+    def __init__(self, path: Optional[str] = None) -> None:
+        self.path = path or _default_path()
+
+    @staticmethod
+    def _key(address: str, username: str) -> str:
+        return hashlib.sha256("{}\0{}".format(address, username).encode()).hexdigest()
+
+    def _ensure_dir(self) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), 0o700, exist_ok=True)
+
+    @contextlib.contextmanager
+    def lock(self, address: str, username: str) -> Iterator[None]:
+        self._ensure_dir()
+        fd = os.open(self.path + ".lock", os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            if HAS_FCNTL:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            # Closing the file descriptor also releases the lock.
+            os.close(fd)
+
+    def _read(self) -> Dict[str, Any]:
+        try:
+            with open(self.path) as fd:
+                data = json.load(fd)
+        except (OSError, ValueError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def load(self, address: str, username: str) -> Optional[Tokens]:
+        entry = self._read().get(self._key(address, username))
+        if not isinstance(entry, dict):
+            return None
+
+        try:
+            expires_at = entry.get("expires_at")
+            return Tokens(
+                str(entry["access_token"]),
+                str(entry["refresh_token"]),
+                None if expires_at is None else float(expires_at),
+            )
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    def store(self, address: str, username: str, tokens: Tokens) -> None:
+        self._ensure_dir()
+        data = self._read()
+        data[self._key(address, username)] = tokens._asdict()
+
+        # Write to a temporary file first and then move it into place so that
+        # readers never see a partially written cache.
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.path)))
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(data, f)
+            os.chmod(tmp_path, 0o600)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
@@ -0,0 +1,187 @@
+# Copyright (c) 2021 XLAB Steampunk
+
+import contextlib
+import contextvars
+import os
+import re
+import time
+from typing import Any, Callable, Dict, Iterator, NamedTuple, Optional
+
+from sensu_go.clients.http.hooks import RequestHook, RequestInfo, Span
+
+_TRACEPARENT_RE = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+
+class SpanContext(NamedTuple):
+    trace_id: str
+    span_id: str
+    sampled: bool = True
+
+    @property
+    def traceparent(self) -> str:
+        # W3C Trace Context header value.
+        return "00-{}-{}-{}".format(
+            self.trace_id, self.span_id, "01" if self.sampled else "00"
+        )
+
+    @classmethod
+    def from_traceparent(cls, value: str) -> Optional["SpanContext"]:
+        match = _TRACEPARENT_RE.match(value.strip().lower())
+        if not match:
+            return None
+        trace_id, span_id, flags = match.groups()
+        if trace_id == "0" * 32 or span_id == "0" * 16:
+            return None
+        return cls(trace_id, span_id, bool(int(flags, 16) & 1))
+
+
+_current: "contextvars.ContextVar[Optional[SpanContext]]" = contextvars.ContextVar(
+    "sensu_go_span_context", default=None
+)
+
+
+def current_context() -> Optional[SpanContext]:
+    return _current.get()
+
+
+@contextlib.contextmanager
+def remote_parent(traceparent: Optional[str]) -> Iterator[Optional[SpanContext]]:
+    # Continues the trace that some other service started (the one that sent us
+    # a request with this traceparent header, for example). Invalid headers are
+    # ignored and start a new trace.
+    context = SpanContext.from_traceparent(traceparent) if traceparent else None
+    token = _current.set(context)
+    try:
+        yield context
+    finally:
+        _current.reset(token)
+
+
+class TraceSpan:
+    # Span that the TracingHook hands over to the exporter once it is over.
+    def __init__(
+        self,
+        name: str,
+        kind: str,
+        context: SpanContext,
+        parent_id: Optional[str],
+        attributes: Dict[str, Any],
+    ) -> None:
+        self.name = name
+        self.kind = kind  # internal for operations, client for requests
+        self.context = context
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.start_time = time.time()
+        self.duration = 0.0
+        self.error: Optional[BaseException] = None
+
+    def __repr__(self) -> str:
+        return "TraceSpan({}, {})".format(self.name, self.context.span_id)
+
+
+class TracingHook(RequestHook):
+    # Traces high-level operations and the requests that they send. Each request
+    # carries a traceparent header, which allows us to tie slow backend calls to
+    # our own traces. Finished spans that are sampled go to the exporter.
+    def __init__(self, exporter: Callable[[TraceSpan], None]) -> None:
+        self.exporter = exporter
+
+    @staticmethod
+    def _start(name: str, kind: str, attributes: Dict[str, Any]) -> TraceSpan:
+        parent = _current.get()
+        span_id = os.urandom(8).hex()
+        if parent is None:
+            return TraceSpan(
+                name, kind, SpanContext(os.urandom(16).hex(), span_id), None, attributes
+            )
+        return TraceSpan(
+            name,
+            kind,
+            SpanContext(parent.trace_id, span_id, parent.sampled),
+            parent.span_id,
+            attributes,
+        )
+
+    def _finish(
+        self, span: TraceSpan, duration: float, error: Optional[BaseException]
+    ) -> None:
+        span.duration = duration
+        span.error = error
+        if span.context.sampled:
+            self.exporter(span)
+
+    def start_span(self, span: Span) -> None:
+        trace_span = self._start(span.name, "internal", dict(span.attributes))
+        span.hook_data[self] = trace_span, _current.set(trace_span.context)
+
+    def end_span(self, span: Span) -> None:
+        trace_span, token = span.hook_data.pop(self)
+        _current.reset(token)
+        self._finish(trace_span, span.elapsed, span.error)
+
+    def before_request(self, info: RequestInfo) -> None:
+        trace_span = self._start(
+            "{} {}".format(info.method, info.template),
+            "client",
+            {"http.method": info.method, "http.target": info.path},
+        )
+        info.headers["traceparent"] = trace_span.context.traceparent
+        info.hook_data[self] = trace_span
+
+    def after_request(self, info: RequestInfo) -> None:
+        trace_span = info.hook_data.pop(self)
+        if info.status is not None:
+            trace_span.attributes["http.status_code"] = info.status
+        self._finish(trace_span, info.elapsed, info.error)
+
+
+class OpenTelemetryHook(RequestHook):
+    # Bridge to OpenTelemetry for applications that already use it. We import the
+    # API lazily so that sensu_go does not depend on it.
+    def __init__(self, tracer_provider: Any = None) -> None:
+        try:
+            from opentelemetry import context, propagate, trace
+        except ImportError:
+            raise ImportError(
+                "OpenTelemetry bridge requires opentelemetry-api. Install it by "
+                "running pip install sensu-go[opentelemetry]."
+            )
+
+        self._context = context
+        self._propagate = propagate
+        self._trace = trace
+        self._tracer = trace.get_tracer("sensu_go", tracer_provider=tracer_provider)
+
+    def _end(self, otel_span: Any, error: Optional[BaseException]) -> None:
+        if error is not None:
+            otel_span.record_exception(error)
+            otel_span.set_status(self._trace.Status(self._trace.StatusCode.ERROR))
+        otel_span.end()
+
+    def start_span(self, span: Span) -> None:
+        otel_span = self._tracer.start_span(span.name, attributes=span.attributes)
+        token = self._context.attach(self._trace.set_span_in_context(otel_span))
+        span.hook_data[self] = otel_span, token
+
+    def end_span(self, span: Span) -> None:
+        otel_span, token = span.hook_data.pop(self)
+        self._context.detach(token)
+        self._end(otel_span, span.error)
+
+    def before_request(self, info: RequestInfo) -> None:
+        otel_span = self._tracer.start_span(
+            "{} {}".format(info.method, info.template),
+            kind=self._trace.SpanKind.CLIENT,
+            attributes={"http.method": info.method, "http.target": info.path},
+        )
+        self._propagate.inject(
+            info.headers, context=self._trace.set_span_in_context(otel_span)
+        )
+        info.hook_data[self] = otel_span
+
+    def after_request(self, info: RequestInfo) -> None:
+        otel_span = info.hook_data.pop(self)
+        if info.status is not None:
+            otel_span.set_attribute("http.status_code", info.status)
+        self._end(otel_span, info.error)
@@ -0,0 +1,194 @@
+# Copyright (c) 2021 XLAB Steampunk
+
+import abc
+import ssl
+from typing import Dict, Optional, Tuple, Union
+
+import requests
+
+try:
+    import httpx
+
+    HAS_HTTPX = True
+except ImportError:
+    HAS_HTTPX = False
+
+try:
+    import h2  # noqa: F401
+
+    HAS_H2 = True
+except ImportError:
+    HAS_H2 = False
+
+from sensu_go.clients.http.codec import Codec
+from sensu_go.clients.http.deadline import Timeout
+from sensu_go.clients.http.response import HTTPXResponse, is_read_timeout, Response
+from sensu_go.errors import HTTPError, RequestTimeoutError
+
+
+class Transport(metaclass=abc.ABCMeta):
+    # Transport sends a single request over the wire and converts any connection
+    # problems into our own errors. Everything else (authentication, retries,
+    # caching, ...) lives in the HTTPClient.
+    @abc.abstractmethod
+    def send(
+        self,
+        method: str,
+        url: str,
+        *,
+        data: Optional[bytes],
+        headers: Dict[str, str],
+        query: Optional[Dict[str, str]],
+        auth: Optional[Tuple[str, str]],
+        timeout: Timeout,
+        codec: Codec,
+        stream: bool = False,
+    ) -> Response:
+        # Streamed responses leave the body on the connection until the caller
+        # reads it.
+        pass
+
+    def close_idle_connections(self) -> None:
+        # Transports that cannot detect stale connections themselves should drop
+        # their pooled connections here.
+        pass
+
+    @abc.abstractmethod
+    def close(self) -> None:
+        pass
+
+
+class RequestsTransport(Transport):
+    # Default transport that opens a separate HTTP/1.1 connection for each request
+    # that is in flight and keeps a pool of them around for reuse.
+    def __init__(
+        self,
+        verify: Union[bool, str] = True,
+        *,
+        pool_connections: int = 10,
+        pool_maxsize: int = 10,
+        pool_block: bool = False,
+    ) -> None:
+        self.session = requests.Session()
+        self.session.verify = verify
+
+        # pool_connections is the number of per-host pools that we keep around,
+        # pool_maxsize is the number of connections that we keep open to each
+        # host, and pool_block makes threads wait for a free connection instead
+        # of opening (and later discarding) an extra one.
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def send(
+        self,
+        method: str,
+        url: str,
+        *,
+        data: Optional[bytes],
+        headers: Dict[str, str],
+        query: Optional[Dict[str, str]],
+        auth: Optional[Tuple[str, str]],
+        timeout: Timeout,
+        codec: Codec,
+        stream: bool = False,
+    ) -> Response:
+        try:
+            raw = self.session.request(
+                method,
+                url,
+                data=data,
+                headers=headers,
+                params=query,
+                auth=auth,
+                timeout=timeout,
+                stream=stream,
+            )
+        # Other errors include connections that break while we read the body.
+        except requests.exceptions.RequestException as e:
+            if is_read_timeout(e):
+                raise RequestTimeoutError("{} {} timed out".format(method, url))
+            raise HTTPError("{} {} failed".format(method, url))
+        return Response(raw, codec, stream)
+
+    def close_idle_connections(self) -> None:
+        for adapter in self.session.adapters.values():
+            adapter.close()
+
+    def close(self) -> None:
+        self.session.close()
+
+
+def httpx_verify(verify: Union[bool, str]) -> Union[bool, ssl.SSLContext]:
+    # Newer httpx versions only accept CA bundles wrapped in an SSL context.
+    if isinstance(verify, str):
+        return ssl.create_default_context(cafile=verify)
+    return verify
+
+
+def _httpx_timeout(timeout: Timeout) -> "httpx.Timeout":
+    if isinstance(timeout, tuple):
+        return httpx.Timeout(timeout[1], connect=timeout[0])
+    return httpx.Timeout(timeout)
+
+
+class HTTP2Transport(Transport):
+    # Multiplexes concurrent requests over a single HTTP/2 connection, which saves
+    # us TLS handshakes and file descriptors when many threads share the client.
+    # Falls back to HTTP/1.1 if the backend does not support HTTP/2.
+    def __init__(
+        self,
+        verify: Union[bool, str] = True,
+        *,
+        max_connections: Optional[int] = None,
+        keepalive_expiry: Optional[float] = 5.0,
+    ) -> None:
+        if not (HAS_HTTPX and HAS_H2):
+            raise ImportError(
+                "HTTP/2 transport requires httpx and h2. Install them by running "
+                "pip install sensu-go[http2]."
+            )
+
+        self.session = httpx.Client(
+            verify=httpx_verify(verify),
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=max_connections, keepalive_expiry=keepalive_expiry
+            ),
+        )
+
+    def send(
+        self,
+        method: str,
+        url: str,
+        *,
+        data: Optional[bytes],
+        headers: Dict[str, str],
+        query: Optional[Dict[str, str]],
+        auth: Optional[Tuple[str, str]],
+        timeout: Timeout,
+        codec: Codec,
+        stream: bool = False,
+    ) -> Response:
+        request = self.session.build_request(
+            method,
+            url,
+            content=data,
+            headers=headers,
+            params=query,
+            timeout=_httpx_timeout(timeout),
+        )
+        try:
+            raw = self.session.send(request, auth=auth, stream=stream)
+        except httpx.TimeoutException:
+            raise RequestTimeoutError("{} {} timed out".format(method, url))
+        except httpx.TransportError:
+            raise HTTPError("{} {} failed".format(method, url))
+        return HTTPXResponse(raw, codec, stream)
+
+    def close(self) -> None:
+        self.session.close()
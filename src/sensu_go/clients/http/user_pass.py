@@ -1,59 +1,223 @@
 # Copyright (c) 2020 XLAB Steampunk
 
-from typing import cast, Optional
+import asyncio
+import base64
+import json
+import threading
+import time
+from typing import cast, Any, Optional
 
 from sensu_go import errors
-from sensu_go.clients.http.base import HTTPClient
-from sensu_go.typing import JSONItem
+from sensu_go.clients.http.base import AsyncHTTPClient, HTTPClient
+from sensu_go.clients.http.response import Response
+from sensu_go.clients.http.token_cache import TokenCache, Tokens
+from sensu_go.typing import Address, JSONItem
 
 
-class UserPassClient(HTTPClient):
+def _jwt_expiry(token: str) -> Optional[float]:
+    # We do not verify the token here (that is backend's job), we only peek into
+    # its payload to find out when it expires.
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        return float(json.loads(base64.urlsafe_b64decode(payload))["exp"])
+    except (IndexError, KeyError, TypeError, ValueError):
+        return None
+
+
+def _parse_tokens(resp: Response) -> Tokens:
+    if resp.status != 200:
+        raise errors.AuthError(
+            "Authentication failed. Verify your credentials.",
+            resp.url,
+            resp.status,
+            resp.text,
+        )
+
+    try:
+        tokens = cast(JSONItem, resp.json)
+        access_token = cast(str, tokens["access_token"])
+        refresh_token = cast(str, tokens["refresh_token"])
+    except KeyError:
+        raise errors.AuthError(
+            "Authentication call did not return required tokens",
+            resp.url,
+            resp.status,
+            resp.text,
+        )
+
+    expires_at = tokens.get("expires_at")
+    if isinstance(expires_at, (int, float)) and expires_at > 0:
+        return Tokens(access_token, refresh_token, float(expires_at))
+    return Tokens(access_token, refresh_token, _jwt_expiry(access_token))
+
+
+class _TokenState:
+    # Token bookkeeping that is shared between the synchronous and asynchronous
+    # clients. Subclasses take care of the locking.
+    def __init__(self, refresh_margin: float) -> None:
+        self._refresh_margin = refresh_margin
+        self._tokens: Optional[Tokens] = None
+        self._auth_header_value: Optional[str] = None
+
+    def _needs_renewal(self) -> bool:
+        if self._tokens is None:
+            return True
+        if self._tokens.expires_at is None:
+            return False
+        return time.time() >= self._tokens.expires_at - self._refresh_margin
+
+    def _set_tokens(self, tokens: Tokens) -> None:
+        self._tokens = tokens
+        self._auth_header_value = "Bearer " + tokens.access_token
+
+
+class UserPassClient(_TokenState, HTTPClient):
     def __init__(
         self,
-        address: str,
+        address: Address,
         username: str,
         password: str,
         verify: bool = True,
         ca_path: Optional[str] = None,
+        *,
+        refresh_margin: float = 30.0,
+        token_cache: Optional[TokenCache] = None,
+        **kwargs: Any,
     ) -> None:
-        super().__init__(address, verify, ca_path)
+        HTTPClient.__init__(self, address, verify, ca_path, **kwargs)
+        # We renew the access token refresh_margin seconds before it expires.
+        _TokenState.__init__(self, refresh_margin)
 
         self._username = username
         self._password = password
 
-        self._access_token: str
-        self._refresh_token: str
-        self._auth_header_value: str
+        # Token cache allows short-lived processes to reuse tokens instead of
+        # logging in every time they start.
+        self._token_cache = token_cache
+
+        # Lock makes sure threads that share the client do not log in (or refresh
+        # the token) more than once.
+        self._login_lock = threading.Lock()
 
     @property
     def auth_header_value(self) -> str:
-        if not hasattr(self, "_auth_header_value"):
-            self._login()
-            self._auth_header_value = "Bearer " + self._access_token
-        return self._auth_header_value
+        if self._needs_renewal():
+            with self._login_lock:
+                if self._needs_renewal():
+                    self._renew()
+        return cast(str, self._auth_header_value)
+
+    def _reauthenticate(self, stale_auth_header_value: str) -> bool:
+        with self._login_lock:
+            # Another thread might have already replaced the rejected token.
+            if self._auth_header_value == stale_auth_header_value:
+                self._renew()
+        return True
+
+    def _renew(self) -> None:
+        if self._token_cache is None:
+            self._set_tokens(self._obtain_tokens())
+            return
+
+        # Processes that share the cache take turns here, which means that only
+        # one of them talks to the backend while the rest reuse its tokens.
+        with self._token_cache.lock(self.address, self._username):
+            cached = self._token_cache.load(self.address, self._username)
+            # If the cached tokens are the ones we are trying to replace, they are
+            # of no use to us.
+            if cached and cached != self._tokens:
+                self._set_tokens(cached)
+                if not self._needs_renewal():
+                    return
 
-    def _login(self) -> None:
+            tokens = self._obtain_tokens()
+            self._token_cache.store(self.address, self._username, tokens)
+            self._set_tokens(tokens)
+
+    def _obtain_tokens(self) -> Tokens:
+        if self._tokens:
+            try:
+                return self._refresh()
+            except errors.AuthError:
+                pass  # Refresh token is not valid anymore, log in from scratch.
+        return self._login()
+
+    def _login(self) -> Tokens:
         auth = (self._username, self._password)
-        resp = self._request("GET", "/auth", auth=auth)
-
-        if resp.status != 200:
-            raise errors.AuthError(
-                "Authentication failed. Verify your credentials.",
-                resp.url,
-                resp.status,
-                resp.text,
-            )
-
-        try:
-            tokens = cast(JSONItem, resp.json)
-            self._access_token, self._refresh_token = (
-                cast(str, tokens["access_token"]),
-                cast(str, tokens["refresh_token"]),
-            )
-        except KeyError:
-            raise errors.AuthError(
-                "Authentication call did not return required tokens",
-                resp.url,
-                resp.status,
-                resp.text,
-            )
+        return _parse_tokens(self._request("GET", "/auth", auth=auth))
+
+    def _refresh(self) -> Tokens:
+        tokens = cast(Tokens, self._tokens)
+        resp = self._request(
+            "POST",
+            "/auth/token",
+            dict(refresh_token=tokens.refresh_token),
+            dict(Authorization="Bearer " + tokens.access_token),
+        )
+        return _parse_tokens(resp)
+
+
+class AsyncUserPassClient(_TokenState, AsyncHTTPClient):
+    def __init__(
+        self,
+        address: str,
+        username: str,
+        password: str,
+        verify: bool = True,
+        ca_path: Optional[str] = None,
+        *,
+        refresh_margin: float = 30.0,
+        **kwargs: Any,
+    ) -> None:
+        AsyncHTTPClient.__init__(self, address, verify, ca_path, **kwargs)
+        _TokenState.__init__(self, refresh_margin)
+
+        self._username = username
+        self._password = password
+
+        # Lock makes sure concurrent coroutines do not log in more than once. We
+        # create it lazily because older Python versions bind locks to the event
+        # loop that is current at creation time.
+        self._login_lock: Optional[asyncio.Lock] = None
+
+    def _get_login_lock(self) -> asyncio.Lock:
+        if self._login_lock is None:
+            self._login_lock = asyncio.Lock()
+        return self._login_lock
+
+    async def auth_header_value(self) -> str:
+        if self._needs_renewal():
+            async with self._get_login_lock():
+                if self._needs_renewal():
+                    await self._renew()
+        return cast(str, self._auth_header_value)
+
+    async def _reauthenticate(self, stale_auth_header_value: str) -> bool:
+        async with self._get_login_lock():
+            if self._auth_header_value == stale_auth_header_value:
+                await self._renew()
+        return True
+
+    async def _renew(self) -> None:
+        if self._tokens:
+            try:
+                self._set_tokens(await self._refresh())
+                return
+            except errors.AuthError:
+                pass
+        self._set_tokens(await self._login())
+
+    async def _login(self) -> Tokens:
+        auth = (self._username, self._password)
+        return _parse_tokens(await self._request("GET", "/auth", auth=auth))
+
+    async def _refresh(self) -> Tokens:
+        tokens = cast(Tokens, self._tokens)
+        resp = await self._request(
+            "POST",
+            "/auth/token",
+            dict(refresh_token=tokens.refresh_token),
+            dict(Authorization="Bearer " + tokens.access_token),
+        )
+        return _parse_tokens(resp)
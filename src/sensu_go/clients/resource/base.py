@@ -1,44 +1,403 @@
 # Copyright (c) 2020 XLAB Steampunk
 
-from typing import cast, Generator, Generic, Iterable, List, Optional, Type, TypeVar
+import contextlib
+import itertools
+import time
+from typing import (
+    cast,
+    Any,
+    AsyncGenerator,
+    AsyncIterable,
+    Dict,
+    Generator,
+    Generic,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Type,
+    TypeVar,
+)
 
-from sensu_go.clients.http.base import HTTPClient
-from sensu_go.errors import ResponseError
+from sensu_go.clients.http.base import AsyncHTTPClient, HTTPClient
+from sensu_go.clients.http.deadline import deadline, deadline_at
+from sensu_go.clients.http.retry import RetryPolicy
+from sensu_go.errors import HTTPError, ResponseError
+from sensu_go.clients.resource.checkpoint import Checkpoint, should_retry_page
 from sensu_go.clients.resource.operator import Operator
+from sensu_go.clients.resource.paging import (
+    AdaptivePageSize,
+    DEFAULT_PAGE_SIZE,
+    initial_page_size,
+    PageSize,
+    prefetch,
+)
+from sensu_go.clients.resource.projection import projection
 from sensu_go.resources.base import Resource
 from sensu_go.typing import JSONItem
 
 T = TypeVar("T", bound=Resource)
 
 
-class ResourceIter(Iterable[T]):
+def _build_query(
+    resource_class: Type[Resource],
+    label_selector: Optional[Operator],
+    field_selector: Optional[Operator],
+) -> Dict[str, str]:
+    query = {}
+    if label_selector:
+        query["labelSelector"] = label_selector.serialize()
+    if field_selector:
+        query["fieldSelector"] = field_selector.serialize(resource_class.FIELD_PREFIX)
+    return query
+
+
+def _adjust_limit(
+    page_size: PageSize,
+    query: Dict[str, str],
+    count: int,
+    elapsed: float,
+    size: int,
+) -> None:
+    if isinstance(page_size, AdaptivePageSize):
+        query["limit"] = str(
+            page_size.adjust(int(query["limit"]), count, elapsed, size)
+        )
+
+
+class _Page(NamedTuple):
+    token: str
+    limit: int
+    next_token: str
+    items: Iterable[JSONItem]
+
+
+class RawResourceIter(Iterable[JSONItem]):
+    # Lists resources the same way ResourceIter does, but yields items as the API
+    # returns them and skips constructing resource objects. If we pass a list of
+    # fields, items only contain those.
     def __init__(
         self,
-        resource_class: Type[T],
+        resource_class: Type[Resource],
         client: HTTPClient,
         path: str,
         label_selector: Optional[Operator] = None,
         field_selector: Optional[Operator] = None,
+        timeout: Optional[float] = None,
+        page_size: PageSize = DEFAULT_PAGE_SIZE,
+        prefetch: int = 0,
+        stream: bool = False,
+        fields: Optional[Iterable[str]] = None,
+        page_retry: Optional[RetryPolicy] = None,
     ) -> None:
         self._resource_class = resource_class
         self._client = client
         self._path = path
 
-        self._limit = 100
+        self._page_size = page_size
+        # Time budget for the whole traversal, not for a single page.
+        self._timeout = timeout
+        # Number of pages that we fetch in the background while the caller
+        # processes the current one. Zero means we only fetch pages on demand.
+        if prefetch < 0:
+            raise ValueError("Number of prefetched pages cannot be negative.")
+        self._prefetch = prefetch
+        # Streaming reads and parses pages incrementally and only keeps the
+        # resource that the caller is looking at in memory instead of the whole
+        # page. Pages come in whole if the client caches responses.
+        self._stream = stream
+        # Failed pages are fetched again from the last checkpoint. This is on
+        # top of the retries that the HTTP client does for each request and also
+        # covers connections that break while we stream the page.
+        self._page_retry = page_retry
+
+        self._project = None if fields is None else projection(fields)
 
-        self._query = {}
-        if label_selector:
-            self._query["labelSelector"] = label_selector.serialize()
-        if field_selector:
-            self._query["fieldSelector"] = field_selector.serialize(
-                self._resource_class.FIELD_PREFIX
+        query = _build_query(resource_class, label_selector, field_selector)
+        self._restore(
+            Checkpoint(
+                path,
+                initial_page_size(page_size),
+                query.get("labelSelector", ""),
+                query.get("fieldSelector", ""),
             )
+        )
+
+    @classmethod
+    def from_checkpoint(
+        cls,
+        resource_class: Type[Resource],
+        client: HTTPClient,
+        checkpoint: Checkpoint,
+        timeout: Optional[float] = None,
+        page_size: Optional[PageSize] = None,
+        prefetch: int = 0,
+        stream: bool = False,
+        fields: Optional[Iterable[str]] = None,
+        page_retry: Optional[RetryPolicy] = None,
+    ) -> "RawResourceIter":
+        items = cls(
+            resource_class,
+            client,
+            checkpoint.path,
+            timeout=timeout,
+            page_size=checkpoint.limit if page_size is None else page_size,
+            prefetch=prefetch,
+            stream=stream,
+            fields=fields,
+            page_retry=page_retry,
+        )
+        items._restore(checkpoint)
+        return items
+
+    def _restore(self, checkpoint: Checkpoint) -> None:
+        self._query = checkpoint.query()
+        self._start = checkpoint
+        # Position of the last (or current) traversal. Iterating again starts
+        # from the beginning (or from the checkpoint that we started from).
+        self.checkpoint = checkpoint
+
+    def _pages(
+        self, start: Checkpoint, max_items: Optional[int], at: Optional[float]
+    ) -> Generator[_Page, None, None]:
+        query = dict(self._query, limit=str(start.limit))
+        if start.token:
+            query["continue"] = start.token
+        if max_items is not None:
+            # We will skip the items that the caller already got.
+            max_items += start.offset
+
+        while True:
+            # If we only need a few more items, we do not ask for a full page.
+            limit = query["limit"]
+            if max_items is not None:
+                limit = str(min(int(limit), max_items))
+
+            # We cannot keep the deadline active across yields because the caller
+            # would see it as well, so we only apply it to the page requests.
+            with deadline_at(at), self._client.span(
+                "ResourceIter.page", path=self._path
+            ):
+                start_time = time.monotonic()
+                resp = self._client.get(
+                    self._path, query=dict(query, limit=limit), stream=self._stream
+                )
+                elapsed = time.monotonic() - start_time
+                if resp.status != 200:
+                    raise ResponseError(
+                        "Expected 200 when listing resources",
+                        resp.url,
+                        resp.status,
+                        resp.text,
+                    )
+
+                data: Iterable[JSONItem]
+                if self._stream:
+                    data = cast(Iterable[JSONItem], resp.iter_json_array())
+                else:
+                    # TODO: Add check for invalid JSON
+                    data = cast(List[JSONItem], resp.json)
+            next_token = resp.headers.get("sensu-continue", "")
+            yield _Page(query.get("continue", ""), int(limit), next_token, data)
+
+            query["continue"] = next_token
+            if not query["continue"]:
+                break
+            # Streamed pages do not know their length, but pages with a continue
+            # token are full.
+            count = int(limit) if self._stream else len(cast(List[Any], data))
+            if max_items is not None:
+                max_items -= count
+                if max_items <= 0:
+                    break
+            # Shortened pages tell us nothing about the right page size. Streamed
+            # pages only know their size once the caller read them, which is not
+            # the case yet if we prefetch pages.
+            if limit == query["limit"] and resp.size is not None:
+                _adjust_limit(self._page_size, query, count, elapsed, resp.size)
+
+    def _iter(self, max_items: Optional[int] = None) -> Generator[JSONItem, None, None]:
+        at = None if self._timeout is None else time.monotonic() + self._timeout
+        self.checkpoint = self._start
+        attempt = 0
+        # Projecting the items as they come in means that only the fields we want
+        # outlive the (streamed) page.
+        project = self._project or (lambda item: item)
+
+        while not self.checkpoint.complete:
+            start = self.checkpoint
+            pages = self._pages(start, max_items, at)
+            if self._prefetch:
+                pages = prefetch(pages, self._prefetch)
+
+            try:
+                # Closing the pages explicitly stops the background fetching as
+                # soon as the caller stops iterating.
+                with contextlib.closing(pages):
+                    for page in pages:
+                        checkpoint = self.checkpoint._replace(
+                            token=page.token, limit=page.limit
+                        )
+                        items = itertools.islice(page.items, checkpoint.offset, None)
+                        for item in items:
+                            attempt = 0
+                            checkpoint = checkpoint._replace(
+                                offset=checkpoint.offset + 1
+                            )
+                            self.checkpoint = checkpoint
+                            if max_items is not None:
+                                max_items -= 1
+                            yield project(item)
+                        self.checkpoint = checkpoint._replace(
+                            token=page.next_token,
+                            offset=0,
+                            complete=not page.next_token,
+                        )
+                        if max_items == 0:
+                            return
+            except (HTTPError, ResponseError) as e:
+                if not should_retry_page(self._page_retry, e, attempt):
+                    raise
+                delay = cast(RetryPolicy, self._page_retry).get_backoff(attempt)
+                if at is not None and time.monotonic() + delay >= at:
+                    raise
+                time.sleep(delay)
+                attempt += 1
+
+    def __iter__(self) -> Generator[JSONItem, None, None]:
+        return self._iter()
+
+    def count(self) -> int:
+        # Counting does not need resource objects or projections, but still
+        # needs to fetch all of the pages.
+        return sum(1 for _ in self._iter())
+
+
+class ResourceIter(Iterable[T]):
+    def __init__(
+        self,
+        resource_class: Type[T],
+        client: HTTPClient,
+        path: str,
+        label_selector: Optional[Operator] = None,
+        field_selector: Optional[Operator] = None,
+        timeout: Optional[float] = None,
+        page_size: PageSize = DEFAULT_PAGE_SIZE,
+        prefetch: int = 0,
+        stream: bool = False,
+        page_retry: Optional[RetryPolicy] = None,
+    ) -> None:
+        self._resource_class = resource_class
+        self._client = client
+        self._items = RawResourceIter(
+            resource_class,
+            client,
+            path,
+            label_selector,
+            field_selector,
+            timeout,
+            page_size,
+            prefetch,
+            stream,
+            page_retry=page_retry,
+        )
+
+    @classmethod
+    def from_checkpoint(
+        cls,
+        resource_class: Type[T],
+        client: HTTPClient,
+        checkpoint: Checkpoint,
+        timeout: Optional[float] = None,
+        page_size: Optional[PageSize] = None,
+        prefetch: int = 0,
+        stream: bool = False,
+        page_retry: Optional[RetryPolicy] = None,
+    ) -> "ResourceIter[T]":
+        # Continues the listing where the checkpoint left off.
+        resources = cls(
+            resource_class,
+            client,
+            checkpoint.path,
+            timeout=timeout,
+            page_size=checkpoint.limit if page_size is None else page_size,
+            prefetch=prefetch,
+            stream=stream,
+            page_retry=page_retry,
+        )
+        resources._items._restore(checkpoint)
+        return resources
+
+    @property
+    def checkpoint(self) -> Checkpoint:
+        return self._items.checkpoint
+
+    def _iter(self, max_items: Optional[int] = None) -> Generator[T, None, None]:
+        with contextlib.closing(self._items._iter(max_items)) as items:
+            for d in itertools.islice(items, max_items):
+                yield self._resource_class.from_api(self._client, d)
 
     def __iter__(self) -> Generator[T, None, None]:
+        return self._iter()
+
+    def first(self) -> Optional[T]:
+        resources = self.take(1)
+        return resources[0] if resources else None
+
+    def take(self, n: int) -> "ResourceList[T]":
+        # Fetches at most n resources, which means that taking a few resources
+        # from a big collection does not download full pages.
+        if n < 0:
+            raise ValueError("Number of resources cannot be negative.")
+        if n == 0:
+            return ResourceList()
+        return ResourceList(self._iter(n))
+
+    def count(self) -> int:
+        return self._items.count()
+
+    def materialize(self) -> "ResourceList[T]":
+        return ResourceList(self)
+
+    def delete(self) -> None:
+        for i in self:
+            i.delete()
+
+
+class ResourceList(List[T]):
+    # Resources from a finished listing. Iterating over them again or deleting
+    # them does not list them again.
+    def delete(self) -> None:
+        for i in self:
+            i.delete()
+
+
+class AsyncResourceIter(AsyncIterable[T]):
+    def __init__(
+        self,
+        resource_class: Type[T],
+        client: AsyncHTTPClient,
+        path: str,
+        label_selector: Optional[Operator] = None,
+        field_selector: Optional[Operator] = None,
+        page_size: PageSize = DEFAULT_PAGE_SIZE,
+    ) -> None:
+        self._resource_class = resource_class
+        self._client = client
+        self._path = path
+
+        self._page_size = page_size
+        self._limit = initial_page_size(page_size)
+
+        self._query = _build_query(resource_class, label_selector, field_selector)
+
+    async def __aiter__(self) -> AsyncGenerator[T, None]:
         query = dict(self._query, limit=str(self._limit))
 
         while True:
-            resp = self._client.get(self._path, query=query)
+            start = time.monotonic()
+            resp = await self._client.get(self._path, query=query)
+            elapsed = time.monotonic() - start
             if resp.status != 200:
                 raise ResponseError(
                     "Expected 200 when listing resources",
@@ -47,7 +406,6 @@ class ResourceIter(Iterable[T]):
                     resp.text,
                 )
 
-            # TODO: Add check for invalid JSON
             data = cast(List[JSONItem], resp.json)
             for d in data:
                 yield self._resource_class.from_api(self._client, d)
@@ -55,10 +413,18 @@ class ResourceIter(Iterable[T]):
             query["continue"] = resp.headers.get("sensu-continue", "")
             if not query["continue"]:
                 break
+            _adjust_limit(self._page_size, query, len(data), elapsed, len(resp.content))
 
-    def delete(self) -> None:
-        for i in self:
-            i.delete()
+    async def delete(self) -> None:
+        async for i in self:
+            resp = await self._client.delete(i.path)
+            if resp.status != 204:
+                raise ResponseError(
+                    "Expected 204 when deleting resource",
+                    resp.url,
+                    resp.status,
+                    resp.text,
+                )
 
 
 class ResourceClient(Generic[T]):
@@ -86,6 +452,28 @@ class ResourceClient(Generic[T]):
                 raise e
         return None
 
+    def resume(
+        self,
+        checkpoint: Checkpoint,
+        timeout: Optional[float] = None,
+        page_size: Optional[PageSize] = None,
+        prefetch: int = 0,
+        stream: bool = False,
+        page_retry: Optional[RetryPolicy] = None,
+    ) -> ResourceIter[T]:
+        # Continues a listing from a checkpoint that we got from the checkpoint
+        # property of an earlier listing.
+        return ResourceIter.from_checkpoint(
+            self._resource_class,
+            self._client,
+            checkpoint,
+            timeout,
+            page_size,
+            prefetch,
+            stream,
+            page_retry,
+        )
+
     def _delete(self, path: str) -> None:
         resp = self._client.delete(path)
         if resp.status != 204:
@@ -101,6 +489,7 @@ class ResourceClient(Generic[T]):
         spec: JSONItem,
         metadata: JSONItem,
         type: Optional[str] = None,
+        timeout: Optional[float] = None,
     ) -> T:
         # We do not use POST for creating resources because not all resources support
         # this method of creation (for example, secrets and secrets providers).
@@ -110,8 +499,98 @@ class ResourceClient(Generic[T]):
         if errors:
             raise ValueError("\n".join(errors))
 
-        if self._find(resource.path):
+        # Timeout covers all of the requests that we need to create a resource.
+        with deadline(timeout), self._client.span(
+            "ResourceClient.create", path=resource.path
+        ):
+            if self._find(resource.path):
+                raise ValueError("Resource at {} already exists.".format(resource.path))
+
+            resource.save()
+        return resource
+
+
+class AsyncResourceClient(Generic[T]):
+    def __init__(self, client: AsyncHTTPClient, resource_class: Type[T]) -> None:
+        self._client = client
+        self._resource_class = resource_class
+
+    async def _get(self, path: str) -> T:
+        resp = await self._client.get(path)
+        if resp.status != 200:
+            raise ResponseError(
+                "Expected 200 when fetching resource",
+                resp.url,
+                resp.status,
+                resp.text,
+            )
+        return self._resource_class.from_api(self._client, cast(JSONItem, resp.json))
+
+    async def _find(self, path: str) -> Optional[T]:
+        try:
+            return await self._get(path)
+        except ResponseError as e:
+            if e.status != 404:
+                raise e
+        return None
+
+    async def _delete(self, path: str) -> None:
+        resp = await self._client.delete(path)
+        if resp.status != 204:
+            raise ResponseError(
+                "Expected 204 when deleting resource",
+                resp.url,
+                resp.status,
+                resp.text,
+            )
+
+    async def create(
+        self,
+        spec: JSONItem,
+        metadata: JSONItem,
+        type: Optional[str] = None,
+    ) -> T:
+        resource = self._resource_class(self._client, spec, metadata, type)
+        errors = resource.validate()
+        if errors:
+            raise ValueError("\n".join(errors))
+
+        if await self._find(resource.path):
             raise ValueError("Resource at {} already exists.".format(resource.path))
 
-        resource.save()
+        await self.save(resource)
         return resource
+
+    async def save(self, resource: T) -> None:
+        errors = resource.validate()
+        if errors:
+            raise ValueError("\n".join(errors))
+
+        resp = await self._client.put(
+            resource.path,
+            resource.native_to_api(
+                resource.spec, resource.metadata, resource.type, resource.api_version
+            ),
+        )
+        if resp.status not in (200, 201):
+            raise ResponseError(
+                "Expected 200 or 201 when updating resource",
+                resp.url,
+                resp.status,
+                resp.text,
+            )
+
+        # Same as in the synchronous case, the backend can add some default values
+        # on top of what we sent.
+        await self.reload(resource)
+
+    async def reload(self, resource: T) -> None:
+        resp = await self._client.get(resource.path)
+        if resp.status != 200:
+            raise ResponseError(
+                "Expected 200 when fetching resource",
+                resp.url,
+                resp.status,
+                resp.text,
+            )
+        resource._update_from_api(cast(JSONItem, resp.json))
@@ -0,0 +1,51 @@
+# Copyright (c) 2021 XLAB Steampunk
+
+from typing import Any, Dict, NamedTuple, Optional
+
+from sensu_go.clients.http.retry import RetryPolicy
+from sensu_go.errors import CircuitOpenError, ResponseError, SensuError
+
+
+class Checkpoint(NamedTuple):
+    # Position in a listing. Continue tokens point to the start of a page, so we
+    # also need the number of items from that page that the caller already got
+    # and the page size that we used to fetch the page. Checkpoints only contain
+    # strings and numbers, which means that we can store them as JSON.
+    path: str
+    limit: int
+    label_selector: str = ""
+    field_selector: str = ""
+    token: str = ""
+    offset: int = 0
+    complete: bool = False
+
+    def query(self) -> Dict[str, str]:
+        query = {}
+        if self.label_selector:
+            query["labelSelector"] = self.label_selector
+        if self.field_selector:
+            query["fieldSelector"] = self.field_selector
+        return query
+
+    def as_dict(self) -> Dict[str, Any]:
+        return dict(self._asdict())
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Checkpoint":
+        try:
+            return cls(**data)
+        except TypeError as e:
+            raise ValueError("Invalid checkpoint: {}".format(e))
+
+
+def should_retry_page(
+    policy: Optional[RetryPolicy], error: SensuError, attempt: int
+) -> bool:
+    # Page requests are GETs, so we can repeat them as often as the policy lets
+    # us. Open circuit breaker means that the client already gave up on the
+    # backend, and responses that we cannot decode have a 200 status.
+    if policy is None or isinstance(error, CircuitOpenError):
+        return False
+    if isinstance(error, ResponseError) and error.status != 200:
+        return policy.should_retry_status("GET", error.status, attempt)
+    return policy.should_retry_error("GET", attempt)
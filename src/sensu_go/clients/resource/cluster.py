@@ -1,9 +1,22 @@
 # Copyright (c) 2020 XLAB Steampunk
 
-from typing import Optional, TypeVar
+from typing import Optional, Sequence, TypeVar
 
+from sensu_go.clients.http.retry import RetryPolicy
 from sensu_go.clients.resource.operator import Operator
-from sensu_go.clients.resource.base import ResourceClient, ResourceIter
+from sensu_go.clients.resource.paging import DEFAULT_PAGE_SIZE, PageSize
+from sensu_go.clients.resource.partition import (
+    Partition,
+    partitioned,
+    PartitionedIter,
+)
+from sensu_go.clients.resource.base import (
+    AsyncResourceClient,
+    AsyncResourceIter,
+    RawResourceIter,
+    ResourceClient,
+    ResourceIter,
+)
 from sensu_go.resources.cluster import ClusterResource
 
 T = TypeVar("T", bound=ClusterResource)
@@ -14,6 +27,12 @@ class ClusterClient(ResourceClient[T]):
         self,
         label_selector: Optional[Operator] = None,
         field_selector: Optional[Operator] = None,
+        timeout: Optional[float] = None,
+        page_size: PageSize = DEFAULT_PAGE_SIZE,
+        prefetch: int = 0,
+        *,
+        stream: bool = False,
+        page_retry: Optional[RetryPolicy] = None,
     ) -> ResourceIter[T]:
         return ResourceIter[T](
             self._resource_class,
@@ -21,6 +40,69 @@ class ClusterClient(ResourceClient[T]):
             self._resource_class.get_path(),
             label_selector,
             field_selector,
+            timeout,
+            page_size,
+            prefetch,
+            stream,
+            page_retry,
+        )
+
+    def list_raw(
+        self,
+        label_selector: Optional[Operator] = None,
+        field_selector: Optional[Operator] = None,
+        timeout: Optional[float] = None,
+        page_size: PageSize = DEFAULT_PAGE_SIZE,
+        prefetch: int = 0,
+        *,
+        fields: Optional[Sequence[str]] = None,
+        stream: bool = False,
+        page_retry: Optional[RetryPolicy] = None,
+    ) -> RawResourceIter:
+        return RawResourceIter(
+            self._resource_class,
+            self._client,
+            self._resource_class.get_path(),
+            label_selector,
+            field_selector,
+            timeout,
+            page_size,
+            prefetch,
+            stream,
+            fields,
+            page_retry,
+        )
+
+    def list_partitioned(
+        self,
+        partitions: Sequence[Partition],
+        label_selector: Optional[Operator] = None,
+        field_selector: Optional[Operator] = None,
+        timeout: Optional[float] = None,
+        page_size: PageSize = DEFAULT_PAGE_SIZE,
+        prefetch: int = 0,
+        *,
+        max_workers: int = 8,
+        stream: bool = False,
+        page_retry: Optional[RetryPolicy] = None,
+    ) -> PartitionedIter[T]:
+        # There is no raw variant, because we need resource paths to remove
+        # duplicates.
+        def resources(
+            label_selector: Optional[Operator], field_selector: Optional[Operator]
+        ) -> ResourceIter[T]:
+            return self.list(
+                label_selector,
+                field_selector,
+                timeout,
+                page_size,
+                prefetch,
+                stream=stream,
+                page_retry=page_retry,
+            )
+
+        return partitioned(
+            resources, label_selector, field_selector, partitions, max_workers
         )
 
     def get(self, name: str) -> T:
@@ -31,3 +113,29 @@ class ClusterClient(ResourceClient[T]):
 
     def delete(self, name: str) -> None:
         self._delete(self._resource_class.get_path(name=name))
+
+
+class AsyncClusterClient(AsyncResourceClient[T]):
+    def list(
+        self,
+        label_selector: Optional[Operator] = None,
+        field_selector: Optional[Operator] = None,
+        page_size: PageSize = DEFAULT_PAGE_SIZE,
+    ) -> AsyncResourceIter[T]:
+        return AsyncResourceIter[T](
+            self._resource_class,
+            self._client,
+            self._resource_class.get_path(),
+            label_selector,
+            field_selector,
+            page_size=page_size,
+        )
+
+    async def get(self, name: str) -> T:
+        return await self._get(self._resource_class.get_path(name=name))
+
+    async def find(self, name: str) -> Optional[T]:
+        return await self._find(self._resource_class.get_path(name=name))
+
+    async def delete(self, name: str) -> None:
+        await self._delete(self._resource_class.get_path(name=name))
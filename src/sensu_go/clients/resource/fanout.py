@@ -0,0 +1,172 @@
+# Copyright (c) 2021 XLAB Steampunk
+
+import collections
+import contextlib
+import contextvars
+import itertools
+import threading
+import time
+from concurrent import futures
+from typing import (
+    Callable,
+    Deque,
+    Generator,
+    Iterable,
+    List,
+    Optional,
+    TypeVar,
+)
+
+from sensu_go.clients.http.base import HTTPClient
+from sensu_go.clients.http.deadline import deadline_at
+from sensu_go.clients.resource.base import ResourceIter
+from sensu_go.errors import ResponseError
+from sensu_go.resources.base import Resource
+from sensu_go.resources.namespace import Namespace
+
+R = TypeVar("R")
+T = TypeVar("T", bound=Resource)
+
+
+class NamespaceCache:
+    # Remembers the names of namespaces for ttl seconds. Resource clients that
+    # the same Client creates share the cache, which means that listing a few
+    # kinds of resources from all namespaces only lists namespaces once.
+    def __init__(self, client: HTTPClient, ttl: float = 60.0) -> None:
+        self._client = client
+        self.ttl = ttl
+
+        self._lock = threading.Lock()
+        self._names: Optional[List[str]] = None
+        self._fetched_at = 0.0
+
+    def get(self) -> List[str]:
+        with self._lock:
+            if self._names is None or time.monotonic() - self._fetched_at > self.ttl:
+                namespaces = ResourceIter(Namespace, self._client, Namespace.get_path())
+                self._names = sorted(n.name for n in namespaces)
+                self._fetched_at = time.monotonic()
+            return self._names
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._names = None
+
+
+def merge(
+    sources: Iterable[Callable[[], List[R]]], max_workers: int, ordered: bool
+) -> Generator[R, None, None]:
+    # Calls sources in a pool of max_workers threads and yields their items.
+    # Unordered results come in as soon as a source is done, and ordered ones in
+    # the order of sources. We never run more than max_workers sources ahead of
+    # the caller, which keeps the memory use bounded.
+    executor = futures.ThreadPoolExecutor(
+        max_workers, thread_name_prefix="sensu-go-fan-out"
+    )
+    pending: Deque["futures.Future[List[R]]"] = collections.deque()
+    remaining = iter(sources)
+
+    def submit() -> None:
+        for source in remaining:
+            # Workers need the caller's context (trace context, for example).
+            pending.append(executor.submit(contextvars.copy_context().run, source))
+            return
+
+    try:
+        for _ in range(max_workers):
+            submit()
+        while pending:
+            if ordered:
+                future = pending.popleft()
+            else:
+                done, _ = futures.wait(pending, return_when=futures.FIRST_COMPLETED)
+                future = next(f for f in pending if f in done)
+                pending.remove(future)
+            items = future.result()
+            submit()
+            yield from items
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+
+class AllNamespacesIter(Iterable[R]):
+    # Lists resources from all namespaces. We use the cluster-wide endpoint if
+    # the resource has one and fall back to listing namespaces one by one if it
+    # does not or if we are not allowed to use it (users that only have access
+    # to some namespaces get a 403 response, for example).
+    def __init__(
+        self,
+        cluster_wide: Optional[Iterable[R]],
+        namespaced: Callable[[str], Iterable[R]],
+        namespaces: NamespaceCache,
+        timeout: Optional[float] = None,
+        max_workers: int = 8,
+        ordered: bool = False,
+    ) -> None:
+        if max_workers < 1:
+            raise ValueError("Number of workers must be positive.")
+
+        self._cluster_wide = cluster_wide
+        self._namespaced = namespaced
+        self._namespaces = namespaces
+        self._timeout = timeout
+        self._max_workers = max_workers
+        self._ordered = ordered
+
+    def __iter__(self) -> Generator[R, None, None]:
+        if self._cluster_wide is not None:
+            items = iter(self._cluster_wide)
+            try:
+                try:
+                    first = next(items, None)
+                except ResponseError as e:
+                    if e.status != 403:
+                        raise
+                else:
+                    if first is not None:
+                        yield first
+                        yield from items
+                    return
+            finally:
+                if isinstance(items, Generator):
+                    items.close()
+
+        # Timeout covers listing the namespaces and all of the resources.
+        at = None if self._timeout is None else time.monotonic() + self._timeout
+
+        def source(namespace: str) -> Callable[[], List[R]]:
+            def fetch() -> List[R]:
+                with deadline_at(at):
+                    return list(self._namespaced(namespace))
+
+            return fetch
+
+        with deadline_at(at):
+            names = self._namespaces.get()
+        yield from merge((source(n) for n in names), self._max_workers, self._ordered)
+
+    def first(self) -> Optional[R]:
+        items = self.take(1)
+        return items[0] if items else None
+
+    def take(self, n: int) -> List[R]:
+        # Stops the listing (and the requests that are still running in other
+        # namespaces) once we have n items.
+        if n < 0:
+            raise ValueError("Number of items cannot be negative.")
+        if n == 0:
+            return []
+        with contextlib.closing(iter(self)) as items:
+            return list(itertools.islice(items, n))
+
+    def count(self) -> int:
+        return sum(1 for _ in self)
+
+    def materialize(self) -> List[R]:
+        return list(self)
+
+    def delete(self: "AllNamespacesIter[T]") -> None:
+        for i in self:
+            i.delete()
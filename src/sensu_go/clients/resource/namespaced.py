@@ -1,13 +1,28 @@
 # Copyright (c) 2020 XLAB Steampunk
 
-from typing import Optional, Type, TypeVar
+from typing import Callable, Iterable, Optional, Sequence, Type, TypeVar
 
-from sensu_go.clients.http.base import HTTPClient
-from sensu_go.clients.resource.base import ResourceClient, ResourceIter
+from sensu_go.clients.http.base import AsyncHTTPClient, HTTPClient
+from sensu_go.clients.resource.base import (
+    AsyncResourceClient,
+    AsyncResourceIter,
+    RawResourceIter,
+    ResourceClient,
+    ResourceIter,
+)
+from sensu_go.clients.resource.fanout import AllNamespacesIter, NamespaceCache
+from sensu_go.clients.http.retry import RetryPolicy
 from sensu_go.clients.resource.operator import Operator
+from sensu_go.clients.resource.partition import (
+    Partition,
+    partitioned,
+    PartitionedIter,
+)
+from sensu_go.clients.resource.paging import DEFAULT_PAGE_SIZE, PageSize
 from sensu_go.resources.namespaced import NamespacedResource
 from sensu_go.typing import JSONItem
 
+R = TypeVar("R")
 T = TypeVar("T", bound=NamespacedResource)
 
 
@@ -17,9 +32,11 @@ class NamespacedClient(ResourceClient[T]):
         client: HTTPClient,
         resource_class: Type[T],
         default_namespace: str,
+        namespace_cache: Optional[NamespaceCache] = None,
     ) -> None:
         super().__init__(client, resource_class)
         self._default_ns = default_namespace
+        self._namespace_cache = namespace_cache or NamespaceCache(client)
 
     def _get_path(self, ns: Optional[str], name: Optional[str] = None) -> str:
         return self._resource_class.get_path(
@@ -31,6 +48,12 @@ class NamespacedClient(ResourceClient[T]):
         namespace: Optional[str] = None,
         label_selector: Optional[Operator] = None,
         field_selector: Optional[Operator] = None,
+        timeout: Optional[float] = None,
+        page_size: PageSize = DEFAULT_PAGE_SIZE,
+        prefetch: int = 0,
+        *,
+        stream: bool = False,
+        page_retry: Optional[RetryPolicy] = None,
     ) -> ResourceIter[T]:
         return ResourceIter[T](
             self._resource_class,
@@ -38,6 +61,149 @@ class NamespacedClient(ResourceClient[T]):
             self._get_path(namespace),
             label_selector,
             field_selector,
+            timeout,
+            page_size,
+            prefetch,
+            stream,
+            page_retry,
+        )
+
+    def list_raw(
+        self,
+        namespace: Optional[str] = None,
+        label_selector: Optional[Operator] = None,
+        field_selector: Optional[Operator] = None,
+        timeout: Optional[float] = None,
+        page_size: PageSize = DEFAULT_PAGE_SIZE,
+        prefetch: int = 0,
+        *,
+        fields: Optional[Sequence[str]] = None,
+        stream: bool = False,
+        page_retry: Optional[RetryPolicy] = None,
+    ) -> RawResourceIter:
+        return RawResourceIter(
+            self._resource_class,
+            self._client,
+            self._get_path(namespace),
+            label_selector,
+            field_selector,
+            timeout,
+            page_size,
+            prefetch,
+            stream,
+            fields,
+            page_retry,
+        )
+
+    def list_all_namespaces(
+        self,
+        label_selector: Optional[Operator] = None,
+        field_selector: Optional[Operator] = None,
+        timeout: Optional[float] = None,
+        page_size: PageSize = DEFAULT_PAGE_SIZE,
+        prefetch: int = 0,
+        *,
+        max_workers: int = 8,
+        ordered: bool = False,
+        stream: bool = False,
+        page_retry: Optional[RetryPolicy] = None,
+    ) -> AllNamespacesIter[T]:
+        def resources(path: str, timeout: Optional[float]) -> ResourceIter[T]:
+            return ResourceIter[T](
+                self._resource_class,
+                self._client,
+                path,
+                label_selector,
+                field_selector,
+                timeout,
+                page_size,
+                prefetch,
+                stream,
+                page_retry,
+            )
+
+        return self._all_namespaces(resources, timeout, max_workers, ordered)
+
+    def list_all_namespaces_raw(
+        self,
+        label_selector: Optional[Operator] = None,
+        field_selector: Optional[Operator] = None,
+        timeout: Optional[float] = None,
+        page_size: PageSize = DEFAULT_PAGE_SIZE,
+        prefetch: int = 0,
+        *,
+        fields: Optional[Sequence[str]] = None,
+        max_workers: int = 8,
+        ordered: bool = False,
+        stream: bool = False,
+        page_retry: Optional[RetryPolicy] = None,
+    ) -> AllNamespacesIter[JSONItem]:
+        def items(path: str, timeout: Optional[float]) -> RawResourceIter:
+            return RawResourceIter(
+                self._resource_class,
+                self._client,
+                path,
+                label_selector,
+                field_selector,
+                timeout,
+                page_size,
+                prefetch,
+                stream,
+                fields,
+                page_retry,
+            )
+
+        return self._all_namespaces(items, timeout, max_workers, ordered)
+
+    def list_partitioned(
+        self,
+        partitions: Sequence[Partition],
+        namespace: Optional[str] = None,
+        label_selector: Optional[Operator] = None,
+        field_selector: Optional[Operator] = None,
+        timeout: Optional[float] = None,
+        page_size: PageSize = DEFAULT_PAGE_SIZE,
+        prefetch: int = 0,
+        *,
+        max_workers: int = 8,
+        stream: bool = False,
+        page_retry: Optional[RetryPolicy] = None,
+    ) -> PartitionedIter[T]:
+        # There is no raw variant, because we need resource paths to remove
+        # duplicates.
+        def resources(
+            label_selector: Optional[Operator], field_selector: Optional[Operator]
+        ) -> ResourceIter[T]:
+            return self.list(
+                namespace,
+                label_selector,
+                field_selector,
+                timeout,
+                page_size,
+                prefetch,
+                stream=stream,
+                page_retry=page_retry,
+            )
+
+        return partitioned(
+            resources, label_selector, field_selector, partitions, max_workers
+        )
+
+    def _all_namespaces(
+        self,
+        make: Callable[[str, Optional[float]], Iterable[R]],
+        timeout: Optional[float],
+        max_workers: int,
+        ordered: bool,
+    ) -> AllNamespacesIter[R]:
+        all_path = self._resource_class.get_all_namespaces_path()
+        return AllNamespacesIter[R](
+            None if all_path is None else make(all_path, timeout),
+            lambda ns: make(self._get_path(ns), None),
+            self._namespace_cache,
+            timeout,
+            max_workers,
+            ordered,
         )
 
     def create(
@@ -45,10 +211,11 @@ class NamespacedClient(ResourceClient[T]):
         spec: JSONItem,
         metadata: JSONItem,
         type: Optional[str] = None,
+        timeout: Optional[float] = None,
     ) -> T:
         if "namespace" not in metadata:
             metadata = dict(metadata, namespace=self._default_ns)
-        return super().create(spec, metadata, type)
+        return super().create(spec, metadata, type, timeout)
 
     def get(self, name: str, namespace: Optional[str] = None) -> T:
         return self._get(self._get_path(namespace, name))
@@ -58,3 +225,54 @@ class NamespacedClient(ResourceClient[T]):
 
     def delete(self, name: str, namespace: Optional[str] = None) -> None:
         self._delete(self._get_path(namespace, name))
+
+
+class AsyncNamespacedClient(AsyncResourceClient[T]):
+    def __init__(
+        self,
+        client: AsyncHTTPClient,
+        resource_class: Type[T],
+        default_namespace: str,
+    ) -> None:
+        super().__init__(client, resource_class)
+        self._default_ns = default_namespace
+
+    def _get_path(self, ns: Optional[str], name: Optional[str] = None) -> str:
+        return self._resource_class.get_path(
+            namespace=ns or self._default_ns, name=name
+        )
+
+    def list(
+        self,
+        namespace: Optional[str] = None,
+        label_selector: Optional[Operator] = None,
+        field_selector: Optional[Operator] = None,
+        page_size: PageSize = DEFAULT_PAGE_SIZE,
+    ) -> AsyncResourceIter[T]:
+        return AsyncResourceIter[T](
+            self._resource_class,
+            self._client,
+            self._get_path(namespace),
+            label_selector,
+            field_selector,
+            page_size=page_size,
+        )
+
+    async def create(
+        self,
+        spec: JSONItem,
+        metadata: JSONItem,
+        type: Optional[str] = None,
+    ) -> T:
+        if "namespace" not in metadata:
+            metadata = dict(metadata, namespace=self._default_ns)
+        return await super().create(spec, metadata, type)
+
+    async def get(self, name: str, namespace: Optional[str] = None) -> T:
+        return await self._get(self._get_path(namespace, name))
+
+    async def find(self, name: str, namespace: Optional[str] = None) -> Optional[T]:
+        return await self._find(self._get_path(namespace, name))
+
+    async def delete(self, name: str, namespace: Optional[str] = None) -> None:
+        await self._delete(self._get_path(namespace, name))
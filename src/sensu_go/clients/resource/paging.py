@@ -0,0 +1,156 @@
+# Copyright (c) 2021 XLAB Steampunk
+
+import contextvars
+import queue
+import threading
+from typing import (
+    cast,
+    Generator,
+    Iterable,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+DEFAULT_PAGE_SIZE = 100
+
+P = TypeVar("P")
+
+
+class AdaptivePageSize:
+    # Adjusts the page size after each page so that fetching a page takes about
+    # target_time seconds. If max_bytes is set, pages also stay below that many
+    # (uncompressed) bytes, which keeps us away from backend and proxy payload
+    # limits. The size changes by at most a factor of two per page to smooth out
+    # latency spikes.
+    def __init__(
+        self,
+        initial: int = DEFAULT_PAGE_SIZE,
+        target_time: float = 1.0,
+        max_bytes: Optional[int] = None,
+        min_size: int = 10,
+        max_size: int = 10000,
+    ) -> None:
+        if not 1 <= min_size <= initial <= max_size:
+            raise ValueError("Page sizes must satisfy 1 <= min <= initial <= max.")
+        if target_time <= 0:
+            raise ValueError("Target time must be positive.")
+
+        self.initial = initial
+        self.target_time = target_time
+        self.max_bytes = max_bytes
+        self.min_size = min_size
+        self.max_size = max_size
+
+    def adjust(self, size: int, count: int, elapsed: float, size_bytes: int) -> int:
+        # Size of the next page, given that the last one requested size items,
+        # received count of them, and took elapsed seconds and size_bytes bytes.
+        if count == 0:
+            return size
+
+        new_size = size * self.target_time / max(elapsed, 1e-3)
+        new_size = min(max(new_size, size / 2), size * 2)
+        if self.max_bytes is not None and size_bytes > 0:
+            new_size = min(new_size, self.max_bytes * count / size_bytes)
+        return int(min(max(new_size, self.min_size), self.max_size))
+
+
+PageSize = Union[int, AdaptivePageSize]
+
+
+def initial_page_size(page_size: PageSize) -> int:
+    if isinstance(page_size, AdaptivePageSize):
+        return page_size.initial
+    if page_size < 1:
+        raise ValueError("Page size must be positive.")
+    return page_size
+
+
+_DONE = object()
+
+
+def _in_background(
+    sources: Iterable[Iterable[P]], workers: int, size: int, name: str
+) -> Generator[P, None, None]:
+    # Iterates over sources in up to workers background threads and hands the
+    # items over to the caller through a buffer that holds up to size items.
+    # Once the buffer is full, the threads wait for the caller to catch up.
+    # Errors are raised in the caller once it gets to them, and closing the
+    # generator stops the threads after the requests that are in flight (if
+    # any) complete.
+    buffer: "queue.Queue[Tuple[object, Optional[BaseException]]]" = queue.Queue(size)
+    stop = threading.Event()
+    lock = threading.Lock()
+    remaining = iter(sources)
+
+    def put(item: object, error: Optional[BaseException] = None) -> bool:
+        while not stop.is_set():
+            try:
+                buffer.put((item, error), timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def work() -> None:
+        try:
+            while not stop.is_set():
+                with lock:
+                    source = next(remaining, None)
+                if source is None:
+                    break
+                items = iter(source)
+                try:
+                    for item in items:
+                        if not put(item):
+                            return
+                finally:
+                    if isinstance(items, Generator):
+                        items.close()
+        except BaseException as e:
+            put(None, e)
+            return
+        put(_DONE)
+
+    def start() -> None:
+        # Worker threads need the caller's context (trace context, for example).
+        for _ in range(workers):
+            threading.Thread(
+                target=contextvars.copy_context().run,
+                args=(work,),
+                name=name,
+                daemon=True,
+            ).start()
+
+    start()
+    try:
+        done = 0
+        while done < workers:
+            item, error = buffer.get()
+            if error is not None:
+                raise error
+            if item is _DONE:
+                done += 1
+            else:
+                yield cast(P, item)
+    finally:
+        stop.set()
+
+
+def prefetch(pages: Generator[P, None, None], size: int) -> Generator[P, None, None]:
+    # Fetches up to size pages ahead in a background thread.
+    return _in_background((pages,), 1, size, "sensu-go-prefetch")
+
+
+def interleave(
+    sources: Sequence[Iterable[P]], workers: int, size: int = 1000
+) -> Generator[P, None, None]:
+    # Iterates over sources concurrently and yields items in the order they
+    # arrive in.
+    if workers < 1:
+        raise ValueError("Number of workers must be positive.")
+    return _in_background(
+        sources, min(workers, len(sources)), size, "sensu-go-partition"
+    )
@@ -0,0 +1,122 @@
+# Copyright (c) 2021 XLAB Steampunk
+
+import contextlib
+import itertools
+from typing import (
+    Callable,
+    Generator,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    TypeVar,
+)
+
+from sensu_go.clients.resource.base import ResourceIter, ResourceList
+from sensu_go.clients.resource.operator import And, Equal, Matches, NotIn, Operator
+from sensu_go.clients.resource.paging import interleave
+from sensu_go.resources.base import Resource
+
+T = TypeVar("T", bound=Resource)
+
+
+class Partition(NamedTuple):
+    # Additional selectors that carve a part out of a listing.
+    label_selector: Optional[Operator] = None
+    field_selector: Optional[Operator] = None
+
+
+def by_label(label: str, values: Iterable[str], rest: bool = True) -> List[Partition]:
+    # One partition per label value. The rest partition covers resources with
+    # other values and resources without the label.
+    values = list(values)
+    partitions = [Partition(label_selector=Equal(label, v)) for v in values]
+    if rest:
+        partitions.append(Partition(label_selector=NotIn(label, values)))
+    return partitions
+
+
+def by_name(substrings: Iterable[str], field: str = "name") -> List[Partition]:
+    # The matches operator looks for substrings, which means that a resource can
+    # end up in more than one partition. Partitioned listing removes duplicates,
+    # but resources whose names do not contain any of the substrings are not
+    # listed at all.
+    return [Partition(field_selector=Matches(field, s)) for s in substrings]
+
+
+def combine(
+    selector: Optional[Operator], partition: Optional[Operator]
+) -> Optional[Operator]:
+    if selector is None:
+        return partition
+    if partition is None:
+        return selector
+    return And(selector, partition)
+
+
+class PartitionedIter(Iterable[T]):
+    # Runs listings of disjoint (or mostly disjoint) parts of a collection
+    # concurrently. Each part still needs to fetch its pages one after another,
+    # but the parts do not need to wait for each other. Resources that show up in
+    # more than one part are only returned once.
+    def __init__(self, parts: Sequence[ResourceIter[T]], max_workers: int = 8) -> None:
+        if not parts:
+            raise ValueError("Partitioned listing needs at least one partition.")
+        if max_workers < 1:
+            raise ValueError("Number of workers must be positive.")
+
+        self._parts = parts
+        self._max_workers = max_workers
+
+    def __iter__(self) -> Generator[T, None, None]:
+        seen = set()
+        with contextlib.closing(interleave(self._parts, self._max_workers)) as items:
+            for item in items:
+                if item.path not in seen:
+                    seen.add(item.path)
+                    yield item
+
+    def first(self) -> Optional[T]:
+        resources = self.take(1)
+        return resources[0] if resources else None
+
+    def take(self, n: int) -> ResourceList[T]:
+        # Stops listing the partitions once we have n resources.
+        if n < 0:
+            raise ValueError("Number of resources cannot be negative.")
+        if n == 0:
+            return ResourceList()
+        with contextlib.closing(iter(self)) as resources:
+            return ResourceList(itertools.islice(resources, n))
+
+    def count(self) -> int:
+        # Duplicates only show up once we have the resources.
+        return sum(1 for _ in self)
+
+    def materialize(self) -> ResourceList[T]:
+        return ResourceList(self)
+
+    def delete(self) -> None:
+        for i in self:
+            i.delete()
+
+
+def partitioned(
+    make: Callable[[Optional[Operator], Optional[Operator]], ResourceIter[T]],
+    label_selector: Optional[Operator],
+    field_selector: Optional[Operator],
+    partitions: Sequence[Partition],
+    max_workers: int,
+) -> PartitionedIter[T]:
+    # Narrows down the listing's selectors with the selectors of each partition.
+    return PartitionedIter(
+        [
+            make(
+                combine(label_selector, p.label_selector),
+                combine(field_selector, p.field_selector),
+            )
+            for p in partitions
+        ],
+        max_workers,
+    )
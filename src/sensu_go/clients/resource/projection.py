@@ -0,0 +1,57 @@
+# Copyright (c) 2021 XLAB Steampunk
+
+from typing import cast, Any, Callable, Dict, Iterable
+
+from sensu_go.typing import JSON, JSONItem
+
+# Tree of field names where None marks the fields that we keep in full. Values
+# are either None or another tree.
+_Tree = Dict[str, Any]
+
+
+def _build_tree(fields: Iterable[str]) -> _Tree:
+    tree: _Tree = {}
+    for field in fields:
+        parts = field.split(".")
+        if not all(parts):
+            raise ValueError("Invalid field path: '{}'.".format(field))
+
+        node = tree
+        for part in parts[:-1]:
+            child = node.setdefault(part, {})
+            if child is None:
+                # We already keep the parent field in full.
+                break
+            node = child
+        else:
+            node[parts[-1]] = None
+    return tree
+
+
+def _project(value: JSON, tree: _Tree) -> JSON:
+    if isinstance(value, list):
+        return [_project(v, tree) for v in value]
+    if not isinstance(value, dict):
+        return value
+
+    result = {}
+    for name, subtree in tree.items():
+        if name in value:
+            item = value[name]
+            result[name] = item if subtree is None else _project(item, subtree)
+    return result
+
+
+def projection(fields: Iterable[str]) -> Callable[[JSONItem], JSONItem]:
+    # Returns a function that only keeps the fields at the given dot-separated
+    # paths (metadata.name, check.status, ...) of the items as the API returns
+    # them. Missing fields are left out, and lists along the path are projected
+    # element by element.
+    tree = _build_tree(fields)
+    if not tree:
+        raise ValueError("Projection needs at least one field.")
+
+    def project(item: JSONItem) -> JSONItem:
+        return cast(JSONItem, _project(item, tree))
+
+    return project
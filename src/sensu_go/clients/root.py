@@ -1,13 +1,19 @@
 # Copyright (c) 2020 XLAB Steampunk
 
-from typing import Optional
+from typing import Any, Optional
 
-from sensu_go.clients.http.api_key import ApiKeyClient
-from sensu_go.clients.http.base import HTTPClient, Response
-from sensu_go.clients.http.user_pass import UserPassClient
+from sensu_go.clients.http.api_key import ApiKeyClient, AsyncApiKeyClient
+from sensu_go.clients.http.base import AsyncHTTPClient, HTTPClient
+from sensu_go.clients.http.registry import client_key, default_registry
+from sensu_go.clients.http.response import Response
+from sensu_go.clients.http.user_pass import AsyncUserPassClient, UserPassClient
 
-from sensu_go.clients.resource.cluster import ClusterClient
-from sensu_go.clients.resource.namespaced import NamespacedClient
+from sensu_go.clients.resource.cluster import AsyncClusterClient, ClusterClient
+from sensu_go.clients.resource.fanout import NamespaceCache
+from sensu_go.clients.resource.namespaced import (
+    AsyncNamespacedClient,
+    NamespacedClient,
+)
 
 from sensu_go.resources.asset import Asset
 from sensu_go.resources.check import Check
@@ -24,66 +30,184 @@ from sensu_go.resources.user import User
 
 from sensu_go.resources.namespace import Namespace
 
-from sensu_go.typing import JSON
+from sensu_go.typing import Address, Payload
 
 
 def _get_http_client(
-    address: str,
+    address: Address,
     api_key: Optional[str] = None,
     username: Optional[str] = None,
     password: Optional[str] = None,
     verify: bool = True,
     ca_path: Optional[str] = None,
+    **kwargs: Any,
 ) -> HTTPClient:
     # TODO(@tadeboro): Add parameter validation
     if api_key:
-        return ApiKeyClient(address, api_key, verify, ca_path)
+        return ApiKeyClient(address, api_key, verify, ca_path, **kwargs)
     elif username and password:
-        return UserPassClient(address, username, password, verify, ca_path)
+        return UserPassClient(address, username, password, verify, ca_path, **kwargs)
+    raise ValueError("Invalid set of client arguments.")
+
+
+def _get_async_http_client(
+    address: str,
+    api_key: Optional[str] = None,
+    username: Optional[str] = None,
+    password: Optional[str] = None,
+    verify: bool = True,
+    ca_path: Optional[str] = None,
+    **kwargs: Any,
+) -> AsyncHTTPClient:
+    if api_key:
+        return AsyncApiKeyClient(address, api_key, verify, ca_path, **kwargs)
+    elif username and password:
+        return AsyncUserPassClient(
+            address, username, password, verify, ca_path, **kwargs
+        )
     raise ValueError("Invalid set of client arguments.")
 
 
 class Client:
     def __init__(
         self,
-        address: str,
+        address: Address,
         api_key: Optional[str] = None,
         username: Optional[str] = None,
         password: Optional[str] = None,
         default_namespace: str = "default",
         verify: bool = True,
         ca_path: Optional[str] = None,
+        *,
+        shared: bool = False,
+        **kwargs: Any,
     ) -> None:
-        self._client = _get_http_client(
-            address, api_key, username, password, verify, ca_path
-        )
-
-        # Namespaced API
+        # Additional keyword arguments configure the underlying HTTP client
+        # (connection pooling, for example). Shared clients get their HTTP client
+        # from the process-wide registry, which means that all clients with the
+        # same settings use the same connection pool and access token.
+        self._shared = shared
+        if shared:
+            self._client = default_registry.acquire(
+                client_key(
+                    address, api_key, username, password, verify, ca_path, **kwargs
+                ),
+                lambda: _get_http_client(
+                    address, api_key, username, password, verify, ca_path, **kwargs
+                ),
+            )
+        else:
+            self._client = _get_http_client(
+                address, api_key, username, password, verify, ca_path, **kwargs
+            )
+        self._closed = False
+
+        # Namespaced API. Listing resources from all namespaces might require us
+        # to list namespaces first, and all resource clients share the result.
         ns = default_namespace
-        self.assets = NamespacedClient(self._client, Asset, ns)
-        self.checks = NamespacedClient(self._client, Check, ns)
-        self.entities = NamespacedClient(self._client, Entity, ns)
-        self.events = NamespacedClient(self._client, Event, ns)
-        self.filters = NamespacedClient(self._client, Filter, ns)
-        self.handlers = NamespacedClient(self._client, Handler, ns)
-        self.hooks = NamespacedClient(self._client, Hook, ns)
-        self.mutators = NamespacedClient(self._client, Mutator, ns)
-        self.secrets = NamespacedClient(self._client, Secret, ns)
-        self.silences = NamespacedClient(self._client, Silence, ns)
+        self.namespace_cache = NamespaceCache(self._client)
+        nc = self.namespace_cache
+        self.assets = NamespacedClient(self._client, Asset, ns, nc)
+        self.checks = NamespacedClient(self._client, Check, ns, nc)
+        self.entities = NamespacedClient(self._client, Entity, ns, nc)
+        self.events = NamespacedClient(self._client, Event, ns, nc)
+        self.filters = NamespacedClient(self._client, Filter, ns, nc)
+        self.handlers = NamespacedClient(self._client, Handler, ns, nc)
+        self.hooks = NamespacedClient(self._client, Hook, ns, nc)
+        self.mutators = NamespacedClient(self._client, Mutator, ns, nc)
+        self.secrets = NamespacedClient(self._client, Secret, ns, nc)
+        self.silences = NamespacedClient(self._client, Silence, ns, nc)
 
         # Cluster-wide API
         self.namespaces = ClusterClient(self._client, Namespace)
         self.secrets_providers = ClusterClient(self._client, SecretsProvider)
         self.users = ClusterClient(self._client, User)
 
+    @property
+    def http_client(self) -> HTTPClient:
+        return self._client
+
     def get(self, path: str) -> Response:
         return self._client.get(path)
 
-    def post(self, path: str, payload: JSON) -> Response:
+    def post(self, path: str, payload: Payload) -> Response:
         return self._client.post(path, payload)
 
-    def put(self, path: str, payload: JSON) -> Response:
+    def put(self, path: str, payload: Payload) -> Response:
         return self._client.put(path, payload)
 
     def delete(self, path: str) -> Response:
         return self._client.delete(path)
+
+    def close(self) -> None:
+        # Shared HTTP client stays open until the last client that uses it is
+        # closed, so we must not release it more than once.
+        if self._closed:
+            return
+        self._closed = True
+        if self._shared:
+            default_registry.release(self._client)
+        else:
+            self._client.close()
+
+    def __enter__(self) -> "Client":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+class AsyncClient:
+    def __init__(
+        self,
+        address: str,
+        api_key: Optional[str] = None,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        default_namespace: str = "default",
+        verify: bool = True,
+        ca_path: Optional[str] = None,
+        **kwargs: Any,
+    ) -> None:
+        self._client = _get_async_http_client(
+            address, api_key, username, password, verify, ca_path, **kwargs
+        )
+
+        # Namespaced API
+        ns = default_namespace
+        self.assets = AsyncNamespacedClient(self._client, Asset, ns)
+        self.checks = AsyncNamespacedClient(self._client, Check, ns)
+        self.entities = AsyncNamespacedClient(self._client, Entity, ns)
+        self.events = AsyncNamespacedClient(self._client, Event, ns)
+        self.filters = AsyncNamespacedClient(self._client, Filter, ns)
+        self.handlers = AsyncNamespacedClient(self._client, Handler, ns)
+        self.hooks = AsyncNamespacedClient(self._client, Hook, ns)
+        self.mutators = AsyncNamespacedClient(self._client, Mutator, ns)
+        self.secrets = AsyncNamespacedClient(self._client, Secret, ns)
+        self.silences = AsyncNamespacedClient(self._client, Silence, ns)
+
+        # Cluster-wide API
+        self.namespaces = AsyncClusterClient(self._client, Namespace)
+        self.secrets_providers = AsyncClusterClient(self._client, SecretsProvider)
+        self.users = AsyncClusterClient(self._client, User)
+
+    async def get(self, path: str) -> Response:
+        return await self._client.get(path)
+
+    async def post(self, path: str, payload: Payload) -> Response:
+        return await self._client.post(path, payload)
+
+    async def put(self, path: str, payload: Payload) -> Response:
+        return await self._client.put(path, payload)
+
+    async def delete(self, path: str) -> Response:
+        return await self._client.delete(path)
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    async def __aenter__(self) -> "AsyncClient":
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.aclose()
@@ -24,3 +24,11 @@ class ResponseError(SensuError):
 
 class AuthError(ResponseError):
     """Error that indicates a problem with credentials."""
+
+
+class CircuitOpenError(HTTPError):
+    """Error that indicates the client stopped sending requests to the backend."""
+
+
+class RequestTimeoutError(HTTPError, TimeoutError):
+    """Error that indicates the backend did not respond in time."""
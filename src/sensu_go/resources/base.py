@@ -3,7 +3,8 @@
 import abc
 from typing import cast, List, Optional, Type, TypeVar
 
-from sensu_go.clients.http.base import HTTPClient
+from sensu_go.clients.http.base import AnyHTTPClient, HTTPClient
+from sensu_go.clients.http.deadline import deadline
 from sensu_go.errors import ResponseError
 from sensu_go.typing import JSONItem
 
@@ -33,7 +34,7 @@ class Resource(metaclass=abc.ABCMeta):
         pass
 
     @classmethod
-    def from_api(cls: Type[T], client: HTTPClient, data: JSONItem) -> T:
+    def from_api(cls: Type[T], client: AnyHTTPClient, data: JSONItem) -> T:
         return cls(client, **cls.api_to_native(data, cls.TYPE))
 
     @classmethod
@@ -47,7 +48,7 @@ class Resource(metaclass=abc.ABCMeta):
 
     def __init__(
         self,
-        client: HTTPClient,
+        client: AnyHTTPClient,
         spec: JSONItem,
         metadata: JSONItem,
         type: Optional[str] = None,
@@ -95,42 +96,62 @@ class Resource(metaclass=abc.ABCMeta):
     def class_path(self) -> str:
         return self.get_path(namespace=self.namespace)
 
-    def save(self) -> None:
+    @property
+    def _sync_client(self) -> HTTPClient:
+        if not isinstance(self._client, HTTPClient):
+            raise TypeError(
+                "{} is bound to an asynchronous client. Use the resource "
+                "client's coroutines (save, reload, delete, list) "
+                "instead.".format(self)
+            )
+        return self._client
+
+    def _update_from_api(self, data: JSONItem) -> None:
+        native = self.api_to_native(data, self.type)
+        self._spec = native["spec"]
+        self._metadata = native["metadata"]
+
+    def save(self, timeout: Optional[float] = None) -> None:
         errors = self.validate()
         if errors:
             raise ValueError("\n".join(errors))
 
-        resp = self._client.put(
-            self.path,
-            self.native_to_api(self.spec, self.metadata, self.type, self.api_version),
-        )
-        if resp.status not in (200, 201):
-            raise ResponseError(
-                "Expected 200 or 201 when updating resource",
-                resp.url,
-                resp.status,
-                resp.text,
+        # Timeout covers both the update and the reload that follows it.
+        client = self._sync_client
+        with deadline(timeout), client.span("Resource.save", path=self.path):
+            resp = client.put(
+                self.path,
+                self.native_to_api(
+                    self.spec, self.metadata, self.type, self.api_version
+                ),
             )
-
-        # We need to reload the resource because the backend can add some
-        # default values on top of what we sent.
-        self.reload()
+            if resp.status not in (200, 201):
+                raise ResponseError(
+                    "Expected 200 or 201 when updating resource",
+                    resp.url,
+                    resp.status,
+                    resp.text,
+                )
+
+            # We need to reload the resource because the backend can add some
+            # default values on top of what we sent.
+            self.reload()
 
     def reload(self) -> None:
-        resp = self._client.get(self.path)
-        if resp.status != 200:
-            raise ResponseError(
-                "Expected 200 when fetching resource",
-                resp.url,
-                resp.status,
-                resp.text,
-            )
-        native = self.api_to_native(cast(JSONItem, resp.json), self.type)
-        self._spec = native["spec"]
-        self._metadata = native["metadata"]
+        client = self._sync_client
+        with client.span("Resource.reload", path=self.path):
+            resp = client.get(self.path)
+            if resp.status != 200:
+                raise ResponseError(
+                    "Expected 200 when fetching resource",
+                    resp.url,
+                    resp.status,
+                    resp.text,
+                )
+            self._update_from_api(cast(JSONItem, resp.json))
 
     def delete(self) -> None:
-        resp = self._client.delete(self.path)
+        resp = self._sync_client.delete(self.path)
         if resp.status != 204:
             raise ResponseError(
                 "Expected 204 when deleting resource",
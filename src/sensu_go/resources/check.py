@@ -17,7 +17,7 @@ class Check(V2Mixin, NamespacedResource):
     def events(self) -> ResourceIter[Event]:
         return ResourceIter[Event](
             Event,
-            self._client,
+            self._sync_client,
             Event.get_path(namespace=self.namespace),
             field_selector=Equal("check.name", self.name),
         )
@@ -1,11 +1,21 @@
 # Copyright (c) 2020 XLAB Steampunk
 
-from typing import List
+from typing import List, Optional
 
 from sensu_go.resources.base import Resource
 
 
 class NamespacedResource(Resource):
+    # Core API can list resources from all namespaces if we leave the namespace
+    # out of the path.
+    ALL_NAMESPACES_LIST = True
+
+    @classmethod
+    def get_all_namespaces_path(cls) -> Optional[str]:
+        if not cls.ALL_NAMESPACES_LIST:
+            return None
+        return cls.PATH_TEMPLATE.replace("/namespaces/{namespace}", "")
+
     def validate(self) -> List[str]:
         result = []
         if "name" not in self.metadata:
@@ -9,3 +9,4 @@ class Secret(V1Mixin, NamespacedResource):
     TYPE = "Secret"
     API_VERSION = "secrets/v1"
     FIELD_PREFIX = "secret"
+    ALL_NAMESPACES_LIST = False
@@ -1,6 +1,6 @@
 # Copyright (c) 2020 XLAB Steampunk
 
-from typing import Any, Dict, List, Union
+from typing import Any, Dict, List, Sequence, Union
 
 
 # Custom JSON type. Does not validate much, but at least we have a sensible
@@ -9,3 +9,9 @@ from typing import Any, Dict, List, Union
 JSONItem = Dict[str, Any]
 JSONList = List[Any]
 JSON = Union[bool, float, int, str, JSONList, JSONItem, None]
+
+# Request payload can also be a pre-serialized JSON document.
+Payload = Union[JSON, bytes]
+
+# Clients accept a single backend address or a list of cluster members.
+Address = Union[str, Sequence[str]]
@@ -1,6 +1,8 @@
 # Copyright (c) 2021 XLAB Steampunk
 
-from sensu_go.clients.http.api_key import ApiKeyClient
+import asyncio
+
+from sensu_go.clients.http.api_key import ApiKeyClient, AsyncApiKeyClient
 
 
 class TestAuthHeaderValue:
@@ -8,3 +10,10 @@ class TestAuthHeaderValue:
         client = ApiKeyClient("https://my.url", "api_key")
 
         assert "Key api_key" == client.auth_header_value
+
+
+class TestAsyncAuthHeaderValue:
+    def test_retrieval(self):
+        client = AsyncApiKeyClient("https://my.url", "api_key")
+
+        assert "Key api_key" == asyncio.run(client.auth_header_value())
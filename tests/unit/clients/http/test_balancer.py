@@ -0,0 +1,154 @@
+# Copyright (c) 2021 XLAB Steampunk
+
+import pytest
+
+from sensu_go.clients.http import balancer
+
+
+def make(addresses=("http://a", "http://b", "http://c"), **kwargs):
+    b = balancer.Balancer(**kwargs)
+    b.set_members(addresses)
+    return b
+
+
+class TestBalancer:
+    def test_invalid_strategy(self):
+        with pytest.raises(ValueError, match="strategy"):
+            balancer.Balancer(strategy="random")
+
+    def test_set_members_keeps_statistics(self):
+        b = make(("http://a/", "http://b"))
+        a = b.acquire(exclude=["http://b"])
+        b.release(a, 0.5, False)
+
+        b.set_members(["http://a", "http://c"])
+
+        assert [m.address for m in b.members] == ["http://a", "http://c"]
+        assert b.members[0] is a
+        assert a.ewma == 0.5
+
+    def test_least_outstanding(self):
+        b = make()
+
+        members = [b.acquire() for _ in range(3)]
+
+        assert sorted(m.address for m in members) == [
+            "http://a",
+            "http://b",
+            "http://c",
+        ]
+        b.release(members[1], 0.1, False)
+        assert b.acquire() is members[1]
+
+    def test_exclude(self):
+        b = make()
+
+        assert b.acquire(exclude=["http://a", "http://b"]).address == "http://c"
+        # When we tried everyone, we start over.
+        assert b.acquire(exclude=["http://a", "http://b", "http://c"]) is not None
+
+    def test_ewma(self):
+        b = make(strategy=balancer.EWMA, ewma_alpha=0.5)
+        for member, latency in zip(b.members, (0.4, 0.1, 0.2)):
+            b.acquire(exclude=[m.address for m in b.members if m is not member])
+            b.release(member, latency, False)
+
+        fast = b.acquire()
+        assert fast.address == "http://b"
+        # Member b is now busy, which doubles its cost.
+        assert b.acquire().address == "http://c"
+
+        b.release(fast, 0.5, False)
+        assert fast.ewma == pytest.approx(0.3)
+
+    def test_ejection(self, mocker):
+        mocker.patch("time.monotonic", return_value=100.0)
+        b = make(("http://a", "http://b"), max_failures=2, ejection_time=10)
+        a = b.members[0]
+
+        for _ in range(2):
+            b.acquire(exclude=["http://b"])
+            b.release(a, 1, True)
+
+        assert a.ejected_until == 110.0
+        assert b.acquire(exclude=["http://b"]).address == "http://b"
+        assert b.can_fail_over(["http://b"]) is False
+
+    def test_success_resets_failures(self):
+        b = make(("http://a",), max_failures=2)
+        a = b.members[0]
+
+        for failed in (True, False, True):
+            b.acquire()
+            b.release(a, 1, failed)
+
+        assert a.ejected is False
+
+    def test_all_ejected(self, mocker):
+        mocker.patch("time.monotonic", return_value=100.0)
+        b = make(("http://a", "http://b"), max_failures=1, ejection_time=10)
+        a, bb = b.members
+        b.release(b.acquire(exclude=["http://b"]), 1, True)
+        b.release(b.acquire(exclude=["http://a"]), 1, True)
+        a.ejected_until = 120.0
+
+        assert b.acquire() is bb
+
+    def test_probe(self, mocker):
+        monotonic = mocker.patch("time.monotonic", return_value=100.0)
+        b = make(("http://a", "http://b"), max_failures=1, ejection_time=10)
+        a = b.members[0]
+        b.release(b.acquire(exclude=["http://b"]), 1, True)
+
+        assert b.due_for_probe() == []
+        monotonic.return_value = 111.0
+        assert b.due_for_probe() == [a]
+        assert b.due_for_probe() == []  # Already being probed
+
+        b.probed(a, False)
+        # Ejection time doubles with each consecutive ejection.
+        assert a.ejected_until == 131.0
+
+        monotonic.return_value = 131.0
+        assert b.due_for_probe() == [a]
+        b.probed(a, True)
+        assert a.ejected is False
+        assert a.ejections == 0
+
+    def test_max_ejection_time(self, mocker):
+        mocker.patch("time.monotonic", return_value=0.0)
+        b = make(("http://a",), ejection_time=10, max_ejection_time=15)
+        a = b.members[0]
+
+        b.probed(a, False)
+        b.probed(a, False)
+
+        assert a.ejected_until == 15.0
+
+
+class TestMemberAddresses:
+    def test_addresses(self):
+        data = dict(
+            members=[
+                dict(clientURLs=["http://10.0.0.1:2379", "http://10.0.0.1:2379"]),
+                dict(clientURLs=["https://backend-2:2379"]),
+                dict(clientURLs=["http://[fd00::3]:2379"]),
+                dict(clientURLs=["invalid"]),
+                dict(name="no urls"),
+            ]
+        )
+
+        assert balancer.member_addresses("https://seed:8080", data) == [
+            "https://10.0.0.1:8080",
+            "https://backend-2:8080",
+            "https://[fd00::3]:8080",
+        ]
+
+    def test_seed_without_port(self):
+        data = dict(members=[dict(clientURLs=["http://10.0.0.1:2379"])])
+
+        assert balancer.member_addresses("https://seed", data) == ["https://10.0.0.1"]
+
+    @pytest.mark.parametrize("data", [None, [], dict(members="x"), dict(members=[1])])
+    def test_invalid_data(self, data):
+        assert balancer.member_addresses("https://seed:8080", data) == []
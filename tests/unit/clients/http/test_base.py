@@ -1,44 +1,28 @@
 # Copyright (c) 2020 XLAB Steampunk
 
-import pytest
-
-from sensu_go.clients.http.base import HTTPClient, Response
-from sensu_go.errors import ResponseError
-
-
-class TestResponse:
-    def test_valid_json(self, mocker):
-        response = mocker.Mock()
-        response.url = "https://my.url/"
-        response.status_code = 200
-        response.text = '{"valid":"json"}'
-        response.headers.lower_items.return_value = dict(a="b")
-
-        res = Response(response)
-
-        response.url = "https://my.url/"
-        assert res.status == 200
-        assert res.text == '{"valid":"json"}'
-        assert res.headers == dict(a="b")
-        assert res.json == dict(valid="json")
-        # We test json twice to also exercise memoization
-        assert res.json == dict(valid="json")
+import asyncio
+import gzip
+import json
+import threading
+import time
 
-    def test_invalid_json(self, mocker):
-        response = mocker.Mock()
-        response.url = "https://my.url/here"
-        response.status_code = 204
-        response.text = ""
-        response.headers.lower_items.return_value = {}
-
-        res = Response(response)
+import certifi
+import httpx
+import pytest
+import requests
+import urllib3
 
-        assert res.url == "https://my.url/here"
-        assert res.status == 204
-        assert res.text == ""
-        assert res.headers == {}
-        with pytest.raises(ResponseError):
-            res.json
+from sensu_go.clients.http.base import AsyncHTTPClient, HTTPClient
+from sensu_go.clients.http.balancer import Balancer
+from sensu_go.clients.http.cache import ResponseCache
+from sensu_go.clients.http.deadline import deadline
+from sensu_go.clients.http.hedging import HedgingPolicy
+from sensu_go.clients.http.hooks import NO_SPAN, RequestHook
+from sensu_go.clients.http.limits import ConcurrencyLimiter, RateLimiter
+from sensu_go.clients.http.response import Response
+from sensu_go.clients.http.retry import CircuitBreaker, RetryPolicy
+from sensu_go.clients.http.transport import Transport
+from sensu_go.errors import CircuitOpenError, HTTPError, RequestTimeoutError
 
 
 class DummyClient(HTTPClient):
@@ -94,6 +78,82 @@ class TestHTTPClientConstructor:
         session_mock.return_value.verify == verify_result
 
 
+class TestHTTPClientSession:
+    def test_session(self, requests_mock):
+        mock = requests_mock.get("https://my.url/path")
+        client = DummyClient("https://my.url")
+
+        assert client.session is client.transport.session
+        client.session.headers["X-Custom"] = "value"
+        client.get("/path")
+
+        assert mock.last_request.headers["X-Custom"] == "value"
+
+    def test_custom_transport(self):
+        client = DummyClient("https://my.url", transport=ScriptedTransport())
+
+        with pytest.raises(AttributeError, match="ScriptedTransport"):
+            client.session
+
+
+class TestHTTPClientConnectionPool:
+    def test_default_pool(self):
+        client = DummyClient("https://my.url")
+
+        adapter = client.transport.session.get_adapter("https://my.url")
+        assert adapter._pool_connections == 10
+        assert adapter._pool_maxsize == 10
+        assert adapter._pool_block is False
+
+    def test_custom_pool(self):
+        client = DummyClient(
+            "https://my.url", pool_connections=2, pool_maxsize=64, pool_block=True
+        )
+
+        for url in ("http://my.url", "https://my.url"):
+            adapter = client.transport.session.get_adapter(url)
+            assert adapter._pool_connections == 2
+            assert adapter._pool_maxsize == 64
+            assert adapter._pool_block is True
+
+    def test_idle_connections_are_reaped(self, mocker, requests_mock):
+        requests_mock.get("https://my.url/path")
+        monotonic = mocker.patch("time.monotonic", return_value=100.0)
+        client = DummyClient("https://my.url", idle_timeout=30)
+        close = mocker.spy(
+            client.transport.session.get_adapter("https://my.url"), "close"
+        )
+
+        monotonic.return_value = 120.0
+        client.get("/path")
+        assert close.call_count == 0
+
+        monotonic.return_value = 151.0
+        client.get("/path")
+        assert close.call_count == 2  # Once for each mounted prefix
+
+    def test_idle_connections_are_kept_by_default(self, mocker, requests_mock):
+        requests_mock.get("https://my.url/path")
+        monotonic = mocker.patch("time.monotonic", return_value=100.0)
+        client = DummyClient("https://my.url")
+        close = mocker.spy(
+            client.transport.session.get_adapter("https://my.url"), "close"
+        )
+
+        monotonic.return_value = 100000.0
+        client.get("/path")
+
+        assert close.call_count == 0
+
+    def test_close(self, mocker):
+        session_mock = mocker.patch("requests.Session")
+
+        with DummyClient("https://my.url"):
+            pass
+
+        session_mock.return_value.close.assert_called_once()
+
+
 class TestHTTPClientRequest:
     def test_auth_header(self, requests_mock):
         # Header value comes from our dummy client class
@@ -112,6 +172,762 @@ class TestHTTPClientRequest:
         assert response.text == "return value"
 
 
+class TestHTTPClientRetry:
+    def test_no_retries_by_default(self, requests_mock):
+        mock = requests_mock.get("https://my.url/path", status_code=503)
+        client = DummyClient("https://my.url")
+
+        assert client.get("/path").status == 503
+        assert mock.call_count == 1
+
+    def test_retry_status(self, mocker, requests_mock):
+        sleep = mocker.patch("time.sleep")
+        mock = requests_mock.get(
+            "https://my.url/path",
+            [
+                dict(status_code=503),
+                dict(status_code=429, headers={"Retry-After": "2"}),
+                dict(status_code=200),
+            ],
+        )
+        client = DummyClient(
+            "https://my.url", retry=RetryPolicy(backoff_factor=1, jitter=False)
+        )
+
+        assert client.get("/path").status == 200
+        assert mock.call_count == 3
+        assert sleep.call_args_list == [mocker.call(1), mocker.call(2)]
+
+    def test_retry_gives_up(self, mocker, requests_mock):
+        mocker.patch("time.sleep")
+        mock = requests_mock.get("https://my.url/path", status_code=502)
+        client = DummyClient("https://my.url", retry=RetryPolicy(total=2))
+
+        assert client.get("/path").status == 502
+        assert mock.call_count == 3
+
+    def test_retry_connection_error(self, mocker, requests_mock):
+        mocker.patch("time.sleep")
+        mock = requests_mock.get(
+            "https://my.url/path",
+            [dict(exc=requests.exceptions.ConnectionError), dict(status_code=200)],
+        )
+        client = DummyClient("https://my.url", retry=RetryPolicy())
+
+        assert client.get("/path").status == 200
+        assert mock.call_count == 2
+
+    def test_retry_broken_body(self, mocker, requests_mock):
+        mocker.patch("time.sleep")
+        mock = requests_mock.get(
+            "https://my.url/path",
+            [
+                dict(exc=requests.exceptions.ChunkedEncodingError),
+                dict(status_code=200),
+            ],
+        )
+        client = DummyClient("https://my.url", retry=RetryPolicy(total=3))
+
+        assert client.get("/path").status == 200
+        assert mock.call_count == 2
+
+    def test_do_not_retry_non_idempotent(self, mocker, requests_mock):
+        mocker.patch("time.sleep")
+        mock = requests_mock.post(
+            "https://my.url/path", exc=requests.exceptions.ConnectionError
+        )
+        client = DummyClient("https://my.url", retry=RetryPolicy())
+
+        with pytest.raises(HTTPError):
+            client.post("/path", {})
+        assert mock.call_count == 1
+
+    def test_circuit_breaker(self, requests_mock):
+        mock = requests_mock.get("https://my.url/path", status_code=503)
+        client = DummyClient(
+            "https://my.url", circuit_breaker=CircuitBreaker(failure_threshold=2)
+        )
+
+        client.get("/path")
+        client.get("/path")
+        with pytest.raises(CircuitOpenError):
+            client.get("/path")
+        assert mock.call_count == 2
+
+    def test_unexpected_error_ends_trial(self, requests_mock):
+        requests_mock.get(
+            "https://my.url/path",
+            [dict(status_code=503), dict(exc=RuntimeError), dict(status_code=200)],
+        )
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+        client = DummyClient("https://my.url", circuit_breaker=breaker)
+
+        client.get("/path")
+        with pytest.raises(RuntimeError):
+            client.get("/path")  # Trial request
+
+        assert breaker.state == CircuitBreaker.OPEN
+        assert client.get("/path").status == 200
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_circuit_breaker_stops_retries(self, mocker, requests_mock):
+        mocker.patch("time.sleep")
+        mock = requests_mock.get(
+            "https://my.url/path", exc=requests.exceptions.ConnectionError
+        )
+        client = DummyClient(
+            "https://my.url",
+            retry=RetryPolicy(total=10),
+            circuit_breaker=CircuitBreaker(failure_threshold=3),
+        )
+
+        with pytest.raises(CircuitOpenError):
+            client.get("/path")
+        assert mock.call_count == 3
+
+
+class TestHTTPClientTimeout:
+    def test_no_timeout_by_default(self, requests_mock):
+        mock = requests_mock.get("https://my.url/path")
+        client = DummyClient("https://my.url")
+
+        client.get("/path")
+
+        assert mock.last_request.timeout is None
+
+    @pytest.mark.parametrize("timeout", [5, (1, 10)])
+    def test_timeout(self, requests_mock, timeout):
+        mock = requests_mock.get("https://my.url/path")
+        client = DummyClient("https://my.url", timeout=timeout)
+
+        client.get("/path")
+
+        assert mock.last_request.timeout == timeout
+
+    @pytest.mark.parametrize(
+        "exc", [requests.exceptions.ConnectTimeout, requests.exceptions.ReadTimeout]
+    )
+    def test_timeout_error(self, requests_mock, exc):
+        requests_mock.get("https://my.url/path", exc=exc)
+        client = DummyClient("https://my.url", timeout=1)
+
+        with pytest.raises(RequestTimeoutError, match="timed out"):
+            client.get("/path")
+
+    def test_timeout_error_is_builtin_timeout_error(self, requests_mock):
+        requests_mock.get("https://my.url/path", exc=requests.exceptions.ReadTimeout)
+        client = DummyClient("https://my.url", timeout=1)
+
+        with pytest.raises(TimeoutError):
+            client.get("/path")
+
+    def test_deadline_limits_timeout(self, mocker, requests_mock):
+        monotonic = mocker.patch("time.monotonic", return_value=100.0)
+        mock = requests_mock.get("https://my.url/path")
+        client = DummyClient("https://my.url", timeout=(1, 10))
+
+        with deadline(5):
+            monotonic.return_value = 102.0
+            client.get("/path")
+
+        assert mock.last_request.timeout == (1, 3)
+
+    def test_expired_deadline(self, mocker, requests_mock):
+        monotonic = mocker.patch("time.monotonic", return_value=100.0)
+        mock = requests_mock.get("https://my.url/path")
+        client = DummyClient("https://my.url")
+
+        with deadline(5):
+            monotonic.return_value = 105.0
+            with pytest.raises(RequestTimeoutError, match="Deadline exceeded"):
+                client.get("/path")
+
+        assert mock.call_count == 0
+
+    def test_deadline_stops_retries(self, mocker, requests_mock):
+        sleep = mocker.patch("time.sleep")
+        mock = requests_mock.get("https://my.url/path", status_code=503)
+        client = DummyClient(
+            "https://my.url", retry=RetryPolicy(backoff_factor=1, jitter=False)
+        )
+
+        with deadline(1.5):
+            with pytest.raises(RequestTimeoutError, match="waiting to retry"):
+                client.get("/path")
+
+        # First backoff (1s) fits into the budget, the second one (2s) does not.
+        assert mock.call_count == 2
+        sleep.assert_called_once_with(1)
+
+
+class RecordingHook(RequestHook):
+    def __init__(self):
+        self.requests = []
+        self.spans = []
+
+    def before_request(self, info):
+        info.headers["X-Hook"] = "yes"
+
+    def after_request(self, info):
+        self.requests.append(info)
+
+    def end_span(self, span):
+        self.spans.append(span)
+
+
+class TestHTTPClientHooks:
+    def test_no_hooks(self):
+        client = DummyClient("https://my.url")
+
+        assert client.span("op") is NO_SPAN
+
+    def test_request_info(self, requests_mock):
+        mock = requests_mock.put(
+            "https://my.url/api/core/v2/namespaces/ns/checks/c",
+            status_code=201,
+            content=b"1234",
+        )
+        hook = RecordingHook()
+        client = DummyClient("https://my.url", request_hooks=[hook])
+
+        client.put("/api/core/v2/namespaces/ns/checks/c", dict(a="b"))
+
+        assert mock.last_request.headers["X-Hook"] == "yes"
+        (info,) = hook.requests
+        assert info.method == "PUT"
+        assert info.template == "/api/core/v2/namespaces/{namespace}/checks/{name}"
+        assert info.status == 201
+        assert info.bytes_sent == len(mock.last_request.body)
+        assert info.bytes_received == 4
+        assert info.elapsed >= 0
+        assert info.error is None
+
+    def test_failed_attempts(self, mocker, requests_mock):
+        mocker.patch("time.sleep")
+        requests_mock.get(
+            "https://my.url/path",
+            [dict(exc=requests.exceptions.ConnectionError), dict(status_code=200)],
+        )
+        hook = RecordingHook()
+        client = DummyClient(
+            "https://my.url", retry=RetryPolicy(), request_hooks=[hook]
+        )
+
+        client.get("/path")
+
+        first, second = hook.requests
+        assert (first.attempt, first.status) == (0, None)
+        assert isinstance(first.error, HTTPError)
+        assert (second.attempt, second.status) == (1, 200)
+
+    def test_span(self, requests_mock):
+        requests_mock.get("https://my.url/path")
+        hook = RecordingHook()
+        client = DummyClient("https://my.url", request_hooks=[hook])
+
+        with client.span("op", path="/path") as span:
+            client.get("/path")
+
+        assert hook.spans == [span]
+        assert span.attributes == dict(path="/path")
+
+
+class TestHTTPClientBalancing:
+    def test_single_address(self):
+        client = DummyClient("https://my.url")
+
+        assert client.balancer is None
+
+    def test_no_addresses(self):
+        with pytest.raises(ValueError):
+            DummyClient([])
+
+    def test_reads_are_spread(self, requests_mock):
+        mocks = [requests_mock.get("https://b{}/path".format(i)) for i in range(3)]
+        client = DummyClient(["https://b0/", "https://b1", "https://b2"])
+
+        for _ in range(30):
+            client.get("/path")
+
+        assert client.address == "https://b0"
+        assert all(m.call_count > 0 for m in mocks)
+        assert sum(m.call_count for m in mocks) == 30
+
+    def test_write_fails_over(self, requests_mock):
+        requests_mock.post("https://b0/path", exc=requests.exceptions.ConnectionError)
+        requests_mock.post("https://b1/path", exc=requests.exceptions.ConnectionError)
+        mock = requests_mock.post("https://b2/path", status_code=201)
+        client = DummyClient(["https://b0", "https://b1", "https://b2"])
+        client.balancer.set_members(["https://b0", "https://b1", "https://b2"])
+        for member in client.balancer.members:
+            member.outstanding = dict(b0=0, b1=1, b2=2)[member.address[8:]]
+
+        assert client.post("/path", {}).status == 201
+        assert mock.call_count == 1
+
+    def test_all_members_down(self, requests_mock):
+        for i in range(2):
+            requests_mock.get(
+                "https://b{}/path".format(i), exc=requests.exceptions.ConnectionError
+            )
+        client = DummyClient(["https://b0", "https://b1"])
+
+        with pytest.raises(HTTPError):
+            client.get("/path")
+        assert requests_mock.call_count == 2
+
+    @pytest.mark.parametrize(
+        "exc",
+        [
+            requests.exceptions.ReadTimeout,
+            # Backend stalls after it sends the headers.
+            requests.exceptions.ConnectionError(
+                urllib3.exceptions.ReadTimeoutError(None, "/path", "Read timed out.")
+            ),
+        ],
+    )
+    def test_no_failover_after_write_timeout(self, requests_mock, exc):
+        for i in range(2):
+            requests_mock.post("https://b{}/path".format(i), exc=exc)
+        client = DummyClient(["https://b0", "https://b1"])
+
+        with pytest.raises(RequestTimeoutError):
+            client.post("/path", {})
+        assert requests_mock.call_count == 1
+
+    def test_ejected_member_is_probed(self, mocker, requests_mock):
+        monotonic = mocker.patch("time.monotonic", return_value=100.0)
+        b0 = requests_mock.get(
+            "https://b0/path",
+            [dict(exc=requests.exceptions.ConnectionError), dict(status_code=200)],
+        )
+        b1 = requests_mock.get("https://b1/path")
+        health = requests_mock.get(
+            "https://b0/health", [dict(status_code=503), dict(status_code=200)]
+        )
+        client = DummyClient(
+            ["https://b0", "https://b1"],
+            balancer=Balancer(max_failures=1, ejection_time=10),
+        )
+        b0_member = client.balancer.members[0]
+        client.balancer.members[1].outstanding = 1  # Make sure b0 goes first
+
+        client.get("/path")
+        client.balancer.members[1].outstanding = 0
+        assert (b0.call_count, b1.call_count) == (1, 1)
+        assert b0_member.ejected
+
+        monotonic.return_value = 111.0
+        client.get("/path")
+        assert health.call_count == 1
+        assert b0_member.ejected
+
+        monotonic.return_value = 200.0
+        client.balancer.members[1].outstanding = 1
+        client.get("/path")
+        assert health.call_count == 2
+        assert not b0_member.ejected
+        assert b0.call_count == 2
+        assert "Authorization" not in health.last_request.headers
+
+    def test_discover_members(self, requests_mock):
+        discovery = requests_mock.get(
+            "https://seed:8080/api/core/v2/cluster/members",
+            json=dict(
+                members=[
+                    dict(clientURLs=["http://10.0.0.1:2379"]),
+                    dict(clientURLs=["http://10.0.0.2:2379"]),
+                ]
+            ),
+        )
+        requests_mock.get("https://10.0.0.1:8080/path")
+        requests_mock.get("https://10.0.0.2:8080/path")
+        client = DummyClient("https://seed:8080", discover_members=True)
+
+        client.get("/path")
+        client.get("/path")
+
+        assert discovery.call_count == 1
+        assert [m.address for m in client.balancer.members] == [
+            "https://10.0.0.1:8080",
+            "https://10.0.0.2:8080",
+        ]
+
+    def test_failed_discovery_keeps_seeds(self, requests_mock):
+        requests_mock.get(
+            "https://seed/api/core/v2/cluster/members",
+            exc=requests.exceptions.ConnectionError,
+        )
+        requests_mock.get("https://seed/path")
+        client = DummyClient("https://seed", discover_members=True)
+
+        assert client.get("/path").status == 200
+        assert [m.address for m in client.balancer.members] == ["https://seed"]
+
+    def test_discovery_requires_balancer(self):
+        with pytest.raises(ValueError):
+            DummyClient("https://seed").discover_members()
+
+
+class ScriptedTransport(Transport):
+    # requests_mock serializes requests, which means that we need a transport of
+    # our own to test concurrent ones. Handlers get called in order.
+    def __init__(self, *handlers):
+        self.handlers = list(handlers)
+        self.urls = []
+        self.lock = threading.Lock()
+
+    def send(self, method, url, **kwargs):
+        with self.lock:
+            handler = self.handlers[len(self.urls)]
+            self.urls.append(url)
+        raw = requests.Response()
+        raw.status_code = 200
+        raw.url = url
+        raw._content = handler().encode("utf-8")
+        return Response(raw)
+
+    def close(self):
+        pass
+
+
+class TestHTTPClientHedging:
+    def test_fast_response(self):
+        transport = ScriptedTransport(lambda: "fast")
+        hedging = HedgingPolicy(initial_delay=5)
+        client = DummyClient("https://my.url", transport=transport, hedging=hedging)
+
+        assert client.get("/path").text == "fast"
+        assert transport.urls == ["https://my.url/path"]
+        assert hedging.as_dict()["requests"] == 1
+        assert hedging.as_dict()["hedges"] == 0
+
+    def test_hedge_wins(self):
+        release = threading.Event()
+        transport = ScriptedTransport(
+            lambda: release.wait(5) and "slow", lambda: "fast"
+        )
+        hedging = HedgingPolicy(initial_delay=0.01)
+        client = DummyClient(
+            ["https://b0", "https://b1"], transport=transport, hedging=hedging
+        )
+        client.balancer.members[1].outstanding = 1  # Make sure b0 goes first
+
+        try:
+            assert client.get("/path").text == "fast"
+        finally:
+            release.set()
+        assert transport.urls == ["https://b0/path", "https://b1/path"]
+        assert hedging.as_dict() == dict(requests=1, hedges=1, wins=1, win_rate=1)
+
+    def test_hedge_on_single_member(self):
+        release = threading.Event()
+        transport = ScriptedTransport(
+            lambda: release.wait(5) and "slow", lambda: "fast"
+        )
+        client = DummyClient(
+            "https://my.url",
+            transport=transport,
+            hedging=HedgingPolicy(initial_delay=0.01),
+        )
+
+        try:
+            assert client.get("/path").text == "fast"
+        finally:
+            release.set()
+        assert transport.urls == ["https://my.url/path"] * 2
+
+    def test_original_wins(self):
+        hedge_sent = threading.Event()
+        release = threading.Event()
+
+        def hedge():
+            hedge_sent.set()
+            release.wait(5)
+            return "hedge"
+
+        transport = ScriptedTransport(lambda: hedge_sent.wait(5) and "original", hedge)
+        hedging = HedgingPolicy(initial_delay=0.01)
+        client = DummyClient("https://my.url", transport=transport, hedging=hedging)
+
+        try:
+            assert client.get("/path").text == "original"
+        finally:
+            release.set()
+        assert hedging.as_dict() == dict(requests=1, hedges=1, wins=0, win_rate=0)
+
+    def test_failed_copy_loses(self):
+        release = threading.Event()
+
+        def failing():
+            release.wait(5)
+            raise HTTPError("Connection failed")
+
+        transport = ScriptedTransport(failing, lambda: release.set() or "fast")
+        client = DummyClient(
+            ["https://b0", "https://b1"],
+            transport=transport,
+            hedging=HedgingPolicy(initial_delay=0.01),
+        )
+        client.balancer.members[1].outstanding = 1
+
+        try:
+            assert client.get("/path").text == "fast"
+        finally:
+            release.set()
+
+    def test_both_copies_fail(self, requests_mock):
+        requests_mock.get(
+            "https://my.url/path", exc=requests.exceptions.ConnectionError
+        )
+        client = DummyClient("https://my.url", hedging=HedgingPolicy())
+
+        with pytest.raises(HTTPError):
+            client.get("/path")
+
+    def test_writes_are_not_hedged(self, requests_mock):
+        requests_mock.post("https://my.url/path", status_code=201)
+        hedging = HedgingPolicy(initial_delay=0)
+        client = DummyClient("https://my.url", hedging=hedging)
+
+        client.post("/path", {})
+
+        assert hedging.requests == 0
+        assert requests_mock.call_count == 1
+
+    def test_latency_is_recorded(self, requests_mock):
+        requests_mock.get("https://my.url/path")
+        hedging = HedgingPolicy(min_samples=1, min_delay=0.2)
+        client = DummyClient("https://my.url", hedging=hedging)
+
+        client.get("/path")
+
+        assert hedging.delay() == 0.2
+        assert len(hedging._latencies) == 1
+
+    def test_copies_keep_trace_context(self, requests_mock):
+        tracing = pytest.importorskip("sensu_go.clients.http.tracing")
+        requests_mock.get("https://my.url/path")
+        spans = []
+        client = DummyClient(
+            "https://my.url",
+            hedging=HedgingPolicy(),
+            request_hooks=[tracing.TracingHook(spans.append)],
+        )
+
+        with client.span("parent"):
+            client.get("/path")
+
+        request, parent = spans
+        assert request.parent_id == parent.context.span_id
+
+    def test_close(self, requests_mock):
+        requests_mock.get("https://my.url/path")
+        client = DummyClient("https://my.url", hedging=HedgingPolicy())
+        client.get("/path")
+        executor = client._hedge_executor()
+
+        client.close()
+
+        with pytest.raises(RuntimeError):
+            executor.submit(print)
+
+    def test_cancelled_hedges_release_resources(self):
+        # Primaries finish soon after the hedge delay, so most hedges are still
+        # waiting for the two workers when we cancel them.
+        transport = ScriptedTransport(*[lambda: time.sleep(0.1) or "ok"] * 12)
+        limiter = ConcurrencyLimiter(initial_limit=50)
+        hedging = HedgingPolicy(initial_delay=0.05, max_workers=2)
+        client = DummyClient(
+            ["https://b0", "https://b1"],
+            transport=transport,
+            hedging=hedging,
+            concurrency_limiter=limiter,
+        )
+
+        threads = [
+            threading.Thread(target=client.get, args=("/path",)) for _ in range(6)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # Copies that lost the race still need to finish.
+        time.sleep(0.3)
+
+        assert limiter.in_flight == 0
+        assert [m.outstanding for m in client.balancer.members] == [0, 0]
+
+    def test_workers_do_not_limit_throughput(self):
+        transport = ScriptedTransport(*[lambda: time.sleep(0.2) or "ok"] * 6)
+        hedging = HedgingPolicy(initial_delay=5, max_workers=2)
+        client = DummyClient("https://my.url", transport=transport, hedging=hedging)
+        threads = [
+            threading.Thread(target=client.get, args=("/path",)) for _ in range(6)
+        ]
+
+        start = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert time.monotonic() - start < 0.5
+        assert len(transport.urls) == 6
+
+
+class TestHTTPClientLimits:
+    def test_rate_limit(self, mocker, requests_mock):
+        sleep = mocker.patch("time.sleep")
+        requests_mock.put("https://my.url/path")
+        client = DummyClient(
+            "https://my.url", rate_limiter=RateLimiter(writes=1, burst=1)
+        )
+
+        client.put("/path", {})
+        client.put("/path", {})
+
+        sleep.assert_called_once()
+        assert sleep.call_args[0][0] == pytest.approx(1, 0.1)
+
+    def test_rate_limit_deadline(self, mocker, requests_mock):
+        sleep = mocker.patch("time.sleep")
+        mock = requests_mock.get("https://my.url/path")
+        breaker = CircuitBreaker(failure_threshold=1)
+        client = DummyClient(
+            "https://my.url",
+            rate_limiter=RateLimiter(reads=0.1, burst=1),
+            retry=RetryPolicy(),
+            circuit_breaker=breaker,
+        )
+        client.get("/path")
+
+        with deadline(1):
+            with pytest.raises(RequestTimeoutError, match="rate limiter"):
+                client.get("/path")
+
+        sleep.assert_not_called()
+        assert mock.call_count == 1
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_concurrency_limit_released(self, requests_mock):
+        requests_mock.get("https://my.url/ok")
+        requests_mock.get(
+            "https://my.url/error", exc=requests.exceptions.ConnectionError
+        )
+        limiter = ConcurrencyLimiter(initial_limit=1)
+        client = DummyClient("https://my.url", concurrency_limiter=limiter)
+
+        client.get("/ok")
+        with pytest.raises(HTTPError):
+            client.get("/error")
+
+        assert limiter.in_flight == 0
+
+    @pytest.mark.parametrize("status", [429, 503])
+    def test_concurrency_backoff(self, requests_mock, status):
+        requests_mock.get("https://my.url/path", status_code=status)
+        limiter = ConcurrencyLimiter(initial_limit=10)
+        client = DummyClient("https://my.url", concurrency_limiter=limiter)
+
+        client.get("/path")
+
+        assert limiter.limit == 5
+
+    def test_concurrency_limit_deadline(self, requests_mock):
+        mock = requests_mock.get("https://my.url/path")
+        limiter = ConcurrencyLimiter(initial_limit=1)
+        limiter.acquire()
+        client = DummyClient("https://my.url", concurrency_limiter=limiter)
+
+        with deadline(0.05):
+            with pytest.raises(RequestTimeoutError, match="concurrency limiter"):
+                client.get("/path")
+
+        assert mock.call_count == 0
+
+    def test_hedges_respect_limits(self):
+        transport = ScriptedTransport(lambda: time.sleep(0.2) or "slow")
+        limiter = ConcurrencyLimiter(initial_limit=1)
+        hedging = HedgingPolicy(initial_delay=0.01)
+        client = DummyClient(
+            "https://my.url",
+            transport=transport,
+            hedging=hedging,
+            concurrency_limiter=limiter,
+        )
+
+        assert client.get("/path").text == "slow"
+        assert len(transport.urls) == 1
+        assert hedging.hedges == 0
+        assert limiter.in_flight == 0
+
+
+class TestHTTPClientCompression:
+    def test_accept_gzip(self, requests_mock):
+        requests_mock.get(
+            "https://my.url/path", request_headers={"Accept-Encoding": "gzip"}
+        )
+        client = DummyClient("https://my.url")
+
+        client.get("/path")
+
+    def test_refuse_compression(self, requests_mock):
+        requests_mock.get(
+            "https://my.url/path", request_headers={"Accept-Encoding": "identity"}
+        )
+        client = DummyClient("https://my.url", compress_responses=False)
+
+        client.get("/path")
+
+    def test_decompress_response(self, requests_mock):
+        body = json.dumps([dict(output="x" * 1000)]).encode()
+        requests_mock.get(
+            "https://my.url/path",
+            content=gzip.compress(body),
+            headers={"Content-Encoding": "gzip"},
+        )
+        client = DummyClient("https://my.url")
+
+        resp = client.get("/path")
+
+        assert resp.json == [dict(output="x" * 1000)]
+        stats = client.compression_stats
+        assert stats.response_bytes == len(body)
+        assert stats.response_bytes_received == len(gzip.compress(body))
+
+    def test_requests_are_not_compressed_by_default(self, requests_mock):
+        mock = requests_mock.put("https://my.url/path")
+        client = DummyClient("https://my.url")
+
+        client.put("/path", dict(data="x" * 1000))
+
+        assert "Content-Encoding" not in mock.last_request.headers
+
+    def test_compress_big_requests(self, requests_mock):
+        mock = requests_mock.put("https://my.url/path")
+        client = DummyClient("https://my.url", compress_requests_threshold=100)
+
+        client.put("/path", dict(data="x" * 1000))
+
+        assert mock.last_request.headers["Content-Encoding"] == "gzip"
+        assert json.loads(gzip.decompress(mock.last_request.body)) == dict(
+            data="x" * 1000
+        )
+        stats = client.compression_stats
+        assert stats.request_bytes > 1000
+        assert stats.request_bytes_sent == len(mock.last_request.body)
+
+    def test_keep_small_requests(self, requests_mock):
+        mock = requests_mock.put("https://my.url/path")
+        client = DummyClient("https://my.url", compress_requests_threshold=100)
+
+        client.put("/path", dict(data="x"))
+
+        assert "Content-Encoding" not in mock.last_request.headers
+        assert json.loads(mock.last_request.body) == dict(data="x")
+
+
 class TestHTTPClientGet:
     def test_right_method(self, requests_mock):
         requests_mock.get("https://my.url/get/path")
@@ -119,6 +935,149 @@ class TestHTTPClientGet:
 
         client.get("/get/path")
 
+    def test_stream(self, requests_mock):
+        mock = requests_mock.get("https://my.url/path", json=[1, 2])
+        client = DummyClient("https://my.url")
+
+        resp = client.get("/path", stream=True)
+
+        assert mock.last_request.stream is True
+        assert resp.size is None
+        assert list(resp.iter_json_array()) == [1, 2]
+        assert client.compression_stats.response_bytes == 0
+
+    def test_streamed_responses_are_closed_before_retry(self, mocker, requests_mock):
+        mocker.patch("time.sleep")
+        requests_mock.get(
+            "https://my.url/path", [dict(status_code=503), dict(json=[1])]
+        )
+        close = mocker.spy(Response, "close")
+        client = DummyClient("https://my.url", retry=RetryPolicy())
+
+        assert list(client.get("/path", stream=True).iter_json_array()) == [1]
+        assert close.call_count == 2  # Retried response and the streamed one
+
+    def test_stream_is_not_hedged(self):
+        transport = ScriptedTransport(lambda: time.sleep(0.05) or "[]")
+        hedging = HedgingPolicy(initial_delay=0.01)
+        client = DummyClient(
+            ["https://b0", "https://b1"], transport=transport, hedging=hedging
+        )
+
+        client.get("/path", stream=True)
+
+        assert len(transport.urls) == 1
+        assert hedging.as_dict()["requests"] == 0
+
+
+class TestHTTPClientCache:
+    def test_not_modified(self, mocker, requests_mock):
+        mock = requests_mock.get(
+            "https://my.url/path",
+            [
+                dict(text='{"a":"b"}', headers={"ETag": '"v1"'}),
+                dict(status_code=304),
+            ],
+        )
+        client = DummyClient("https://my.url", cache=ResponseCache())
+
+        first = client.get("/path", dict(limit="1"))
+        first.json
+        loads = mocker.spy(client.codec, "loads")
+        second = client.get("/path", dict(limit="1"))
+
+        assert second is not first
+        assert second.json == dict(a="b")
+        loads.assert_not_called()
+        assert "If-None-Match" not in mock.request_history[0].headers
+        assert mock.request_history[1].headers["If-None-Match"] == '"v1"'
+        assert (client.cache.hits, client.cache.misses) == (1, 1)
+
+    def test_body_is_parsed_once(self, mocker, requests_mock):
+        requests_mock.get(
+            "https://my.url/path",
+            [
+                dict(text='{"a":"b"}', headers={"ETag": '"v1"'}),
+                dict(status_code=304),
+            ],
+        )
+        client = DummyClient("https://my.url", cache=ResponseCache())
+        loads = mocker.spy(client.codec, "loads")
+
+        for _ in range(4):
+            assert client.get("/path").json == dict(a="b")
+
+        assert loads.call_count == 1
+
+    def test_non_json_body(self, requests_mock):
+        requests_mock.get(
+            "https://my.url/path",
+            [
+                dict(text="plain", headers={"ETag": '"v1"'}),
+                dict(status_code=304),
+            ],
+        )
+        client = DummyClient("https://my.url", cache=ResponseCache())
+
+        client.get("/path")
+
+        assert client.get("/path").text == "plain"
+
+    def test_callers_do_not_share_parsed_body(self, requests_mock):
+        requests_mock.get(
+            "https://my.url/path",
+            [
+                dict(text='{"a":{"b":["c"]}}', headers={"ETag": '"v1"'}),
+                dict(status_code=304),
+                dict(status_code=304),
+            ],
+        )
+        client = DummyClient("https://my.url", cache=ResponseCache())
+
+        client.get("/path").json["a"]["b"].append("first")
+        client.get("/path").json["a"]["b"].append("second")
+
+        assert client.get("/path").json == dict(a=dict(b=["c"]))
+
+    def test_modified(self, requests_mock):
+        requests_mock.get(
+            "https://my.url/path",
+            [
+                dict(text='"v1"', headers={"Last-Modified": "Mon"}),
+                dict(text='"v2"', headers={"Last-Modified": "Tue"}),
+                dict(status_code=304),
+            ],
+        )
+        client = DummyClient("https://my.url", cache=ResponseCache())
+
+        assert client.get("/path").json == "v1"
+        assert client.get("/path").json == "v2"
+        assert client.get("/path").json == "v2"
+
+    def test_writes_invalidate_cache(self, requests_mock):
+        mock = requests_mock.get(
+            "https://my.url/c/a", text="{}", headers={"ETag": '"v1"'}
+        )
+        requests_mock.put("https://my.url/c/a")
+        client = DummyClient("https://my.url", cache=ResponseCache())
+
+        client.get("/c/a")
+        client.put("/c/a", {})
+        client.get("/c/a")
+
+        assert "If-None-Match" not in mock.last_request.headers
+
+    def test_no_cache_by_default(self, requests_mock):
+        mock = requests_mock.get(
+            "https://my.url/path", text="{}", headers={"ETag": '"v1"'}
+        )
+        client = DummyClient("https://my.url")
+
+        client.get("/path")
+        client.get("/path")
+
+        assert "If-None-Match" not in mock.last_request.headers
+
 
 class TestHTTPClientPost:
     def test_right_method(self, requests_mock):
@@ -127,6 +1086,43 @@ class TestHTTPClientPost:
 
         client.post("/post/path", dict(post="data"))
 
+    def test_encoded_payload(self, requests_mock):
+        mock = requests_mock.post(
+            "https://my.url/post/path",
+            request_headers={"Content-Type": "application/json"},
+        )
+        client = DummyClient("https://my.url")
+
+        client.post("/post/path", dict(post="data"))
+
+        assert json.loads(mock.last_request.body) == dict(post="data")
+
+    def test_pre_serialized_payload(self, mocker, requests_mock):
+        mock = requests_mock.post(
+            "https://my.url/post/path",
+            request_headers={"Content-Type": "application/json"},
+        )
+        client = DummyClient("https://my.url")
+        dumps = mocker.spy(client.codec, "dumps")
+
+        client.post("/post/path", b'{"post":"data"}')
+
+        assert mock.last_request.body == b'{"post":"data"}'
+        dumps.assert_not_called()
+
+    def test_custom_codec(self, mocker, requests_mock):
+        requests_mock.post("https://my.url/post/path", text='{"a":"b"}')
+        codec = mocker.Mock()
+        codec.dumps.return_value = b"encoded"
+        codec.loads.return_value = "decoded"
+        client = DummyClient("https://my.url", codec=codec)
+
+        response = client.post("/post/path", dict(post="data"))
+
+        codec.dumps.assert_called_once_with(dict(post="data"))
+        assert response.json == "decoded"
+        codec.loads.assert_called_once_with(b'{"a":"b"}')
+
 
 class TestHTTPClientPut:
     def test_right_method(self, requests_mock):
@@ -142,3 +1138,90 @@ class TestHTTPClientDelete:
         client = DummyClient("https://my.url")
 
         client.delete("/delete/path")
+
+    def test_no_body(self, requests_mock):
+        mock = requests_mock.delete("https://my.url/delete/path")
+        client = DummyClient("https://my.url")
+
+        client.delete("/delete/path")
+
+        assert mock.last_request.body is None
+        assert "Content-Type" not in mock.last_request.headers
+
+
+class DummyAsyncClient(AsyncHTTPClient):
+    async def auth_header_value(self):
+        return "dummy header val"
+
+
+def mock_transport(client, handler):
+    client.session = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+class TestAsyncHTTPClientConstructor:
+    @pytest.mark.filterwarnings("error")
+    def test_ca_path(self):
+        # Passing CA bundle paths to httpx directly is deprecated.
+        DummyAsyncClient("https://my.url", ca_path=certifi.where())
+
+    @pytest.mark.parametrize("verify", [True, False])
+    def test_verify(self, mocker, verify):
+        client = mocker.patch("httpx.AsyncClient")
+
+        DummyAsyncClient("https://my.url", verify=verify)
+
+        assert client.call_args[1]["verify"] is verify
+
+
+class TestAsyncHTTPClientRequest:
+    def test_auth_header(self):
+        def handler(request):
+            assert request.headers["authorization"] == "dummy header val"
+            return httpx.Response(404, text="return value")
+
+        client = DummyAsyncClient("https://my.url/")
+        mock_transport(client, handler)
+
+        response = asyncio.run(client.request("GET", "/some/path"))
+
+        assert response.url == "https://my.url/some/path"
+        assert response.status == 404
+        assert response.text == "return value"
+
+    def test_headers_and_json(self):
+        def handler(request):
+            return httpx.Response(
+                200, json=dict(valid="json"), headers={"Sensu-Continue": "token"}
+            )
+
+        client = DummyAsyncClient("https://my.url")
+        mock_transport(client, handler)
+
+        response = asyncio.run(client.get("/path"))
+
+        assert response.headers["sensu-continue"] == "token"
+        assert response.json == dict(valid="json")
+
+    @pytest.mark.parametrize("method", ["post", "put"])
+    def test_payload(self, method):
+        def handler(request):
+            assert request.method == method.upper()
+            assert json.loads(request.content) == dict(my="data")
+            return httpx.Response(201)
+
+        client = DummyAsyncClient("https://my.url")
+        mock_transport(client, handler)
+
+        response = asyncio.run(getattr(client, method)("/path", dict(my="data")))
+
+        assert response.status == 201
+
+    def test_connection_error(self):
+        def handler(request):
+            raise httpx.ConnectError("refused")
+
+        client = DummyAsyncClient("https://my.url")
+        mock_transport(client, handler)
+
+        with pytest.raises(HTTPError, match="GET https://my.url/path failed"):
+            asyncio.run(client.get("/path"))
@@ -0,0 +1,111 @@
+# Copyright (c) 2021 XLAB Steampunk
+
+import pytest
+
+from sensu_go.clients.http.cache import ResponseCache
+
+
+def response(mocker, size=10, etag='"tag"', last_modified=None):
+    resp = mocker.Mock()
+    resp.content = b"x" * size
+    resp.headers = {}
+    if etag:
+        resp.headers["etag"] = etag
+    if last_modified:
+        resp.headers["last-modified"] = last_modified
+    return resp
+
+
+class TestResponseCache:
+    def test_key_ignores_query_order(self):
+        assert ResponseCache.key("/p", dict(a="1", b="2")) == ResponseCache.key(
+            "/p", dict(b="2", a="1")
+        )
+        assert ResponseCache.key("/p") != ResponseCache.key("/p", dict(a="1"))
+
+    def test_store_and_get(self, mocker):
+        cache = ResponseCache()
+        resp = response(mocker, etag='"a"', last_modified="yesterday")
+
+        cache.store(ResponseCache.key("/p"), resp)
+        entry = cache.get(ResponseCache.key("/p"))
+
+        assert entry.response is resp.copy.return_value
+        assert entry.validators == {
+            "If-None-Match": '"a"',
+            "If-Modified-Since": "yesterday",
+        }
+        assert cache.size == 10
+
+    def test_skip_responses_without_validators(self, mocker):
+        cache = ResponseCache()
+
+        cache.store(ResponseCache.key("/p"), response(mocker, etag=None))
+
+        assert cache.get(ResponseCache.key("/p")) is None
+
+    def test_lru_eviction(self, mocker):
+        cache = ResponseCache(max_bytes=25)
+        for path in ("/a", "/b"):
+            cache.store(ResponseCache.key(path), response(mocker))
+        cache.get(ResponseCache.key("/a"))  # Makes /b least recently used
+
+        cache.store(ResponseCache.key("/c"), response(mocker))
+
+        assert cache.get(ResponseCache.key("/b")) is None
+        assert cache.get(ResponseCache.key("/a")) is not None
+        assert cache.get(ResponseCache.key("/c")) is not None
+        assert cache.size == 20
+
+    def test_skip_oversized_responses(self, mocker):
+        cache = ResponseCache(max_bytes=5)
+
+        cache.store(ResponseCache.key("/a"), response(mocker))
+
+        assert len(cache) == 0
+
+    def test_replace_entry(self, mocker):
+        cache = ResponseCache()
+
+        cache.store(ResponseCache.key("/a"), response(mocker, size=10))
+        cache.store(ResponseCache.key("/a"), response(mocker, size=4))
+
+        assert len(cache) == 1
+        assert cache.size == 4
+
+    @pytest.mark.parametrize(
+        "path,ttl",
+        [("/other", 300), ("/api/x", 10), ("/api/events/x", None), ("/api/no", 0)],
+    )
+    def test_ttl_lookup(self, path, ttl):
+        cache = ResponseCache(ttls={"/api": 10, "/api/events": None, "/api/no": 0})
+
+        assert cache.ttl(path) == ttl
+
+    def test_expiry(self, mocker):
+        monotonic = mocker.patch("time.monotonic", return_value=100)
+        cache = ResponseCache(default_ttl=10)
+        cache.store(ResponseCache.key("/a"), response(mocker))
+
+        monotonic.return_value = 109
+        assert cache.get(ResponseCache.key("/a")) is not None
+        monotonic.return_value = 110
+        assert cache.get(ResponseCache.key("/a")) is None
+        assert cache.size == 0
+
+    def test_zero_ttl_disables_caching(self, mocker):
+        cache = ResponseCache(ttls={"/a": 0})
+
+        cache.store(ResponseCache.key("/a/b"), response(mocker))
+
+        assert len(cache) == 0
+
+    def test_invalidate(self, mocker):
+        cache = ResponseCache()
+        for path in ("/c", "/c/a", "/c/b"):
+            cache.store(ResponseCache.key(path), response(mocker))
+        cache.store(ResponseCache.key("/c", dict(limit="1")), response(mocker))
+
+        cache.invalidate("/c/a")
+
+        assert [k[0] for k in cache._entries] == ["/c/b"]
@@ -0,0 +1,55 @@
+# Copyright (c) 2021 XLAB Steampunk
+
+import pytest
+
+from sensu_go.clients.http import codec
+
+
+@pytest.fixture(params=["stdlib", "orjson", "ujson"])
+def any_codec(request):
+    if request.param == "stdlib":
+        return codec.StdlibCodec()
+    if request.param == "orjson":
+        pytest.importorskip("orjson")
+        return codec.OrjsonCodec()
+    pytest.importorskip("ujson")
+    return codec.UjsonCodec()
+
+
+class TestCodecs:
+    def test_round_trip(self, any_codec):
+        data = dict(a=[1, 2.5, None, True], b="š", c=dict(d="e"))
+
+        encoded = any_codec.dumps(data)
+
+        assert isinstance(encoded, bytes)
+        assert any_codec.loads(encoded) == data
+
+    def test_invalid_input(self, any_codec):
+        with pytest.raises(ValueError):
+            any_codec.loads(b"} <- not a JSON")
+
+
+class TestDefaultCodec:
+    def test_prefer_orjson(self, mocker):
+        mocker.patch.object(codec, "HAS_ORJSON", True)
+
+        assert isinstance(codec.default_codec(), codec.OrjsonCodec)
+
+    def test_fallback_to_ujson(self, mocker):
+        mocker.patch.object(codec, "HAS_ORJSON", False)
+        mocker.patch.object(codec, "HAS_UJSON", True)
+
+        assert isinstance(codec.default_codec(), codec.UjsonCodec)
+
+    def test_fallback_to_stdlib(self, mocker):
+        mocker.patch.object(codec, "HAS_ORJSON", False)
+        mocker.patch.object(codec, "HAS_UJSON", False)
+
+        assert isinstance(codec.default_codec(), codec.StdlibCodec)
+
+    def test_missing_library(self, mocker):
+        mocker.patch.object(codec, "HAS_UJSON", False)
+
+        with pytest.raises(ImportError, match="ujson"):
+            codec.UjsonCodec()
@@ -0,0 +1,38 @@
+# Copyright (c) 2021 XLAB Steampunk
+
+import gzip
+
+from sensu_go.clients.http.compression import compress_body, CompressionStats
+
+
+class TestCompressBody:
+    def test_small_body(self):
+        headers = {}
+
+        assert compress_body(b"data", headers, 5) == b"data"
+        assert headers == {}
+
+    def test_big_body(self):
+        headers = {}
+
+        body = compress_body(b"data" * 100, headers, 5)
+
+        assert gzip.decompress(body) == b"data" * 100
+        assert headers == {"Content-Encoding": "gzip"}
+
+
+class TestCompressionStats:
+    def test_counters(self):
+        stats = CompressionStats()
+
+        stats.record_request(100, 20)
+        stats.record_request(10, 10)
+        stats.record_response(1000, 100)
+
+        assert stats.as_dict() == dict(
+            request_bytes=110,
+            request_bytes_sent=30,
+            response_bytes=1000,
+            response_bytes_received=100,
+            bytes_saved=980,
+        )
@@ -0,0 +1,79 @@
+# Copyright (c) 2021 XLAB Steampunk
+
+import pytest
+
+from sensu_go.clients.http import deadline
+from sensu_go.errors import RequestTimeoutError
+
+
+class TestDeadline:
+    def test_no_deadline_by_default(self):
+        assert deadline.current() is None
+        assert deadline.remaining() is None
+
+    def test_deadline(self, mocker):
+        monotonic = mocker.patch("time.monotonic", return_value=100.0)
+
+        with deadline.deadline(10):
+            assert deadline.current() == 110.0
+            monotonic.return_value = 104.0
+            assert deadline.remaining() == 6.0
+
+        assert deadline.current() is None
+
+    def test_no_timeout(self):
+        with deadline.deadline(None):
+            assert deadline.current() is None
+
+    def test_nested_deadline_can_shorten_budget(self, mocker):
+        mocker.patch("time.monotonic", return_value=100.0)
+
+        with deadline.deadline(10):
+            with deadline.deadline(3):
+                assert deadline.current() == 103.0
+            assert deadline.current() == 110.0
+
+    def test_nested_deadline_cannot_extend_budget(self, mocker):
+        mocker.patch("time.monotonic", return_value=100.0)
+
+        with deadline.deadline(3):
+            with deadline.deadline(10):
+                assert deadline.current() == 103.0
+            with deadline.deadline(None):
+                assert deadline.current() == 103.0
+
+
+class TestCheck:
+    def test_no_deadline(self):
+        assert deadline.check("GET /") is None
+
+    def test_budget_left(self, mocker):
+        mocker.patch("time.monotonic", return_value=100.0)
+
+        with deadline.deadline_at(102.5):
+            assert deadline.check("GET /") == 2.5
+
+    def test_budget_exhausted(self, mocker):
+        mocker.patch("time.monotonic", return_value=100.0)
+
+        with deadline.deadline_at(100.0):
+            with pytest.raises(RequestTimeoutError, match="before GET /"):
+                deadline.check("GET /")
+
+
+class TestLimit:
+    @pytest.mark.parametrize(
+        "timeout,left,result",
+        [
+            (None, None, None),
+            (5, None, 5),
+            ((1, 5), None, (1, 5)),
+            (None, 3, 3),
+            (5, 3, 3),
+            (2, 3, 2),
+            ((1, 5), 3, (1, 3)),
+            ((4, 5), 3, (3, 3)),
+        ],
+    )
+    def test_limit(self, timeout, left, result):
+        assert deadline.limit(timeout, left) == result
@@ -0,0 +1,61 @@
+# Copyright (c) 2021 XLAB Steampunk
+
+import pytest
+
+from sensu_go.clients.http.hedging import HedgingPolicy
+
+
+class TestHedgingPolicy:
+    @pytest.mark.parametrize("quantile", [0, 1, 1.5])
+    def test_invalid_quantile(self, quantile):
+        with pytest.raises(ValueError, match="Quantile"):
+            HedgingPolicy(quantile=quantile)
+
+    def test_non_idempotent_methods(self):
+        with pytest.raises(ValueError, match="POST"):
+            HedgingPolicy(methods=("GET", "POST"))
+
+    def test_applies(self):
+        policy = HedgingPolicy(methods=("GET", "PUT"))
+
+        assert policy.applies("GET")
+        assert policy.applies("PUT")
+        assert not policy.applies("DELETE")
+
+    def test_initial_delay(self):
+        policy = HedgingPolicy(initial_delay=0.2, min_samples=3)
+        policy.observe(1.0)
+        policy.observe(1.0)
+
+        assert policy.delay() == 0.2
+
+    def test_quantile_delay(self):
+        policy = HedgingPolicy(quantile=0.9, min_samples=10)
+        for i in range(1, 11):
+            policy.observe(i / 10)
+
+        assert policy.delay() == pytest.approx(0.9)
+
+    def test_min_delay(self):
+        policy = HedgingPolicy(min_delay=0.05, min_samples=1)
+        policy.observe(0.001)
+
+        assert policy.delay() == 0.05
+
+    def test_window(self):
+        policy = HedgingPolicy(quantile=0.5, window=2, min_samples=1)
+        for latency in (5.0, 0.1, 0.1):
+            policy.observe(latency)
+
+        assert policy.delay() == pytest.approx(0.1)
+
+    def test_counters(self):
+        policy = HedgingPolicy()
+        policy.record(hedged=False, won=False)
+        policy.record(hedged=True, won=False)
+        policy.record(hedged=True, won=True)
+
+        assert policy.as_dict() == dict(requests=3, hedges=2, wins=1, win_rate=0.5)
+
+    def test_no_hedges(self):
+        assert HedgingPolicy().as_dict()["win_rate"] is None
@@ -0,0 +1,109 @@
+# Copyright (c) 2021 XLAB Steampunk
+
+import pytest
+
+from sensu_go.clients.http import hooks
+
+
+class TestPathTemplate:
+    @pytest.mark.parametrize(
+        "path,template",
+        [
+            ("/auth", "/auth"),
+            ("/auth/token", "/auth/token"),
+            ("/api/core/v2", "/api/core/v2"),
+            ("/api/core/v2/namespaces", "/api/core/v2/namespaces"),
+            ("/api/core/v2/namespaces/dev", "/api/core/v2/namespaces/{name}"),
+            (
+                "/api/core/v2/namespaces/dev/checks",
+                "/api/core/v2/namespaces/{namespace}/checks",
+            ),
+            (
+                "/api/core/v2/namespaces/dev/checks/check",
+                "/api/core/v2/namespaces/{namespace}/checks/{name}",
+            ),
+            (
+                "/api/core/v2/namespaces/dev/events/entity/check",
+                "/api/core/v2/namespaces/{namespace}/events/{name}/{name}",
+            ),
+            ("/api/core/v2/users/user", "/api/core/v2/users/{name}"),
+            (
+                "/api/enterprise/secrets/v1/namespaces/default/secrets/db",
+                "/api/enterprise/secrets/v1/namespaces/{namespace}/secrets/{name}",
+            ),
+            (
+                "/api/enterprise/secrets/v1/providers/vault",
+                "/api/enterprise/secrets/v1/providers/{name}",
+            ),
+            (
+                "/api/enterprise/store/v1/provider/pg",
+                "/api/enterprise/store/v1/provider/{name}",
+            ),
+            ("/api/enterprise/secrets/v1", "/api/enterprise/secrets/v1"),
+            ("/api/unknown", "/api/unknown"),
+        ],
+    )
+    def test_template(self, path, template):
+        assert hooks.path_template(path) == template
+
+
+class TestRequestInfo:
+    def test_template(self):
+        info = hooks.RequestInfo("GET", "/api/core/v2/users/u", {}, None, 0)
+
+        assert info.template == "/api/core/v2/users/{name}"
+        assert info.status is None
+        assert info.error is None
+
+
+class Recorder(hooks.RequestHook):
+    def __init__(self, name, events):
+        self.name = name
+        self.events = events
+
+    def start_span(self, span):
+        self.events.append((self.name, "start", span.name))
+
+    def end_span(self, span):
+        self.events.append((self.name, "end", span.name, span.error))
+
+
+class TestSpan:
+    def test_hooks_are_called_in_order(self, mocker):
+        mocker.patch("time.monotonic", side_effect=[1.0, 3.5])
+        events = []
+        recorders = [Recorder("a", events), Recorder("b", events)]
+
+        with hooks.span(recorders, "op", dict(path="/p")) as s:
+            assert s.name == "op"
+            assert s.attributes == dict(path="/p")
+
+        assert s.elapsed == 2.5
+        assert events == [
+            ("a", "start", "op"),
+            ("b", "start", "op"),
+            ("b", "end", "op", None),
+            ("a", "end", "op", None),
+        ]
+
+    def test_error(self):
+        events = []
+        error = ValueError("boom")
+
+        with pytest.raises(ValueError):
+            with hooks.span([Recorder("a", events)], "op", {}):
+                raise error
+
+        assert events[-1] == ("a", "end", "op", error)
+
+    def test_base_hook_does_nothing(self):
+        hook = hooks.RequestHook()
+        info = hooks.RequestInfo("GET", "/", {}, None, 0)
+
+        with hooks.span([hook], "op", {}):
+            hook.before_request(info)
+            hook.after_request(info)
+
+    def test_no_span(self):
+        with hooks.NO_SPAN as s:
+            assert s is None
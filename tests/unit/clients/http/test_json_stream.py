@@ -0,0 +1,79 @@
+# Copyright (c) 2021 XLAB Steampunk
+
+import json
+
+import pytest
+
+from sensu_go.clients.http.json_stream import iter_array, iter_chunks
+
+
+def parse(content, size):
+    return list(iter_array(iter_chunks(content, size)))
+
+
+class TestIterChunks:
+    def test_chunks(self):
+        assert list(iter_chunks(b"abcde", 2)) == [b"ab", b"cd", b"e"]
+
+    def test_empty(self):
+        assert list(iter_chunks(b"", 2)) == []
+
+
+class TestIterArray:
+    @pytest.mark.parametrize("size", [1, 2, 3, 7, 64, 1 << 20])
+    def test_chunk_sizes(self, size):
+        data = [
+            dict(name="a", output='brackets ]}[{, and "quotes"\\', n=[1, 2.5]),
+            12345,
+            -1.5e3,
+            "str",
+            None,
+            True,
+            False,
+            [],
+            {},
+        ]
+
+        assert parse(json.dumps(data).encode(), size) == data
+
+    @pytest.mark.parametrize("size", [1, 2, 3])
+    def test_multibyte_characters_across_chunks(self, size):
+        data = ["š€", "\U0001f600"]
+
+        assert parse(json.dumps(data, ensure_ascii=False).encode(), size) == data
+
+    def test_number_across_chunks(self):
+        assert list(iter_array([b"[12", b"34", b"]"])) == [1234]
+
+    @pytest.mark.parametrize(
+        "chunks,result",
+        [
+            ([b"[1", b"2, 3.", b"5, 1e", b"3]"], [12, 3.5, 1000.0]),
+            ([b"[-", b"1, 2E", b"+", b"1]"], [-1, 20.0]),
+            ([b"[1.5e-", b"1, tr", b"ue]"], [0.15, True]),
+        ],
+    )
+    def test_number_cut_after_sign_or_dot(self, chunks, result):
+        assert list(iter_array(chunks)) == result
+
+    def test_whitespace(self):
+        assert parse(b" \n[ 1 ,\t2 ]\r\n", 1) == [1, 2]
+
+    def test_empty_array(self):
+        assert parse(b"[ ]", 1) == []
+
+    def test_elements_come_in_as_they_are_complete(self):
+        chunks = iter([b'[{"a": 1},', b' {"b": 2}]'])
+        items = iter_array(chunks)
+
+        assert next(items) == dict(a=1)
+        # Second chunk is still there.
+        assert next(chunks) == b' {"b": 2}]'
+
+    @pytest.mark.parametrize(
+        "content",
+        [b"", b"{}", b"[", b"[1,", b"[1 2]", b"[1,]", b"[1]x", b"[tru]"],
+    )
+    def test_invalid(self, content):
+        with pytest.raises(ValueError):
+            parse(content, 1)
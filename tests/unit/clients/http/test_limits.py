@@ -0,0 +1,165 @@
+# Copyright (c) 2021 XLAB Steampunk
+
+import threading
+
+import pytest
+
+from sensu_go.clients.http.limits import (
+    ConcurrencyLimiter,
+    RateLimiter,
+    TokenBucket,
+)
+
+
+@pytest.fixture
+def clock(mocker):
+    clock = mocker.patch("time.monotonic", return_value=100.0)
+    sleep = mocker.patch("time.sleep")
+    # Sleeping moves the clock forward.
+    sleep.side_effect = lambda s: setattr(clock, "return_value", clock() + s)
+    return clock
+
+
+class TestTokenBucket:
+    def test_invalid_rate(self):
+        with pytest.raises(ValueError):
+            TokenBucket(0)
+
+    def test_burst(self, clock):
+        bucket = TokenBucket(2, burst=3)
+
+        for _ in range(3):
+            assert bucket.acquire()
+        assert clock() == 100.0
+
+    def test_wait(self, clock):
+        bucket = TokenBucket(2, burst=1)
+
+        bucket.acquire()
+        bucket.acquire()
+        bucket.acquire()
+
+        assert clock() == pytest.approx(101.0)
+
+    def test_refill(self, clock):
+        bucket = TokenBucket(1, burst=2)
+        bucket.acquire()
+        bucket.acquire()
+
+        clock.return_value += 10
+
+        bucket.acquire()
+        bucket.acquire()
+        assert clock() == pytest.approx(110.0)
+
+    def test_timeout(self, clock):
+        bucket = TokenBucket(1)
+        bucket.acquire()
+
+        assert bucket.acquire(timeout=0.5) is False
+        assert bucket.acquire(timeout=1) is True
+        assert clock() == pytest.approx(101.0)
+
+
+class TestRateLimiter:
+    def test_separate_buckets(self, clock):
+        limiter = RateLimiter(reads=10, writes=1)
+
+        for _ in range(10):
+            limiter.acquire("GET")
+        limiter.acquire("PUT")
+        assert clock() == 100.0
+
+        limiter.acquire("DELETE")
+        assert clock() == pytest.approx(101.0)
+
+    def test_unlimited(self, clock):
+        limiter = RateLimiter(writes=1)
+
+        for _ in range(100):
+            assert limiter.acquire("GET", 0)
+        assert clock() == 100.0
+
+
+class TestConcurrencyLimiter:
+    @pytest.mark.parametrize(
+        "kwargs",
+        [
+            dict(min_limit=0),
+            dict(min_limit=5, initial_limit=4),
+            dict(initial_limit=20, max_limit=10),
+            dict(backoff_ratio=1),
+        ],
+    )
+    def test_invalid(self, kwargs):
+        with pytest.raises(ValueError):
+            ConcurrencyLimiter(**kwargs)
+
+    def test_acquire_timeout(self):
+        limiter = ConcurrencyLimiter(initial_limit=2)
+
+        assert limiter.acquire(0)
+        assert limiter.acquire(0)
+        assert not limiter.acquire(0)
+        assert limiter.in_flight == 2
+
+    def test_release_wakes_waiters(self):
+        limiter = ConcurrencyLimiter(initial_limit=1)
+        limiter.acquire()
+        acquired = []
+        thread = threading.Thread(target=lambda: acquired.append(limiter.acquire(5)))
+        thread.start()
+
+        limiter.release(0.0, overloaded=False)
+        thread.join()
+
+        assert acquired == [True]
+
+    def test_additive_increase(self, clock):
+        limiter = ConcurrencyLimiter(initial_limit=2, max_limit=3)
+
+        for _ in range(4):
+            limiter.acquire()
+            limiter.release(clock(), overloaded=False)
+        assert limiter.limit == 3
+
+        for _ in range(10):
+            limiter.acquire()
+            limiter.release(clock(), overloaded=False)
+        assert limiter.limit == 3
+
+    def test_multiplicative_decrease(self, clock):
+        limiter = ConcurrencyLimiter(initial_limit=16, min_limit=3)
+
+        for _ in range(3):
+            clock.return_value += 1
+            start = clock()
+            limiter.acquire()
+            limiter.release(start, overloaded=True)
+
+        assert limiter.limit == 3
+        assert limiter.backoffs == 3
+
+    def test_single_backoff_per_overload(self, clock):
+        limiter = ConcurrencyLimiter(initial_limit=16)
+        start = clock()
+        for _ in range(5):
+            limiter.acquire()
+        clock.return_value += 1
+
+        for _ in range(5):
+            limiter.release(start, overloaded=True)
+
+        assert limiter.limit == 8
+        assert limiter.backoffs == 1
+
+    def test_latency_spike(self, clock):
+        limiter = ConcurrencyLimiter(initial_limit=10, latency_tolerance=2)
+        for elapsed in (0.1, 0.15, 0.5):
+            start = clock()
+            limiter.acquire()
+            clock.return_value += elapsed
+            limiter.release(start, overloaded=False)
+
+        assert limiter.limit == 5
+        assert limiter.as_dict()["baseline_latency"] == pytest.approx(0.104, 0.01)
@@ -0,0 +1,148 @@
+# Copyright (c) 2021 XLAB Steampunk
+
+from sensu_go.clients.http import hooks, metrics
+from sensu_go.errors import HTTPError
+
+
+def request(method, path, status=200, elapsed=0.1, sent=0, received=0, error=None):
+    info = hooks.RequestInfo(method, path, {}, None, 0)
+    info.status = status
+    info.elapsed = elapsed
+    info.bytes_sent = sent
+    info.bytes_received = received
+    info.error = error
+    return info
+
+
+def span(name, elapsed, error=None):
+    s = hooks.Span(name, {})
+    s.elapsed = elapsed
+    s.error = error
+    return s
+
+
+class TestHistogram:
+    def test_observe(self):
+        h = metrics.Histogram([1, 0.1])
+
+        h.observe(0.05)
+        h.observe(0.1)
+        h.observe(0.5)
+        h.observe(3)
+
+        assert h.buckets == (0.1, 1)
+        assert h.count == 4
+        assert h.sum == 3.65
+        assert h.cumulative() == [(0.1, 2), (1, 3), (float("inf"), 4)]
+
+    def test_quantile(self):
+        h = metrics.Histogram([0.1, 1])
+        assert h.quantile(0.5) is None
+
+        for value in (0.05, 0.05, 0.5, 5):
+            h.observe(value)
+
+        assert h.quantile(0.5) == 0.1
+        assert h.quantile(0.75) == 1
+        assert h.quantile(0.99) == float("inf")
+
+
+class TestMetricsCollector:
+    def test_requests(self):
+        collector = metrics.MetricsCollector(buckets=[0.1, 1])
+
+        collector.after_request(
+            request("GET", "/api/core/v2/namespaces/a/checks/x", received=10)
+        )
+        collector.after_request(
+            request("GET", "/api/core/v2/namespaces/b/checks/y", 503, 0.5)
+        )
+        collector.after_request(
+            request("PUT", "/api/core/v2/namespaces/a/checks/x", 201, sent=7)
+        )
+        collector.after_request(
+            request(
+                "PUT", "/api/core/v2/namespaces/a/checks/x", None, 2, 7, 0, HTTPError()
+            )
+        )
+
+        result = collector.as_dict()["requests"]
+        get = result["GET /api/core/v2/namespaces/{namespace}/checks/{name}"]
+        assert get == dict(
+            latency=dict(count=2, sum=0.6, buckets={"0.1": 1, "1": 2, "+Inf": 2}),
+            errors=1,
+            statuses={200: 1, 503: 1},
+            bytes_sent=0,
+            bytes_received=10,
+        )
+        put = result["PUT /api/core/v2/namespaces/{namespace}/checks/{name}"]
+        assert put["errors"] == 1
+        assert put["statuses"] == {201: 1}
+        assert put["bytes_sent"] == 14
+
+    def test_spans(self):
+        collector = metrics.MetricsCollector(buckets=[1])
+
+        collector.end_span(span("Resource.save", 0.5))
+        collector.end_span(span("Resource.save", 2, ValueError()))
+
+        assert collector.as_dict()["spans"] == {
+            "Resource.save": dict(
+                latency=dict(count=2, sum=2.5, buckets={"1": 1, "+Inf": 2}),
+                errors=1,
+            )
+        }
+
+    def test_reset(self):
+        collector = metrics.MetricsCollector()
+        collector.after_request(request("GET", "/auth"))
+        collector.end_span(span("op", 1))
+
+        collector.reset()
+
+        assert collector.as_dict() == dict(requests={}, spans={})
+
+    def test_prometheus(self):
+        collector = metrics.MetricsCollector(buckets=[0.5])
+        collector.after_request(request("GET", "/auth", 200, 0.25, 0, 20))
+        collector.end_span(span("Resource.save", 1.0, ValueError()))
+
+        assert collector.prometheus() == "\n".join(
+            [
+                "# TYPE sensu_go_request_duration_seconds histogram",
+                'sensu_go_request_duration_seconds_bucket{method="GET",'
+                'endpoint="/auth",le="0.5"} 1',
+                'sensu_go_request_duration_seconds_bucket{method="GET",'
+                'endpoint="/auth",le="+Inf"} 1',
+                'sensu_go_request_duration_seconds_sum{method="GET",'
+                'endpoint="/auth"} 0.25',
+                'sensu_go_request_duration_seconds_count{method="GET",'
+                'endpoint="/auth"} 1',
+                "# TYPE sensu_go_requests_total counter",
+                'sensu_go_requests_total{method="GET",endpoint="/auth",'
+                'status="200"} 1',
+                "# TYPE sensu_go_request_errors_total counter",
+                'sensu_go_request_errors_total{method="GET",endpoint="/auth"} 0',
+                "# TYPE sensu_go_request_sent_bytes_total counter",
+                'sensu_go_request_sent_bytes_total{method="GET",endpoint="/auth"} 0',
+                "# TYPE sensu_go_request_received_bytes_total counter",
+                'sensu_go_request_received_bytes_total{method="GET",'
+                'endpoint="/auth"} 20',
+                "# TYPE sensu_go_span_duration_seconds histogram",
+                'sensu_go_span_duration_seconds_bucket{span="Resource.save",'
+                'le="0.5"} 0',
+                'sensu_go_span_duration_seconds_bucket{span="Resource.save",'
+                'le="+Inf"} 1',
+                'sensu_go_span_duration_seconds_sum{span="Resource.save"} 1.0',
+                'sensu_go_span_duration_seconds_count{span="Resource.save"} 1',
+                "# TYPE sensu_go_span_errors_total counter",
+                'sensu_go_span_errors_total{span="Resource.save"} 1',
+                "",
+            ]
+        )
+
+    def test_prometheus_escapes_labels(self):
+        collector = metrics.MetricsCollector()
+        collector.end_span(span('a"b\\c', 1.0))
+
+        assert 'span="a\\"b\\\\c"' in collector.prometheus()
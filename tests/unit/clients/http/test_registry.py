@@ -0,0 +1,124 @@
+# Copyright (c) 2021 XLAB Steampunk
+
+import pytest
+
+from sensu_go import Client
+from sensu_go.clients.http.hooks import RequestHook
+from sensu_go.clients.http.registry import (
+    client_key,
+    ClientRegistry,
+    default_registry,
+)
+from sensu_go.clients.http.retry import RetryPolicy
+
+
+def key(address="https://my.url", api_key="key", **kwargs):
+    return client_key(address, api_key, None, None, True, None, **kwargs)
+
+
+class TestClientKey:
+    def test_same_settings(self):
+        hook = RequestHook()
+
+        assert key(request_hooks=[hook]) == key(request_hooks=[hook])
+        assert key("https://my.url/") == key("https://my.url")
+        assert key(["https://a", "https://b"]) == key(("https://a", "https://b"))
+
+    @pytest.mark.parametrize(
+        "other",
+        [
+            key("https://other.url"),
+            key(api_key="other"),
+            client_key("https://my.url", "key", None, None, False, None),
+            client_key("https://my.url", "key", None, None, True, "/ca"),
+            key(timeout=5),
+            key(retry=RetryPolicy()),
+        ],
+    )
+    def test_different_settings(self, other):
+        assert key() != other
+
+    def test_no_plain_credentials(self):
+        assert "secret" not in repr(key(api_key="secret"))
+
+
+class TestClientRegistry:
+    def test_acquire_shares_client(self, mocker):
+        factory = mocker.Mock()
+        registry = ClientRegistry()
+
+        first = registry.acquire("k", factory)
+        second = registry.acquire("k", factory)
+
+        assert first is second
+        factory.assert_called_once()
+        assert registry.references(first) == 2
+        assert len(registry) == 1
+
+    def test_release_closes_last(self, mocker):
+        client = mocker.Mock()
+        registry = ClientRegistry()
+        registry.acquire("k", lambda: client)
+        registry.acquire("k", lambda: client)
+
+        registry.release(client)
+        client.close.assert_not_called()
+
+        registry.release(client)
+        client.close.assert_called_once()
+        assert len(registry) == 0
+
+    def test_release_unknown(self, mocker):
+        with pytest.raises(ValueError):
+            ClientRegistry().release(mocker.Mock())
+
+    def test_close(self, mocker):
+        clients = [mocker.Mock(), mocker.Mock()]
+        registry = ClientRegistry()
+        for i, client in enumerate(clients):
+            registry.acquire(i, lambda: client)
+
+        registry.close()
+
+        assert len(registry) == 0
+        for client in clients:
+            client.close.assert_called_once()
+
+
+class TestSharedClient:
+    @pytest.fixture(autouse=True)
+    def registry(self):
+        yield default_registry
+        default_registry.close()
+
+    def test_shared(self, registry):
+        first = Client("https://my.url", api_key="key", shared=True)
+        second = Client("https://my.url/", api_key="key", shared=True)
+        other = Client("https://my.url", api_key="other", shared=True)
+
+        assert first.http_client is second.http_client
+        assert first.http_client is not other.http_client
+        assert second.checks._client is first.http_client
+        assert len(registry) == 2
+
+    def test_not_shared(self, registry):
+        first = Client("https://my.url", api_key="key")
+        second = Client("https://my.url", api_key="key")
+
+        assert first.http_client is not second.http_client
+        assert len(registry) == 0
+
+    def test_close(self, mocker, registry):
+        first = Client("https://my.url", api_key="key", shared=True)
+        second = Client("https://my.url", api_key="key", shared=True)
+        close = mocker.spy(first.http_client, "close")
+
+        first.close()
+        first.close()
+        close.assert_not_called()
+        assert registry.references(second.http_client) == 1
+
+        with second:
+            pass
+        close.assert_called_once()
+        assert len(registry) == 0
@@ -0,0 +1,222 @@
+# Copyright (c) 2020 XLAB Steampunk
+
+import io
+import json
+
+import httpx
+import pytest
+import requests
+import urllib3
+
+from sensu_go.clients.http.response import HTTPXResponse, Response
+from sensu_go.errors import HTTPError, RequestTimeoutError, ResponseError
+
+
+class TestResponse:
+    def test_valid_json(self, mocker):
+        response = mocker.Mock()
+        response.url = "https://my.url/"
+        response.status_code = 200
+        response.content = b'{"valid":"json"}'
+        response.encoding = "utf-8"
+        response.headers.lower_items.return_value = dict(a="b")
+
+        res = Response(response)
+
+        response.url = "https://my.url/"
+        assert res.status == 200
+        assert res.text == '{"valid":"json"}'
+        assert res.headers == dict(a="b")
+        assert res.json == dict(valid="json")
+        # We test json twice to also exercise memoization
+        assert res.json == dict(valid="json")
+
+    def test_invalid_json(self, mocker):
+        response = mocker.Mock()
+        response.url = "https://my.url/here"
+        response.status_code = 204
+        response.content = b""
+        response.encoding = None
+        response.headers.lower_items.return_value = {}
+
+        res = Response(response)
+
+        assert res.url == "https://my.url/here"
+        assert res.status == 204
+        assert res.text == ""
+        assert res.headers == {}
+        with pytest.raises(ResponseError):
+            res.json
+
+    def test_lazy_decoding(self, mocker):
+        response = mocker.Mock()
+        response.content = b'[{"a":"\xc5\xa1"}]'
+        response.encoding = "utf-8"
+        loads = mocker.spy(json, "loads")
+
+        res = Response(response)
+
+        response.headers.lower_items.assert_not_called()
+        loads.assert_not_called()
+        assert res.json == [dict(a="\u0161")]
+        assert res.json == [dict(a="\u0161")]
+        loads.assert_called_once_with(b'[{"a":"\xc5\xa1"}]')
+        assert not hasattr(res, "_text")
+
+    def test_text_respects_encoding(self, mocker):
+        response = mocker.Mock()
+        response.content = "\u010d".encode("utf-16")
+        response.encoding = "utf-16"
+
+        assert Response(response).text == "\u010d"
+
+    def test_invalid_bytes_in_error(self, mocker):
+        response = mocker.Mock()
+        response.url = "https://my.url/"
+        response.status_code = 500
+        response.content = b"\xff not json"
+        response.encoding = None
+
+        with pytest.raises(ResponseError, match="not json"):
+            Response(response).json
+
+    def test_copy(self, mocker):
+        response = mocker.Mock()
+        response.content = b'{"a":["b"]}'
+        response.encoding = "utf-8"
+        res = Response(response)
+        res.json["a"].append("c")
+
+        copy = res.copy()
+        copy.json["a"].append("d")
+
+        assert copy.content is res.content
+        assert res.json == dict(a=["b", "c"])
+        assert copy.json == dict(a=["b", "c", "d"])
+
+    def test_iter_json_array(self, mocker):
+        response = mocker.Mock()
+        response.content = b'[{"a":"\xc5\xa1"}, 2]'
+        response.encoding = "utf-8"
+        loads = mocker.spy(json, "loads")
+
+        res = Response(response)
+
+        assert list(res.iter_json_array(chunk_size=3)) == [dict(a="\u0161"), 2]
+        loads.assert_not_called()
+
+    def test_iter_json_array_invalid(self, mocker):
+        response = mocker.Mock()
+        response.url = "https://my.url/"
+        response.status_code = 200
+        response.content = b'[{"a": 1}, not json]'
+        response.encoding = None
+
+        items = Response(response).iter_json_array()
+
+        assert next(items) == dict(a=1)
+        with pytest.raises(ResponseError, match="not json"):
+            next(items)
+
+
+def streamed(body):
+    raw = requests.Response()
+    raw.url = "https://my.url/"
+    raw.status_code = 200
+    raw.raw = io.BytesIO(body)
+    return raw
+
+
+class TestStreamedResponse:
+    def test_body_is_not_read_up_front(self):
+        raw = streamed(b"[1, 2, 3]")
+
+        res = Response(raw, stream=True)
+
+        assert raw.raw.tell() == 0
+        assert res.size is None
+
+    def test_iter_json_array(self):
+        raw = streamed(b"[1, 2, 3]")
+        items = Response(raw, stream=True).iter_json_array(chunk_size=2)
+
+        assert next(items) == 1
+        assert raw.raw.tell() < 9
+
+    def test_size_is_known_at_the_end(self):
+        res = Response(streamed(b"[1, 2, 3]"), stream=True)
+
+        assert list(res.iter_json_array(chunk_size=2)) == [1, 2, 3]
+        assert res.size == 9
+        assert res.received_bytes == 9
+
+    def test_content(self):
+        res = Response(streamed(b'{"a":1}'), stream=True)
+
+        assert res.content == b'{"a":1}'
+        assert res.json == dict(a=1)
+        assert res.size == 7
+
+    def test_close_when_caller_stops(self):
+        raw = streamed(b"[1, 2, 3]")
+        items = Response(raw, stream=True).iter_json_array(chunk_size=2)
+
+        next(items)
+        items.close()
+
+        assert raw.raw.closed
+
+    def test_invalid(self):
+        items = Response(streamed(b"[1, not json]"), stream=True).iter_json_array()
+
+        with pytest.raises(ResponseError):
+            list(items)
+
+    def test_broken_connection(self, mocker):
+        raw = streamed(b"")
+        raw.raw = mocker.Mock(spec=["read", "close"])
+        raw.raw.read.side_effect = requests.exceptions.ConnectionError
+
+        with pytest.raises(HTTPError, match="https://my.url/"):
+            list(Response(raw, stream=True).iter_json_array())
+
+    def test_read_timeout(self, mocker):
+        raw = streamed(b"")
+        raw.raw = mocker.Mock(spec=["read", "close"])
+        raw.raw.read.side_effect = requests.exceptions.ConnectionError(
+            urllib3.exceptions.ReadTimeoutError(None, "/", "Read timed out.")
+        )
+
+        with pytest.raises(RequestTimeoutError):
+            list(Response(raw, stream=True).iter_json_array())
+
+
+class TestHTTPXResponse:
+    def test_response(self):
+        raw = httpx.Response(
+            200,
+            headers={"Sensu-Continue": "token"},
+            content=b'{"a":1}',
+            request=httpx.Request("GET", "https://my.url/path"),
+        )
+
+        res = HTTPXResponse(raw)
+
+        assert res.url == "https://my.url/path"
+        assert res.status == 200
+        assert res.headers["sensu-continue"] == "token"
+        assert res.json == dict(a=1)
+
+    def test_stream(self):
+        raw = httpx.Response(
+            200,
+            stream=httpx.ByteStream(b"[1, 2]"),
+            request=httpx.Request("GET", "https://my.url/path"),
+        )
+
+        res = HTTPXResponse(raw, stream=True)
+
+        assert res.size is None
+        assert list(res.iter_json_array(chunk_size=1)) == [1, 2]
+        assert res.size == 6
+        assert raw.is_closed
@@ -0,0 +1,131 @@
+# Copyright (c) 2021 XLAB Steampunk
+
+import email.utils
+
+import pytest
+
+from sensu_go.clients.http.retry import CircuitBreaker, parse_retry_after, RetryPolicy
+from sensu_go.errors import CircuitOpenError
+
+
+class TestParseRetryAfter:
+    @pytest.mark.parametrize(
+        "value,result",
+        [(None, None), ("", None), ("3", 3.0), ("1.5", 1.5), ("-2", 0.0), ("x", None)],
+    )
+    def test_parse(self, value, result):
+        assert parse_retry_after(value) == result
+
+    def test_http_date(self, mocker):
+        mocker.patch("time.time", return_value=1000.0)
+
+        assert parse_retry_after(email.utils.formatdate(1010, usegmt=True)) == 10.0
+
+
+class TestRetryPolicy:
+    @pytest.mark.parametrize("method", ["GET", "PUT", "DELETE"])
+    def test_idempotent(self, method):
+        policy = RetryPolicy(total=2)
+
+        assert policy.should_retry_error(method, 0)
+        assert policy.should_retry_status(method, 503, 1)
+        assert not policy.should_retry_status(method, 500, 0)
+        assert not policy.should_retry_status(method, 503, 2)
+
+    def test_non_idempotent(self):
+        policy = RetryPolicy()
+
+        assert not policy.should_retry_error("POST", 0)
+        assert not policy.should_retry_status("POST", 503, 0)
+        assert policy.should_retry_status("POST", 429, 0)
+
+    def test_non_idempotent_errors_opt_in(self):
+        assert RetryPolicy(retry_non_idempotent_errors=True).should_retry_error(
+            "POST", 0
+        )
+
+    def test_exponential_backoff(self):
+        policy = RetryPolicy(backoff_factor=1, max_backoff=5, jitter=False)
+
+        assert [policy.get_backoff(a) for a in range(5)] == [1, 2, 4, 5, 5]
+
+    def test_jitter(self, mocker):
+        uniform = mocker.patch("random.uniform", return_value=0.3)
+
+        assert RetryPolicy(backoff_factor=1).get_backoff(2) == 0.3
+        uniform.assert_called_once_with(0, 4)
+
+    def test_retry_after(self):
+        policy = RetryPolicy(max_backoff=10)
+
+        assert policy.get_backoff(0, "7") == 7
+        assert policy.get_backoff(0, "70") == 10
+
+    def test_ignore_retry_after(self):
+        policy = RetryPolicy(backoff_factor=1, jitter=False, respect_retry_after=False)
+
+        assert policy.get_backoff(0, "7") == 1
+
+
+class TestCircuitBreaker:
+    def test_open_after_threshold(self):
+        breaker = CircuitBreaker(failure_threshold=2)
+
+        breaker.record_failure()
+        breaker.before_request("url")
+        breaker.record_failure()
+
+        assert breaker.state == CircuitBreaker.OPEN
+        with pytest.raises(CircuitOpenError):
+            breaker.before_request("url")
+
+    def test_success_resets_failures(self):
+        breaker = CircuitBreaker(failure_threshold=2)
+
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_half_open_trial(self, mocker):
+        monotonic = mocker.patch("time.monotonic", return_value=0)
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+        breaker.record_failure()
+
+        monotonic.return_value = 10
+        breaker.before_request("url")  # Trial request goes through
+        with pytest.raises(CircuitOpenError):
+            breaker.before_request("url")  # Others still fail fast
+
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_lost_trial_expires(self, mocker):
+        monotonic = mocker.patch("time.monotonic", return_value=0)
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+        breaker.record_failure()
+
+        monotonic.return_value = 10
+        breaker.before_request("url")  # Trial that never reports back
+        monotonic.return_value = 19
+        with pytest.raises(CircuitOpenError):
+            breaker.before_request("url")
+
+        monotonic.return_value = 20
+        breaker.before_request("url")
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+
+    def test_failed_trial_reopens(self, mocker):
+        monotonic = mocker.patch("time.monotonic", return_value=0)
+        breaker = CircuitBreaker(failure_threshold=3, reset_timeout=10)
+        for _ in range(3):
+            breaker.record_failure()
+
+        monotonic.return_value = 10
+        breaker.before_request("url")
+        breaker.record_failure()
+
+        assert breaker.state == CircuitBreaker.OPEN
+        with pytest.raises(CircuitOpenError):
+            breaker.before_request("url")
@@ -0,0 +1,77 @@
+# Copyright (c) 2021 XLAB Steampunk
+
+import os
+import stat
+import sys
+import threading
+
+import pytest
+
+from sensu_go.clients.http.token_cache import FileTokenCache, Tokens
+
+
+class TestFileTokenCache:
+    def test_default_path(self, monkeypatch, tmp_path):
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+
+        assert FileTokenCache().path == str(tmp_path / "sensu-go" / "tokens.json")
+
+    def test_round_trip(self, tmp_path):
+        cache = FileTokenCache(str(tmp_path / "dir" / "tokens.json"))
+        tokens = Tokens("at", "rt", 123.0)
+
+        cache.store("https://my.url", "user", tokens)
+
+        assert cache.load("https://my.url", "user") == tokens
+        assert cache.load("https://my.url", "other") is None
+        assert cache.load("https://other.url", "user") is None
+
+    def test_multiple_entries(self, tmp_path):
+        cache = FileTokenCache(str(tmp_path / "tokens.json"))
+
+        cache.store("https://my.url", "a", Tokens("at1", "rt1", None))
+        cache.store("https://my.url", "b", Tokens("at2", "rt2", 1.0))
+
+        assert cache.load("https://my.url", "a") == Tokens("at1", "rt1", None)
+        assert cache.load("https://my.url", "b") == Tokens("at2", "rt2", 1.0)
+
+    @pytest.mark.parametrize(
+        "content", ["", "not json", "[]", '{"x": 1}', '{"%s": {"access_token": 1}}']
+    )
+    def test_corrupted_cache(self, tmp_path, content):
+        path = tmp_path / "tokens.json"
+        cache = FileTokenCache(str(path))
+        path.write_text(content.replace("%s", cache._key("https://my.url", "user")))
+
+        assert cache.load("https://my.url", "user") is None
+
+    @pytest.mark.skipif(sys.platform == "win32", reason="POSIX permissions")
+    def test_permissions(self, tmp_path):
+        path = tmp_path / "dir" / "tokens.json"
+        cache = FileTokenCache(str(path))
+
+        with cache.lock("https://my.url", "user"):
+            cache.store("https://my.url", "user", Tokens("at", "rt", None))
+
+        assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+        assert stat.S_IMODE(os.stat(str(path) + ".lock").st_mode) == 0o600
+        assert stat.S_IMODE(os.stat(path.parent).st_mode) == 0o700
+
+    @pytest.mark.skipif(sys.platform == "win32", reason="POSIX locking")
+    def test_lock_is_exclusive(self, tmp_path):
+        cache = FileTokenCache(str(tmp_path / "tokens.json"))
+        other = FileTokenCache(str(tmp_path / "tokens.json"))
+        events = []
+
+        def worker():
+            with other.lock("https://my.url", "user"):
+                events.append("other")
+
+        with cache.lock("https://my.url", "user"):
+            thread = threading.Thread(target=worker)
+            thread.start()
+            thread.join(0.1)
+            events.append("first")
+        thread.join()
+
+        assert events == ["first", "other"]
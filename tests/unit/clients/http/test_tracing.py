@@ -0,0 +1,223 @@
+# Copyright (c) 2021 XLAB Steampunk
+
+import pytest
+import requests
+
+from sensu_go.clients.http import tracing
+from sensu_go.clients.http.api_key import ApiKeyClient
+from sensu_go.clients.resource.namespaced import NamespacedClient
+from sensu_go.errors import HTTPError
+from sensu_go.resources.check import Check
+
+TRACEPARENT = "00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01"
+PATH = "https://my.url/api/core/v2/namespaces/default/checks/a"
+
+
+def check(name):
+    return dict(metadata=dict(name=name, namespace="default"), command="c")
+
+
+def mock_create(requests_mock):
+    get = requests_mock.get(PATH, [dict(status_code=404), dict(json=check("a"))])
+    put = requests_mock.put(PATH, status_code=201)
+    return get, put
+
+
+class TestSpanContext:
+    def test_traceparent(self):
+        context = tracing.SpanContext("a" * 32, "b" * 16)
+
+        assert context.traceparent == "00-{}-{}-01".format("a" * 32, "b" * 16)
+        assert context._replace(sampled=False).traceparent.endswith("-00")
+
+    def test_from_traceparent(self):
+        context = tracing.SpanContext.from_traceparent(TRACEPARENT)
+
+        assert context == tracing.SpanContext(
+            "0af7651916cd43dd8448eb211c80319c", "b7ad6b7169203331", True
+        )
+
+    @pytest.mark.parametrize(
+        "value",
+        [
+            "",
+            "garbage",
+            "01-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01",
+            "00-00000000000000000000000000000000-b7ad6b7169203331-01",
+            "00-0af7651916cd43dd8448eb211c80319c-0000000000000000-01",
+        ],
+    )
+    def test_invalid_traceparent(self, value):
+        assert tracing.SpanContext.from_traceparent(value) is None
+
+    def test_not_sampled(self):
+        context = tracing.SpanContext.from_traceparent(TRACEPARENT[:-2] + "00")
+
+        assert context.sampled is False
+
+
+class TestRemoteParent:
+    def test_remote_parent(self):
+        with tracing.remote_parent(TRACEPARENT) as context:
+            assert tracing.current_context() == context
+            assert context.span_id == "b7ad6b7169203331"
+        assert tracing.current_context() is None
+
+    def test_invalid(self):
+        with tracing.remote_parent("garbage") as context:
+            assert context is None
+
+
+class TestTracingHook:
+    def test_create_span_tree(self, requests_mock):
+        get, put = mock_create(requests_mock)
+        spans = []
+        client = NamespacedClient(
+            ApiKeyClient(
+                "https://my.url",
+                "key",
+                request_hooks=[tracing.TracingHook(spans.append)],
+            ),
+            Check,
+            "default",
+        )
+
+        client.create(dict(command="c"), dict(name="a"))
+
+        by_name = {}
+        for span in spans:
+            by_name.setdefault(span.name, []).append(span)
+        (create,) = by_name["ResourceClient.create"]
+        (save,) = by_name["Resource.save"]
+        (reload,) = by_name["Resource.reload"]
+        find, reload_get = by_name[
+            "GET /api/core/v2/namespaces/{namespace}/checks/{name}"
+        ]
+        (put_span,) = by_name["PUT /api/core/v2/namespaces/{namespace}/checks/{name}"]
+
+        assert len({s.context.trace_id for s in spans}) == 1
+        assert create.parent_id is None
+        assert find.parent_id == create.context.span_id
+        assert save.parent_id == create.context.span_id
+        assert put_span.parent_id == save.context.span_id
+        assert reload.parent_id == save.context.span_id
+        assert reload_get.parent_id == reload.context.span_id
+
+        assert find.kind == "client"
+        assert find.attributes["http.status_code"] == 404
+        assert create.kind == "internal"
+        assert create.attributes == dict(path=PATH[len("https://my.url") :])
+
+        headers = [r.headers["traceparent"] for r in get.request_history]
+        assert headers == [find.context.traceparent, reload_get.context.traceparent]
+        assert put.last_request.headers["traceparent"] == put_span.context.traceparent
+        assert tracing.current_context() is None
+
+    def test_remote_parent(self, requests_mock):
+        requests_mock.get("https://my.url/path")
+        spans = []
+        client = ApiKeyClient(
+            "https://my.url", "key", request_hooks=[tracing.TracingHook(spans.append)]
+        )
+
+        with tracing.remote_parent(TRACEPARENT):
+            client.get("/path")
+
+        (span,) = spans
+        assert span.context.trace_id == "0af7651916cd43dd8448eb211c80319c"
+        assert span.parent_id == "b7ad6b7169203331"
+
+    def test_not_sampled(self, requests_mock):
+        mock = requests_mock.get("https://my.url/path")
+        spans = []
+        client = ApiKeyClient(
+            "https://my.url", "key", request_hooks=[tracing.TracingHook(spans.append)]
+        )
+
+        with tracing.remote_parent(TRACEPARENT[:-2] + "00"):
+            client.get("/path")
+
+        assert spans == []
+        assert mock.last_request.headers["traceparent"].endswith("-00")
+
+    def test_error(self, requests_mock):
+        requests_mock.get(
+            "https://my.url/path", exc=requests.exceptions.ConnectionError
+        )
+        spans = []
+        client = ApiKeyClient(
+            "https://my.url", "key", request_hooks=[tracing.TracingHook(spans.append)]
+        )
+
+        with pytest.raises(HTTPError):
+            client.get("/path")
+
+        (span,) = spans
+        assert isinstance(span.error, HTTPError)
+
+
+class TestOpenTelemetryHook:
+    @pytest.fixture
+    def exporter(self):
+        sdk_trace = pytest.importorskip("opentelemetry.sdk.trace")
+        export = pytest.importorskip("opentelemetry.sdk.trace.export")
+        in_memory = pytest.importorskip(
+            "opentelemetry.sdk.trace.export.in_memory_span_exporter"
+        )
+
+        exporter = in_memory.InMemorySpanExporter()
+        provider = sdk_trace.TracerProvider()
+        provider.add_span_processor(export.SimpleSpanProcessor(exporter))
+        exporter.provider = provider
+        return exporter
+
+    def test_create(self, requests_mock, exporter):
+        get, put = mock_create(requests_mock)
+        client = NamespacedClient(
+            ApiKeyClient(
+                "https://my.url",
+                "key",
+                request_hooks=[tracing.OpenTelemetryHook(exporter.provider)],
+            ),
+            Check,
+            "default",
+        )
+
+        client.create(dict(command="c"), dict(name="a"))
+
+        spans = {s.name: s for s in exporter.get_finished_spans()}
+        create = spans["ResourceClient.create"]
+        save = spans["Resource.save"]
+        put_span = spans["PUT /api/core/v2/namespaces/{namespace}/checks/{name}"]
+        assert save.parent.span_id == create.context.span_id
+        assert put_span.parent.span_id == save.context.span_id
+        assert put_span.attributes["http.status_code"] == 201
+        # Trace flags differ between OpenTelemetry versions.
+        traceparent = put.last_request.headers["traceparent"]
+        assert traceparent.startswith(
+            "00-{:032x}-{:016x}-".format(
+                put_span.context.trace_id, put_span.context.span_id
+            )
+        )
+
+    def test_error(self, requests_mock, exporter):
+        requests_mock.get(
+            "https://my.url/path", exc=requests.exceptions.ConnectionError
+        )
+        client = ApiKeyClient(
+            "https://my.url",
+            "key",
+            request_hooks=[tracing.OpenTelemetryHook(exporter.provider)],
+        )
+
+        with pytest.raises(HTTPError):
+            client.get("/path")
+
+        (span,) = exporter.get_finished_spans()
+        assert not span.status.is_ok
+
+    def test_missing_dependency(self, mocker):
+        mocker.patch.dict("sys.modules", {"opentelemetry": None})
+
+        with pytest.raises(ImportError, match="opentelemetry"):
+            tracing.OpenTelemetryHook()
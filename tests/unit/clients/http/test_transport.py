@@ -0,0 +1,194 @@
+# Copyright (c) 2021 XLAB Steampunk
+
+import ssl
+
+import certifi
+import httpx
+import pytest
+import requests
+import urllib3
+
+from sensu_go.clients.http import transport
+from sensu_go.clients.http.api_key import ApiKeyClient
+from sensu_go.clients.http.codec import StdlibCodec
+from sensu_go.clients.http.response import Response
+from sensu_go.errors import HTTPError, RequestTimeoutError
+
+
+def send(t, method="GET", url="https://my.url/path", **kwargs):
+    params = dict(
+        data=None, headers={}, query=None, auth=None, timeout=None, codec=StdlibCodec()
+    )
+    params.update(kwargs)
+    return t.send(method, url, **params)
+
+
+class TestRequestsTransport:
+    def test_send(self, requests_mock):
+        mock = requests_mock.put("https://my.url/path", status_code=201, json=[1])
+
+        resp = send(
+            transport.RequestsTransport(),
+            "PUT",
+            data=b"{}",
+            headers={"X": "y"},
+            query=dict(a="b"),
+            timeout=(1, 2),
+        )
+
+        assert resp.status == 201
+        assert resp.json == [1]
+        assert mock.last_request.body == b"{}"
+        assert mock.last_request.headers["X"] == "y"
+        assert mock.last_request.qs == dict(a=["b"])
+        assert mock.last_request.timeout == (1, 2)
+
+    @pytest.mark.parametrize(
+        "exc,error",
+        [
+            (requests.exceptions.ConnectionError, HTTPError),
+            (requests.exceptions.ChunkedEncodingError, HTTPError),
+            (requests.exceptions.ContentDecodingError, HTTPError),
+            (requests.exceptions.ConnectTimeout, RequestTimeoutError),
+            (requests.exceptions.ReadTimeout, RequestTimeoutError),
+            (
+                requests.exceptions.ConnectionError(
+                    urllib3.exceptions.ReadTimeoutError(None, "/path", "timed out")
+                ),
+                RequestTimeoutError,
+            ),
+        ],
+    )
+    def test_errors(self, requests_mock, exc, error):
+        requests_mock.get("https://my.url/path", exc=exc)
+
+        with pytest.raises(error):
+            send(transport.RequestsTransport())
+
+    def test_stream(self, requests_mock):
+        mock = requests_mock.get("https://my.url/path", json=[1, 2])
+
+        resp = send(transport.RequestsTransport(), stream=True)
+
+        assert mock.last_request.stream is True
+        assert resp.size is None
+        assert list(resp.iter_json_array()) == [1, 2]
+
+    def test_verify(self):
+        t = transport.RequestsTransport("ca_bundle")
+
+        assert t.session.verify == "ca_bundle"
+
+
+class TestHTTPXVerify:
+    def test_ca_path(self):
+        assert isinstance(transport.httpx_verify(certifi.where()), ssl.SSLContext)
+
+    @pytest.mark.parametrize("verify", [True, False])
+    def test_bool(self, verify):
+        assert transport.httpx_verify(verify) is verify
+
+
+def http2_transport(handler):
+    t = transport.HTTP2Transport()
+    t.session = httpx.Client(transport=httpx.MockTransport(handler))
+    return t
+
+
+class TestHTTP2Transport:
+    def test_http2_is_enabled(self, mocker):
+        client = mocker.patch("httpx.Client")
+
+        transport.HTTP2Transport(max_connections=4)
+
+        assert client.call_args[1]["http2"] is True
+        assert client.call_args[1]["limits"].max_connections == 4
+
+    def test_missing_dependencies(self, mocker):
+        mocker.patch.object(transport, "HAS_H2", False)
+
+        with pytest.raises(ImportError, match="http2"):
+            transport.HTTP2Transport()
+
+    def test_send(self):
+        def handler(request):
+            assert request.method == "PUT"
+            assert request.url == "https://my.url/path?a=b"
+            assert request.headers["X"] == "y"
+            assert request.content == b"{}"
+            assert request.extensions["timeout"]["connect"] == 1
+            assert request.extensions["timeout"]["read"] == 2
+            return httpx.Response(201, json=[1])
+
+        resp = send(
+            http2_transport(handler),
+            "PUT",
+            data=b"{}",
+            headers={"X": "y"},
+            query=dict(a="b"),
+            timeout=(1, 2),
+        )
+
+        assert resp.status == 201
+        assert resp.json == [1]
+
+    def test_no_timeout(self):
+        def handler(request):
+            assert request.extensions["timeout"]["read"] is None
+            return httpx.Response(200)
+
+        send(http2_transport(handler))
+
+    def test_stream(self):
+        def handler(request):
+            return httpx.Response(200, stream=httpx.ByteStream(b"[1, 2]"))
+
+        resp = send(http2_transport(handler), stream=True)
+
+        assert resp.size is None
+        assert list(resp.iter_json_array()) == [1, 2]
+
+    @pytest.mark.parametrize(
+        "exc,error",
+        [
+            (httpx.ConnectError, HTTPError),
+            (httpx.ConnectTimeout, RequestTimeoutError),
+            (httpx.ReadTimeout, RequestTimeoutError),
+        ],
+    )
+    def test_errors(self, exc, error):
+        def handler(request):
+            raise exc("boom", request=request)
+
+        with pytest.raises(error):
+            send(http2_transport(handler))
+
+
+class DummyTransport(transport.Transport):
+    def __init__(self, response):
+        self.response = response
+        self.requests = []
+        self.closed = False
+
+    def send(self, method, url, **kwargs):
+        self.requests.append((method, url, kwargs))
+        return self.response
+
+    def close(self):
+        self.closed = True
+
+
+class TestCustomTransport:
+    def test_client_uses_transport(self, mocker):
+        raw = mocker.Mock(url="https://my.url/path", status_code=200, content=b"{}")
+        t = DummyTransport(Response(raw))
+
+        with ApiKeyClient("https://my.url", "key", transport=t, timeout=3) as client:
+            assert client.get("/path").status == 200
+
+        ((method, url, kwargs),) = t.requests
+        assert (method, url) == ("GET", "https://my.url/path")
+        assert kwargs["headers"]["Authorization"] == "Key key"
+        assert kwargs["timeout"] == 3
+        assert kwargs["codec"] is client.codec
+        assert t.closed is True
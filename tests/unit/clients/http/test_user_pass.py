@@ -1,11 +1,46 @@
 # Copyright (c) 2020 XLAB Steampunk
 
+import asyncio
+import base64
+import json
+import threading
+import time
+
+import httpx
 import pytest
 
-from sensu_go.clients.http.user_pass import UserPassClient
+from sensu_go.clients.http.token_cache import FileTokenCache, Tokens
+from sensu_go.clients.http.user_pass import (
+    _jwt_expiry,
+    AsyncUserPassClient,
+    UserPassClient,
+)
 from sensu_go.errors import ResponseError, AuthError
 
 
+def jwt(exp):
+    payload = base64.urlsafe_b64encode(json.dumps(dict(exp=exp)).encode())
+    return "header.{}.signature".format(payload.decode().rstrip("="))
+
+
+def tokens(access, refresh="rt", expires_at=None):
+    result = dict(access_token=access, refresh_token=refresh)
+    if expires_at is not None:
+        result["expires_at"] = expires_at
+    return json.dumps(result)
+
+
+class TestJWTExpiry:
+    def test_valid_token(self):
+        assert _jwt_expiry(jwt(1234)) == 1234
+
+    @pytest.mark.parametrize(
+        "token", ["at", "a.b.c", "a.{}.c".format(base64.b64encode(b"{}").decode())]
+    )
+    def test_invalid_token(self, token):
+        assert _jwt_expiry(token) is None
+
+
 class TestAuthHeaderValue:
     def test_valid_login(self, requests_mock):
         requests_mock.get(
@@ -70,3 +105,248 @@ class TestAuthHeaderValue:
         client.auth_header_value
 
         assert mock.called_once
+
+    def test_threads_share_login(self, requests_mock):
+        def slow_login(request, context):
+            time.sleep(0.05)
+            return '{"access_token":"at","refresh_token":"rt"}'
+
+        mock = requests_mock.get("https://my.url/auth", text=slow_login)
+        client = UserPassClient("https://my.url", "user", "pass")
+        results = []
+
+        threads = [
+            threading.Thread(target=lambda: results.append(client.auth_header_value))
+            for _ in range(16)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert ["Bearer at"] * 16 == results
+        assert mock.call_count == 1
+
+
+class TestTokenLifecycle:
+    def test_proactive_refresh(self, mocker, requests_mock):
+        mocker.patch("time.time", return_value=1000)
+        login = requests_mock.get(
+            "https://my.url/auth", text=tokens("at1", "rt1", expires_at=1100)
+        )
+        refresh = requests_mock.post(
+            "https://my.url/auth/token",
+            request_headers=dict(Authorization="Bearer at1"),
+            text=tokens("at2", "rt2", expires_at=1400),
+        )
+        client = UserPassClient("https://my.url", "user", "pass", refresh_margin=30)
+
+        assert "Bearer at1" == client.auth_header_value
+        time.time.return_value = 1069
+        assert "Bearer at1" == client.auth_header_value
+        time.time.return_value = 1070
+        assert "Bearer at2" == client.auth_header_value
+
+        assert login.call_count == 1
+        assert refresh.call_count == 1
+        assert refresh.last_request.json() == dict(refresh_token="rt1")
+
+    def test_expiry_from_jwt(self, mocker, requests_mock):
+        mocker.patch("time.time", return_value=1000)
+        requests_mock.get("https://my.url/auth", text=tokens(jwt(1010)))
+        refresh = requests_mock.post("https://my.url/auth/token", text=tokens("at2"))
+        client = UserPassClient("https://my.url", "user", "pass")
+
+        client.auth_header_value
+
+        assert "Bearer at2" == client.auth_header_value
+        assert refresh.call_count == 1
+
+    def test_login_when_refresh_fails(self, mocker, requests_mock):
+        mocker.patch("time.time", return_value=1000)
+        login = requests_mock.get(
+            "https://my.url/auth",
+            [dict(text=tokens("at1", expires_at=1)), dict(text=tokens("at2"))],
+        )
+        requests_mock.post("https://my.url/auth/token", status_code=401)
+        client = UserPassClient("https://my.url", "user", "pass")
+
+        client.auth_header_value
+
+        assert "Bearer at2" == client.auth_header_value
+        assert login.call_count == 2
+
+    def test_reauthenticate_on_401(self, requests_mock):
+        requests_mock.get(
+            "https://my.url/auth",
+            [dict(text=tokens("at1", "rt1")), dict(text=tokens("at2", "rt2"))],
+        )
+        refresh = requests_mock.post("https://my.url/auth/token", status_code=401)
+        resource = requests_mock.get(
+            "https://my.url/resource",
+            [dict(status_code=401), dict(status_code=200, text="{}")],
+        )
+        client = UserPassClient("https://my.url", "user", "pass")
+
+        resp = client.get("/resource")
+
+        assert resp.status == 200
+        assert refresh.call_count == 1
+        assert resource.request_history[0].headers["Authorization"] == "Bearer at1"
+        assert resource.request_history[1].headers["Authorization"] == "Bearer at2"
+
+    def test_give_up_after_second_401(self, requests_mock):
+        requests_mock.get("https://my.url/auth", text=tokens("at"))
+        requests_mock.post("https://my.url/auth/token", text=tokens("at"))
+        resource = requests_mock.get("https://my.url/resource", status_code=401)
+        client = UserPassClient("https://my.url", "user", "pass")
+
+        assert client.get("/resource").status == 401
+        assert resource.call_count == 2
+
+    def test_threads_share_refresh(self, mocker, requests_mock):
+        mocker.patch("time.time", return_value=1000)
+        requests_mock.get("https://my.url/auth", text=tokens("at1", expires_at=1))
+
+        def slow_refresh(request, context):
+            time.sleep(0.05)
+            return tokens("at2")
+
+        refresh = requests_mock.post("https://my.url/auth/token", text=slow_refresh)
+        client = UserPassClient("https://my.url", "user", "pass")
+        client.auth_header_value
+        results = []
+
+        threads = [
+            threading.Thread(target=lambda: results.append(client.auth_header_value))
+            for _ in range(8)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert ["Bearer at2"] * 8 == results
+        assert refresh.call_count == 1
+
+
+class TestTokenCache:
+    def test_store_tokens_after_login(self, requests_mock, tmp_path):
+        requests_mock.get("https://my.url/auth", text=tokens("at", expires_at=2000))
+        cache = FileTokenCache(str(tmp_path / "tokens.json"))
+        client = UserPassClient("https://my.url", "user", "pass", token_cache=cache)
+
+        client.auth_header_value
+
+        assert cache.load("https://my.url", "user") == Tokens("at", "rt", 2000)
+
+    def test_reuse_cached_tokens(self, mocker, requests_mock, tmp_path):
+        mocker.patch("time.time", return_value=1000)
+        login = requests_mock.get("https://my.url/auth", text=tokens("at"))
+        cache = FileTokenCache(str(tmp_path / "tokens.json"))
+        cache.store("https://my.url", "user", Tokens("cached", "rt", 2000))
+        client = UserPassClient("https://my.url", "user", "pass", token_cache=cache)
+
+        assert "Bearer cached" == client.auth_header_value
+        assert login.call_count == 0
+
+    def test_refresh_cached_tokens(self, mocker, requests_mock, tmp_path):
+        mocker.patch("time.time", return_value=1000)
+        login = requests_mock.get("https://my.url/auth", text=tokens("at"))
+        refresh = requests_mock.post(
+            "https://my.url/auth/token",
+            request_headers=dict(Authorization="Bearer cached"),
+            text=tokens("refreshed", "rt2", expires_at=3000),
+        )
+        cache = FileTokenCache(str(tmp_path / "tokens.json"))
+        cache.store("https://my.url", "user", Tokens("cached", "rt", 1010))
+        client = UserPassClient("https://my.url", "user", "pass", token_cache=cache)
+
+        assert "Bearer refreshed" == client.auth_header_value
+        assert login.call_count == 0
+        assert refresh.call_count == 1
+        assert cache.load("https://my.url", "user") == Tokens("refreshed", "rt2", 3000)
+
+    def test_replace_rejected_cached_tokens(self, requests_mock, tmp_path):
+        requests_mock.get("https://my.url/auth", text=tokens("fresh"))
+        requests_mock.post("https://my.url/auth/token", status_code=401)
+        requests_mock.get(
+            "https://my.url/resource",
+            [dict(status_code=401), dict(status_code=200, text="{}")],
+        )
+        cache = FileTokenCache(str(tmp_path / "tokens.json"))
+        cache.store("https://my.url", "user", Tokens("revoked", "rt", None))
+        client = UserPassClient("https://my.url", "user", "pass", token_cache=cache)
+
+        assert client.get("/resource").status == 200
+        assert cache.load("https://my.url", "user").access_token == "fresh"
+
+    def test_clients_share_cache(self, requests_mock, tmp_path):
+        login = requests_mock.get("https://my.url/auth", text=tokens("at"))
+        path = str(tmp_path / "tokens.json")
+
+        for _ in range(3):
+            client = UserPassClient(
+                "https://my.url", "user", "pass", token_cache=FileTokenCache(path)
+            )
+            assert "Bearer at" == client.auth_header_value
+
+        assert login.call_count == 1
+
+
+def async_client(handler):
+    client = AsyncUserPassClient("https://my.url", "user", "pass")
+    client.session = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return client
+
+
+class TestAsyncAuthHeaderValue:
+    def test_valid_login(self):
+        def handler(request):
+            assert request.url.path == "/auth"
+            return httpx.Response(200, json=dict(access_token="at", refresh_token="rt"))
+
+        client = async_client(handler)
+
+        assert "Bearer at" == asyncio.run(client.auth_header_value())
+
+    def test_invalid_login(self):
+        client = async_client(lambda request: httpx.Response(401))
+
+        with pytest.raises(AuthError, match="credentials"):
+            asyncio.run(client.auth_header_value())
+
+    def test_concurrent_callers_share_login(self):
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(200, json=dict(access_token="at", refresh_token="rt"))
+
+        client = async_client(handler)
+
+        async def run():
+            return await asyncio.gather(
+                *(client.auth_header_value() for _ in range(10))
+            )
+
+        assert ["Bearer at"] * 10 == asyncio.run(run())
+        assert len(calls) == 1
+
+    def test_reauthenticate_on_401(self):
+        logins = []
+
+        def handler(request):
+            if request.url.path == "/auth":
+                logins.append(request)
+                return httpx.Response(200, text=tokens("at{}".format(len(logins))))
+            if request.url.path == "/auth/token":
+                return httpx.Response(401)
+            if request.headers["authorization"] == "Bearer at1":
+                return httpx.Response(401)
+            return httpx.Response(200, json={})
+
+        client = async_client(handler)
+
+        assert asyncio.run(client.get("/resource")).status == 200
+        assert len(logins) == 2
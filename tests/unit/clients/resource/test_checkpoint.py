@@ -0,0 +1,52 @@
+# Copyright (c) 2021 XLAB Steampunk
+
+import json
+
+import pytest
+
+from sensu_go.clients.http.retry import RetryPolicy
+from sensu_go.clients.resource.checkpoint import Checkpoint, should_retry_page
+from sensu_go.errors import AuthError, CircuitOpenError, HTTPError, ResponseError
+
+
+class TestCheckpoint:
+    def test_query(self):
+        checkpoint = Checkpoint("/checks", 100, 'a == "b"', "", "token", 3)
+
+        assert checkpoint.query() == dict(labelSelector='a == "b"')
+
+    def test_json_round_trip(self):
+        checkpoint = Checkpoint("/checks", 100, "", 'check.name == "x"', "t", 3)
+
+        data = json.loads(json.dumps(checkpoint.as_dict()))
+
+        assert Checkpoint.from_dict(data) == checkpoint
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            Checkpoint.from_dict(dict(path="/checks", unknown=1))
+
+
+class TestShouldRetryPage:
+    @pytest.mark.parametrize(
+        "error,retry",
+        [
+            (HTTPError("broken connection"), True),
+            (CircuitOpenError("circuit open"), False),
+            (ResponseError("Cannot decode response", "url", 200, "text"), True),
+            (ResponseError("Unavailable", "url", 503, "text"), True),
+            (ResponseError("Not found", "url", 404, "text"), False),
+            (AuthError("Unauthorized", "url", 401, "text"), False),
+        ],
+    )
+    def test_errors(self, error, retry):
+        assert should_retry_page(RetryPolicy(), error, 0) is retry
+
+    def test_attempts(self):
+        policy = RetryPolicy(total=2)
+
+        assert should_retry_page(policy, HTTPError("error"), 1) is True
+        assert should_retry_page(policy, HTTPError("error"), 2) is False
+
+    def test_no_policy(self):
+        assert should_retry_page(None, HTTPError("error"), 0) is False
@@ -0,0 +1,221 @@
+# Copyright (c) 2021 XLAB Steampunk
+
+import threading
+
+import pytest
+
+from sensu_go.clients.http.api_key import ApiKeyClient
+from sensu_go.clients.resource.fanout import merge, NamespaceCache
+from sensu_go.clients.resource.namespaced import NamespacedClient
+from sensu_go.errors import ResponseError
+from sensu_go.resources.check import Check
+from sensu_go.resources.secret import Secret
+
+NAMESPACES = "https://my.url/api/core/v2/namespaces"
+
+
+def check(name, namespace="default"):
+    return dict(metadata=dict(name=name, namespace=namespace), command="c")
+
+
+def secret(name, namespace):
+    return dict(
+        type="Secret",
+        api_version="secrets/v1",
+        metadata=dict(name=name, namespace=namespace),
+        spec=dict(id="id", provider="env"),
+    )
+
+
+def mock_namespaces(requests_mock, *names):
+    return requests_mock.get(NAMESPACES, json=[dict(name=n) for n in names])
+
+
+class TestMerge:
+    def test_ordered(self):
+        release = threading.Event()
+
+        def slow():
+            release.wait(5)
+            return [1, 2]
+
+        def fast():
+            release.set()
+            return [3]
+
+        assert list(merge([slow, fast], 2, ordered=True)) == [1, 2, 3]
+
+    def test_unordered(self):
+        release = threading.Event()
+
+        def slow():
+            release.wait(5)
+            return [1, 2]
+
+        def fast():
+            return [3]
+
+        items = merge([slow, fast], 2, ordered=False)
+        assert next(items) == 3
+        release.set()
+        assert list(items) == [1, 2]
+
+    def test_bounded(self):
+        started = []
+        sources = [lambda i=i: started.append(i) or [i] for i in range(10)]
+
+        items = merge(sources, 2, ordered=True)
+        assert next(items) == 0
+
+        assert len(started) <= 3
+        assert list(items) == list(range(1, 10))
+
+    def test_error(self):
+        def failing():
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError, match="boom"):
+            list(merge([lambda: [1], failing], 2, ordered=True))
+
+
+class TestNamespaceCache:
+    def test_cache(self, requests_mock):
+        mock = mock_namespaces(requests_mock, "b", "a")
+        cache = NamespaceCache(ApiKeyClient("https://my.url", "key"))
+
+        assert cache.get() == ["a", "b"]
+        assert cache.get() == ["a", "b"]
+        assert mock.call_count == 1
+
+    def test_ttl(self, mocker, requests_mock):
+        monotonic = mocker.patch("time.monotonic", return_value=100.0)
+        mock = mock_namespaces(requests_mock, "a")
+        cache = NamespaceCache(ApiKeyClient("https://my.url", "key"), ttl=10)
+        cache.get()
+
+        monotonic.return_value = 111.0
+        cache.get()
+
+        assert mock.call_count == 2
+
+    def test_invalidate(self, requests_mock):
+        mock = mock_namespaces(requests_mock, "a")
+        cache = NamespaceCache(ApiKeyClient("https://my.url", "key"))
+        cache.get()
+
+        cache.invalidate()
+        cache.get()
+
+        assert mock.call_count == 2
+
+
+class TestAllNamespaces:
+    def test_cluster_wide_endpoint(self, requests_mock):
+        mock = requests_mock.get(
+            "https://my.url/api/core/v2/checks",
+            json=[check("a", "ns1"), check("b", "ns2")],
+        )
+        client = NamespacedClient(ApiKeyClient("https://my.url", "key"), Check, "ns")
+
+        checks = client.list_all_namespaces()
+
+        assert [(c.name, c.namespace) for c in checks] == [("a", "ns1"), ("b", "ns2")]
+        assert mock.last_request.qs["limit"] == ["100"]
+
+    def test_fall_back_to_fan_out(self, requests_mock):
+        requests_mock.get("https://my.url/api/core/v2/checks", status_code=403)
+        mock_namespaces(requests_mock, "ns2", "ns1")
+        for ns in ("ns1", "ns2"):
+            requests_mock.get(
+                "{}/{}/checks".format(NAMESPACES, ns), json=[check("c-" + ns, ns)]
+            )
+        client = NamespacedClient(ApiKeyClient("https://my.url", "key"), Check, "ns")
+
+        checks = client.list_all_namespaces(ordered=True)
+
+        assert [c.name for c in checks] == ["c-ns1", "c-ns2"]
+
+    @pytest.mark.parametrize("status", [200, 403])
+    def test_raw(self, requests_mock, status):
+        requests_mock.get(
+            "https://my.url/api/core/v2/checks",
+            status_code=status,
+            json=[check("a", "ns1")],
+        )
+        mock_namespaces(requests_mock, "ns1")
+        requests_mock.get("{}/ns1/checks".format(NAMESPACES), json=[check("a", "ns1")])
+        client = NamespacedClient(ApiKeyClient("https://my.url", "key"), Check, "ns")
+
+        checks = client.list_all_namespaces_raw(fields=["metadata.namespace"])
+
+        assert list(checks) == [dict(metadata=dict(namespace="ns1"))]
+
+    def test_other_errors(self, requests_mock):
+        requests_mock.get("https://my.url/api/core/v2/checks", status_code=500)
+        client = NamespacedClient(ApiKeyClient("https://my.url", "key"), Check, "ns")
+
+        with pytest.raises(ResponseError):
+            list(client.list_all_namespaces())
+
+    def test_fan_out_only(self, requests_mock):
+        mock_namespaces(requests_mock, "ns1", "ns2")
+        for ns in ("ns1", "ns2"):
+            requests_mock.get(
+                "https://my.url/api/enterprise/secrets/v1/namespaces/{}/secrets".format(
+                    ns
+                ),
+                json=[secret("s-" + ns, ns)],
+            )
+        client = NamespacedClient(ApiKeyClient("https://my.url", "key"), Secret, "ns")
+
+        secrets = client.list_all_namespaces(max_workers=1)
+
+        assert sorted(s.name for s in secrets) == ["s-ns1", "s-ns2"]
+
+    def test_shared_cache(self, requests_mock):
+        mock = mock_namespaces(requests_mock, "ns1")
+        requests_mock.get(
+            "https://my.url/api/enterprise/secrets/v1/namespaces/ns1/secrets", json=[]
+        )
+        http_client = ApiKeyClient("https://my.url", "key")
+        cache = NamespaceCache(http_client)
+
+        for _ in range(2):
+            client = NamespacedClient(http_client, Secret, "ns", cache)
+            list(client.list_all_namespaces())
+
+        assert mock.call_count == 1
+
+    def test_take(self, requests_mock):
+        requests_mock.get("https://my.url/api/core/v2/checks", status_code=403)
+        mock_namespaces(requests_mock, "ns1", "ns2")
+        for ns in ("ns1", "ns2"):
+            requests_mock.get(
+                "{}/{}/checks".format(NAMESPACES, ns),
+                json=[check("a-" + ns, ns), check("b-" + ns, ns)],
+            )
+        client = NamespacedClient(ApiKeyClient("https://my.url", "key"), Check, "ns")
+        checks = client.list_all_namespaces(ordered=True)
+
+        assert [c.name for c in checks.take(3)] == ["a-ns1", "b-ns1", "a-ns2"]
+        assert checks.take(0) == []
+        assert checks.first().name == "a-ns1"
+        assert checks.count() == 4
+        assert [c.name for c in checks.materialize()] == [
+            "a-ns1",
+            "b-ns1",
+            "a-ns2",
+            "b-ns2",
+        ]
+
+    def test_take_negative(self):
+        client = NamespacedClient(ApiKeyClient("https://my.url", "key"), Check, "ns")
+
+        with pytest.raises(ValueError):
+            client.list_all_namespaces().take(-1)
+
+    def test_invalid_workers(self):
+        client = NamespacedClient(ApiKeyClient("https://my.url", "key"), Check, "ns")
+
+        with pytest.raises(ValueError):
+            client.list_all_namespaces(max_workers=0)
@@ -0,0 +1,168 @@
+# Copyright (c) 2021 XLAB Steampunk
+
+import threading
+
+import pytest
+
+from sensu_go.clients.resource.paging import (
+    AdaptivePageSize,
+    initial_page_size,
+    interleave,
+    prefetch,
+)
+
+
+class TestAdaptivePageSize:
+    @pytest.mark.parametrize(
+        "kwargs",
+        [
+            dict(min_size=0),
+            dict(initial=5, min_size=10),
+            dict(initial=200, max_size=100),
+            dict(target_time=0),
+        ],
+    )
+    def test_invalid(self, kwargs):
+        with pytest.raises(ValueError):
+            AdaptivePageSize(**kwargs)
+
+    def test_grow(self):
+        sizer = AdaptivePageSize(target_time=1.0)
+
+        assert sizer.adjust(100, 100, 0.8, 1000) == 125
+        assert sizer.adjust(100, 100, 0.01, 1000) == 200
+
+    def test_shrink(self):
+        sizer = AdaptivePageSize(target_time=1.0)
+
+        assert sizer.adjust(100, 100, 1.25, 1000) == 80
+        assert sizer.adjust(100, 100, 30, 1000) == 50
+
+    def test_max_bytes(self):
+        sizer = AdaptivePageSize(target_time=1.0, max_bytes=50000)
+
+        # 1000 bytes per item
+        assert sizer.adjust(100, 100, 0.5, 100000) == 50
+
+    def test_bounds(self):
+        sizer = AdaptivePageSize(initial=20, min_size=20, max_size=30)
+
+        assert sizer.adjust(20, 20, 10, 1000) == 20
+        assert sizer.adjust(20, 20, 0.1, 1000) == 30
+
+    def test_empty_page(self):
+        assert AdaptivePageSize().adjust(100, 0, 5, 2) == 100
+
+
+class TestInitialPageSize:
+    def test_fixed(self):
+        assert initial_page_size(500) == 500
+
+    def test_adaptive(self):
+        assert initial_page_size(AdaptivePageSize(initial=50)) == 50
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            initial_page_size(0)
+
+
+class TestPrefetch:
+    def test_pages(self):
+        assert list(prefetch(iter_pages(5), 2)) == [0, 1, 2, 3, 4]
+
+    def test_error(self):
+        def pages():
+            yield 1
+            raise ValueError("bad page")
+
+        items = prefetch(pages(), 2)
+
+        assert next(items) == 1
+        with pytest.raises(ValueError, match="bad page"):
+            next(items)
+
+    def test_backpressure(self):
+        fetched = []
+        done = threading.Event()
+
+        def pages():
+            for i in range(10):
+                fetched.append(i)
+                yield i
+            done.set()
+
+        items = prefetch(pages(), 2)
+        assert next(items) == 0
+
+        # Buffer holds two pages and the producer holds on to the third one.
+        assert not done.wait(0.3)
+        assert len(fetched) == 4
+        assert list(items) == list(range(1, 10))
+
+    def test_close(self):
+        closed = threading.Event()
+
+        def pages():
+            try:
+                for i in range(100):
+                    yield i
+            finally:
+                closed.set()
+
+        items = prefetch(pages(), 1)
+        assert next(items) == 0
+
+        items.close()
+
+        assert closed.wait(5)
+
+    def test_context(self):
+        deadline = pytest.importorskip("sensu_go.clients.http.deadline")
+
+        def pages():
+            yield deadline.current()
+
+        with deadline.deadline_at(123.0):
+            items = prefetch(pages(), 1)
+            assert list(items) == [123.0]
+
+
+class TestInterleave:
+    def test_items(self):
+        items = interleave([iter_pages(3), [], iter_pages(2)], 2)
+
+        assert sorted(items) == [0, 0, 1, 1, 2]
+
+    def test_concurrent(self):
+        # Source a waits for source b, which only works if they run concurrently.
+        ready = threading.Event()
+
+        def a():
+            assert ready.wait(5)
+            yield "a"
+
+        def b():
+            ready.set()
+            yield "b"
+
+        assert list(interleave([a(), b()], 2)) == ["b", "a"]
+
+    def test_error(self):
+        def failing():
+            raise ValueError("boom")
+            yield
+
+        with pytest.raises(ValueError, match="boom"):
+            list(interleave([iter_pages(2), failing()], 2))
+
+    def test_invalid_workers(self):
+        with pytest.raises(ValueError):
+            interleave([], 0)
+
+    def test_no_sources(self):
+        assert list(interleave([], 4)) == []
+
+
+def iter_pages(n):
+    for i in range(n):
+        yield i
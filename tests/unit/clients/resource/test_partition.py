@@ -0,0 +1,151 @@
+# Copyright (c) 2021 XLAB Steampunk
+
+import pytest
+
+from sensu_go.clients.http.api_key import ApiKeyClient
+from sensu_go.clients.resource.base import ResourceList
+from sensu_go.clients.resource.cluster import ClusterClient
+from sensu_go.clients.resource.namespaced import NamespacedClient
+from sensu_go.clients.resource.operator import Equal
+from sensu_go.clients.resource.partition import (
+    by_label,
+    by_name,
+    combine,
+    Partition,
+    PartitionedIter,
+)
+from sensu_go.errors import ResponseError
+from sensu_go.resources.check import Check
+from sensu_go.resources.user import User
+
+CHECKS = "https://my.url/api/core/v2/namespaces/default/checks"
+
+
+def check(name):
+    return dict(metadata=dict(name=name, namespace="default"), command="c")
+
+
+def selectors(mock, name):
+    return sorted(r.qs.get(name, [""])[0] for r in mock.request_history)
+
+
+class TestPartitions:
+    def test_by_label(self):
+        partitions = by_label("shard", ["0", "1"])
+
+        assert [p.label_selector.serialize() for p in partitions] == [
+            'shard == "0"',
+            'shard == "1"',
+            'shard notin ["0","1"]',
+        ]
+        assert all(p.field_selector is None for p in partitions)
+
+    def test_by_label_without_rest(self):
+        assert len(by_label("shard", ["0", "1"], rest=False)) == 2
+
+    def test_by_name(self):
+        (partition,) = by_name(["web"])
+
+        assert partition.field_selector.serialize("check") == (
+            'check.name matches "web"'
+        )
+
+    def test_combine(self):
+        a, b = Equal("a", "1"), Equal("b", "2")
+
+        assert combine(None, None) is None
+        assert combine(a, None) is a
+        assert combine(None, b) is b
+        assert combine(a, b).serialize() == 'a == "1" && b == "2"'
+
+
+class TestNamespacedClientPartitions:
+    def test_list(self, requests_mock):
+        mock = requests_mock.get(
+            CHECKS,
+            [
+                dict(json=[check("a"), check("b")]),
+                dict(json=[check("b"), check("c")]),
+            ],
+        )
+        client = NamespacedClient(
+            ApiKeyClient("https://my.url", "key"), Check, "default"
+        )
+
+        checks = client.list_partitioned(
+            by_label("shard", ["0"], rest=False)
+            + [Partition(field_selector=Equal("name", "x"))],
+            label_selector=Equal("team", "ops"),
+        )
+
+        assert isinstance(checks, PartitionedIter)
+        assert sorted(c.name for c in checks) == ["a", "b", "c"]
+        assert selectors(mock, "labelselector") == [
+            'team == "ops"',
+            'team == "ops" && shard == "0"',
+        ]
+        assert selectors(mock, "fieldselector") == ["", 'check.name == "x"']
+
+    def test_error(self, requests_mock):
+        requests_mock.get(CHECKS, [dict(json=[check("a")]), dict(status_code=500)])
+        client = NamespacedClient(
+            ApiKeyClient("https://my.url", "key"), Check, "default"
+        )
+
+        with pytest.raises(ResponseError):
+            list(client.list_partitioned(by_label("shard", ["0"])))
+
+    def test_take(self, requests_mock):
+        requests_mock.get(
+            CHECKS,
+            [
+                dict(json=[check("a"), check("b")]),
+                dict(json=[check("b"), check("c")]),
+            ],
+        )
+        client = NamespacedClient(
+            ApiKeyClient("https://my.url", "key"), Check, "default"
+        )
+        checks = client.list_partitioned(by_label("shard", ["0"]), max_workers=1)
+
+        assert [c.name for c in checks.take(2)] == ["a", "b"]
+        assert checks.take(0) == []
+
+    def test_count_and_materialize(self, requests_mock):
+        requests_mock.get(CHECKS, json=[check("a"), check("b")])
+        client = NamespacedClient(
+            ApiKeyClient("https://my.url", "key"), Check, "default"
+        )
+        checks = client.list_partitioned(by_label("shard", ["0"]))
+
+        assert checks.count() == 2
+        assert checks.first().name == "a"
+        assert isinstance(checks.materialize(), ResourceList)
+
+    def test_no_partitions(self):
+        client = NamespacedClient(
+            ApiKeyClient("https://my.url", "key"), Check, "default"
+        )
+
+        with pytest.raises(ValueError):
+            client.list_partitioned([])
+
+
+class TestClusterClientPartitions:
+    def test_list(self, requests_mock):
+        mock = requests_mock.get(
+            "https://my.url/api/core/v2/users",
+            [
+                dict(json=[dict(username="a")]),
+                dict(json=[dict(username="b")]),
+            ],
+        )
+        client = ClusterClient(ApiKeyClient("https://my.url", "key"), User)
+
+        users = client.list_partitioned(by_name(["a", "b"], "username"), max_workers=1)
+
+        assert [u.name for u in users] == ["a", "b"]
+        assert selectors(mock, "fieldselector") == [
+            'user.username matches "a"',
+            'user.username matches "b"',
+        ]
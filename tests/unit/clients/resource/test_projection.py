@@ -0,0 +1,50 @@
+# Copyright (c) 2021 XLAB Steampunk
+
+import pytest
+
+from sensu_go.clients.resource.projection import projection
+
+EVENT = dict(
+    metadata=dict(name="e", namespace="default", labels=dict(a="b")),
+    check=dict(status=2, output="long output", subscriptions=["a", "b"]),
+    entity=dict(system=dict(network=dict(interfaces=[dict(name="lo", mac="")]))),
+)
+
+
+class TestProjection:
+    def test_fields(self):
+        project = projection(["metadata.name", "check.status"])
+
+        assert project(EVENT) == dict(metadata=dict(name="e"), check=dict(status=2))
+
+    def test_whole_field(self):
+        project = projection(["check.subscriptions", "metadata"])
+
+        assert project(EVENT) == dict(
+            metadata=EVENT["metadata"], check=dict(subscriptions=["a", "b"])
+        )
+
+    def test_parent_wins(self):
+        assert projection(["check", "check.status"])(EVENT) == dict(
+            check=EVENT["check"]
+        )
+        assert projection(["check.status", "check"])(EVENT) == dict(
+            check=EVENT["check"]
+        )
+
+    def test_lists(self):
+        project = projection(["entity.system.network.interfaces.name"])
+
+        assert project(EVENT) == dict(
+            entity=dict(system=dict(network=dict(interfaces=[dict(name="lo")])))
+        )
+
+    def test_missing_fields(self):
+        project = projection(["check.missing", "missing.field", "metadata.name.x"])
+
+        assert project(EVENT) == dict(check={}, metadata=dict(name="e"))
+
+    @pytest.mark.parametrize("fields", [[], [""], ["metadata."], ["a..b"]])
+    def test_invalid(self, fields):
+        with pytest.raises(ValueError):
+            projection(fields)
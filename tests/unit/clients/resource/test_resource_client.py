@@ -0,0 +1,827 @@
+# Copyright (c) 2021 XLAB Steampunk
+
+import asyncio
+import json
+import threading
+import time
+
+import httpx
+import pytest
+import requests
+
+from sensu_go.clients.http import deadline
+from sensu_go.clients.http.api_key import ApiKeyClient, AsyncApiKeyClient
+from sensu_go.clients.http.cache import ResponseCache
+from sensu_go.clients.http.metrics import MetricsCollector
+from sensu_go.clients.http.retry import RetryPolicy
+from sensu_go.clients.resource.base import (
+    AsyncResourceIter,
+    RawResourceIter,
+    ResourceIter,
+    ResourceList,
+)
+from sensu_go.clients.resource.checkpoint import Checkpoint
+from sensu_go.clients.resource.cluster import ClusterClient
+from sensu_go.clients.resource.namespaced import (
+    AsyncNamespacedClient,
+    NamespacedClient,
+)
+from sensu_go.clients.resource.operator import Equal
+from sensu_go.clients.resource.paging import AdaptivePageSize
+from sensu_go.errors import RequestTimeoutError, ResponseError
+from sensu_go.resources.check import Check
+from sensu_go.resources.user import User
+
+
+def async_client(handler):
+    client = AsyncApiKeyClient("https://my.url", "key")
+    client.session = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return client
+
+
+def check(name):
+    return dict(metadata=dict(name=name, namespace="default"), command="c")
+
+
+class TestResourceIterTimeout:
+    def test_timeout_covers_traversal(self, mocker, requests_mock):
+        monotonic = mocker.patch("time.monotonic", return_value=100.0)
+        requests_mock.get(
+            "https://my.url/checks",
+            [
+                dict(json=[check("a")], headers={"Sensu-Continue": "x"}),
+                dict(json=[check("b")]),
+            ],
+        )
+        client = ApiKeyClient("https://my.url", "key")
+        items = iter(ResourceIter(Check, client, "/checks", timeout=5))
+
+        assert next(items).name == "a"
+        # Deadline must not leak to the code that consumes the iterator.
+        assert deadline.current() is None
+
+        monotonic.return_value = 106.0
+        with pytest.raises(RequestTimeoutError):
+            next(items)
+
+    def test_no_timeout(self, mocker, requests_mock):
+        requests_mock.get("https://my.url/checks", json=[check("a")])
+        client = ApiKeyClient("https://my.url", "key")
+
+        items = ResourceIter(Check, client, "/checks")
+
+        assert [i.name for i in items] == ["a"]
+
+
+class TestResourceIterPageSize:
+    def test_default(self, requests_mock):
+        mock = requests_mock.get("https://my.url/checks", json=[])
+
+        list(ResourceIter(Check, ApiKeyClient("https://my.url", "key"), "/checks"))
+
+        assert mock.last_request.qs["limit"] == ["100"]
+
+    def test_fixed(self, requests_mock):
+        mock = requests_mock.get(
+            "https://my.url/api/core/v2/namespaces/default/checks",
+            [
+                dict(json=[check("a")], headers={"Sensu-Continue": "x"}),
+                dict(json=[check("b")]),
+            ],
+        )
+        client = NamespacedClient(
+            ApiKeyClient("https://my.url", "key"), Check, "default"
+        )
+
+        assert [c.name for c in client.list(page_size=1000)] == ["a", "b"]
+        assert [r.qs["limit"] for r in mock.request_history] == [["1000"]] * 2
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            ResourceIter(
+                Check, ApiKeyClient("https://my.url", "key"), "/x", page_size=0
+            )
+
+    def test_adaptive(self, mocker, requests_mock):
+        mock = requests_mock.get(
+            "https://my.url/checks",
+            [
+                dict(json=[check("a")] * 10, headers={"Sensu-Continue": "x"}),
+                dict(json=[check("b")] * 20, headers={"Sensu-Continue": "y"}),
+                dict(json=[check("c")]),
+            ],
+        )
+        page_size = AdaptivePageSize(initial=10)
+        adjust = mocker.patch.object(page_size, "adjust", side_effect=[20, 15])
+        items = ResourceIter(
+            Check, ApiKeyClient("https://my.url", "key"), "/checks", page_size=page_size
+        )
+
+        assert len(list(items)) == 31
+        assert [r.qs["limit"] for r in mock.request_history] == [
+            ["10"],
+            ["20"],
+            ["15"],
+        ]
+        (size, count, _, size_bytes), _ = adjust.call_args_list[1]
+        assert (size, count) == (20, 20)
+        assert size_bytes == len(json.dumps([check("b")] * 20))
+
+    def test_async(self):
+        limits = []
+
+        def handler(request):
+            limits.append(request.url.params["limit"])
+            return httpx.Response(200, json=[check("a")])
+
+        async def collect():
+            items = AsyncResourceIter(
+                Check, async_client(handler), "/checks", page_size=5
+            )
+            return [i async for i in items]
+
+        assert len(asyncio.run(collect())) == 1
+        assert limits == ["5"]
+
+
+class TestResourceIterPrefetch:
+    def test_prefetch(self, requests_mock):
+        requests_mock.get(
+            "https://my.url/api/core/v2/namespaces/default/checks",
+            [
+                dict(json=[check("a")], headers={"Sensu-Continue": "x"}),
+                dict(json=[check("b")], headers={"Sensu-Continue": "y"}),
+                dict(json=[check("c")]),
+            ],
+        )
+        client = NamespacedClient(
+            ApiKeyClient("https://my.url", "key"), Check, "default"
+        )
+
+        assert [c.name for c in client.list(prefetch=2)] == ["a", "b", "c"]
+
+    def test_next_page_is_fetched_in_background(self, requests_mock):
+        fetched = threading.Event()
+
+        def second(request, context):
+            fetched.set()
+            return [check("b")]
+
+        requests_mock.get(
+            "https://my.url/checks",
+            [
+                dict(json=[check("a")], headers={"Sensu-Continue": "x"}),
+                dict(json=second),
+            ],
+        )
+        items = iter(
+            ResourceIter(
+                Check, ApiKeyClient("https://my.url", "key"), "/checks", prefetch=1
+            )
+        )
+
+        assert next(items).name == "a"
+        # We did not ask for b yet, but it should be on its way.
+        assert fetched.wait(5)
+        assert next(items).name == "b"
+
+    def test_error(self, requests_mock):
+        requests_mock.get(
+            "https://my.url/checks",
+            [
+                dict(json=[check("a")], headers={"Sensu-Continue": "x"}),
+                dict(status_code=500),
+            ],
+        )
+        items = iter(
+            ResourceIter(
+                Check, ApiKeyClient("https://my.url", "key"), "/checks", prefetch=1
+            )
+        )
+
+        assert next(items).name == "a"
+        with pytest.raises(ResponseError):
+            next(items)
+
+    def test_stop_early(self, requests_mock):
+        mock = requests_mock.get(
+            "https://my.url/checks",
+            json=[check("a")],
+            headers={"Sensu-Continue": "x"},
+        )
+        items = ResourceIter(
+            Check, ApiKeyClient("https://my.url", "key"), "/checks", prefetch=2
+        )
+
+        for item in items:
+            break
+
+        # Producer stops after at most one extra request once it notices.
+        time.sleep(0.3)
+        count = mock.call_count
+        time.sleep(0.3)
+        assert mock.call_count == count
+        assert count <= 5
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            ResourceIter(
+                Check, ApiKeyClient("https://my.url", "key"), "/x", prefetch=-1
+            )
+
+
+class TestResourceIterStream:
+    def test_stream(self, requests_mock):
+        requests_mock.get(
+            "https://my.url/api/core/v2/namespaces/default/checks",
+            [
+                dict(json=[check("a"), check("b")], headers={"Sensu-Continue": "x"}),
+                dict(json=[check("c")]),
+            ],
+        )
+        client = NamespacedClient(
+            ApiKeyClient("https://my.url", "key"), Check, "default"
+        )
+
+        assert [c.name for c in client.list(stream=True)] == ["a", "b", "c"]
+
+    def test_page_is_read_from_connection(self, requests_mock):
+        mock = requests_mock.get("https://my.url/checks", json=[check("a")])
+        items = ResourceIter(
+            Check, ApiKeyClient("https://my.url", "key"), "/checks", stream=True
+        )
+
+        assert [c.name for c in items] == ["a"]
+        assert mock.last_request.stream is True
+
+    def test_cache_reads_whole_pages(self, requests_mock):
+        mock = requests_mock.get("https://my.url/checks", json=[check("a")])
+        items = ResourceIter(
+            Check,
+            ApiKeyClient("https://my.url", "key", cache=ResponseCache()),
+            "/checks",
+            stream=True,
+        )
+
+        assert [c.name for c in items] == ["a"]
+        assert mock.last_request.stream is False
+
+    def test_page_is_not_parsed_up_front(self, mocker, requests_mock):
+        requests_mock.get("https://my.url/checks", json=[check("a"), check("b")])
+        loads = mocker.spy(json, "loads")
+        items = iter(
+            ResourceIter(
+                Check, ApiKeyClient("https://my.url", "key"), "/checks", stream=True
+            )
+        )
+
+        assert next(items).name == "a"
+        assert next(items).name == "b"
+        loads.assert_not_called()
+
+    def test_stream_with_prefetch(self, requests_mock):
+        requests_mock.get(
+            "https://my.url/checks",
+            [
+                dict(json=[check("a")], headers={"Sensu-Continue": "x"}),
+                dict(json=[check("b")]),
+            ],
+        )
+        items = ResourceIter(
+            Check,
+            ApiKeyClient("https://my.url", "key"),
+            "/checks",
+            prefetch=1,
+            stream=True,
+        )
+
+        assert [c.name for c in items] == ["a", "b"]
+
+    def test_adaptive_page_size(self, mocker, requests_mock):
+        mock = requests_mock.get(
+            "https://my.url/checks",
+            [
+                dict(json=[check("a")], headers={"Sensu-Continue": "x"}),
+                dict(json=[check("b")]),
+            ],
+        )
+        page_size = AdaptivePageSize(initial=50)
+        adjust = mocker.patch.object(page_size, "adjust", return_value=20)
+        items = ResourceIter(
+            Check,
+            ApiKeyClient("https://my.url", "key"),
+            "/checks",
+            page_size=page_size,
+            stream=True,
+        )
+
+        assert [c.name for c in items] == ["a", "b"]
+        assert adjust.call_args[0][:2] == (50, 50)
+        assert mock.request_history[1].qs["limit"] == ["20"]
+
+    def test_invalid_json(self, requests_mock):
+        requests_mock.get("https://my.url/checks", text="[not json")
+        items = ResourceIter(
+            Check, ApiKeyClient("https://my.url", "key"), "/checks", stream=True
+        )
+
+        with pytest.raises(ResponseError):
+            list(items)
+
+
+class TestRawResourceIter:
+    def test_raw(self, mocker, requests_mock):
+        requests_mock.get(
+            "https://my.url/api/core/v2/namespaces/default/checks",
+            [
+                dict(json=[check("a")], headers={"Sensu-Continue": "x"}),
+                dict(json=[check("b")]),
+            ],
+        )
+        from_api = mocker.spy(Check, "from_api")
+        client = NamespacedClient(
+            ApiKeyClient("https://my.url", "key"), Check, "default"
+        )
+
+        items = client.list_raw()
+
+        assert isinstance(items, RawResourceIter)
+        assert list(items) == [check("a"), check("b")]
+        from_api.assert_not_called()
+
+    @pytest.mark.parametrize("stream", [False, True])
+    def test_fields(self, requests_mock, stream):
+        requests_mock.get(
+            "https://my.url/api/core/v2/namespaces/default/checks",
+            json=[check("a"), check("b")],
+        )
+        client = NamespacedClient(
+            ApiKeyClient("https://my.url", "key"), Check, "default"
+        )
+
+        items = client.list_raw(fields=["metadata.name"], stream=stream)
+
+        assert list(items) == [
+            dict(metadata=dict(name="a")),
+            dict(metadata=dict(name="b")),
+        ]
+
+    def test_cluster_client(self, requests_mock):
+        requests_mock.get(
+            "https://my.url/api/core/v2/users", json=[dict(username="a", groups=[])]
+        )
+        client = ClusterClient(ApiKeyClient("https://my.url", "key"), User)
+
+        assert list(client.list_raw(fields=["username"])) == [dict(username="a")]
+
+    def test_selectors(self, requests_mock):
+        mock = requests_mock.get("https://my.url/checks", json=[])
+
+        list(
+            RawResourceIter(
+                Check,
+                ApiKeyClient("https://my.url", "key"),
+                "/checks",
+                label_selector=Equal("team", "ops"),
+            )
+        )
+
+        assert mock.last_request.qs["labelselector"] == ['team == "ops"']
+
+    def test_invalid_fields(self):
+        with pytest.raises(ValueError):
+            RawResourceIter(
+                Check, ApiKeyClient("https://my.url", "key"), "/x", fields=[]
+            )
+
+
+def pages(requests_mock, *names, path="https://my.url/checks"):
+    responses = [dict(json=[check(n)], headers={"Sensu-Continue": n}) for n in names]
+    responses[-1]["headers"] = {}
+    return requests_mock.get(path, responses)
+
+
+class TestResourceIterHelpers:
+    def test_first(self, requests_mock):
+        mock = pages(requests_mock, "a", "b")
+        items = ResourceIter(Check, ApiKeyClient("https://my.url", "key"), "/checks")
+
+        assert items.first().name == "a"
+        assert mock.call_count == 1
+        assert mock.last_request.qs["limit"] == ["1"]
+
+    def test_first_empty(self, requests_mock):
+        requests_mock.get("https://my.url/checks", json=[])
+        items = ResourceIter(Check, ApiKeyClient("https://my.url", "key"), "/checks")
+
+        assert items.first() is None
+
+    def test_take(self, requests_mock):
+        mock = pages(requests_mock, "a", "b", "c", "d")
+        items = ResourceIter(
+            Check, ApiKeyClient("https://my.url", "key"), "/checks", page_size=2
+        )
+
+        taken = items.take(3)
+
+        assert isinstance(taken, ResourceList)
+        assert [c.name for c in taken] == ["a", "b", "c"]
+        assert mock.call_count == 3
+        assert [r.qs["limit"] for r in mock.request_history] == [["2"], ["2"], ["1"]]
+
+    def test_take_more_than_there_is(self, requests_mock):
+        pages(requests_mock, "a", "b")
+        items = ResourceIter(Check, ApiKeyClient("https://my.url", "key"), "/checks")
+
+        assert [c.name for c in items.take(5)] == ["a", "b"]
+
+    def test_take_with_stream_and_prefetch(self, requests_mock):
+        mock = pages(requests_mock, "a", "b", "c")
+        items = ResourceIter(
+            Check,
+            ApiKeyClient("https://my.url", "key"),
+            "/checks",
+            page_size=1,
+            prefetch=2,
+            stream=True,
+        )
+
+        assert [c.name for c in items.take(2)] == ["a", "b"]
+        assert mock.call_count == 2
+
+    def test_take_nothing(self, requests_mock):
+        mock = pages(requests_mock, "a")
+        items = ResourceIter(Check, ApiKeyClient("https://my.url", "key"), "/checks")
+
+        assert items.take(0) == []
+        assert mock.call_count == 0
+        with pytest.raises(ValueError):
+            items.take(-1)
+
+    @pytest.mark.parametrize("stream", [False, True])
+    def test_count(self, mocker, requests_mock, stream):
+        pages(requests_mock, "a", "b", "c")
+        from_api = mocker.spy(Check, "from_api")
+        items = ResourceIter(
+            Check, ApiKeyClient("https://my.url", "key"), "/checks", stream=stream
+        )
+
+        assert items.count() == 3
+        from_api.assert_not_called()
+
+    def test_materialize(self, requests_mock):
+        mock = pages(requests_mock, "a", "b")
+        items = ResourceIter(Check, ApiKeyClient("https://my.url", "key"), "/checks")
+
+        resources = items.materialize()
+
+        assert len(resources) == 2
+        assert [c.name for c in resources] == ["a", "b"]
+        assert [c.name for c in resources] == ["a", "b"]
+        assert mock.call_count == 2
+
+    def test_materialized_delete(self, requests_mock):
+        mock = pages(
+            requests_mock,
+            "a",
+            "b",
+            path="https://my.url/api/core/v2/namespaces/default/checks",
+        )
+        delete = requests_mock.delete(
+            "https://my.url/api/core/v2/namespaces/default/checks/a", status_code=204
+        )
+        requests_mock.delete(
+            "https://my.url/api/core/v2/namespaces/default/checks/b", status_code=204
+        )
+        client = NamespacedClient(
+            ApiKeyClient("https://my.url", "key"), Check, "default"
+        )
+
+        resources = client.list().materialize()
+        resources.delete()
+
+        assert delete.call_count == 1
+        assert mock.call_count == 2
+
+
+class TestResourceIterCheckpoint:
+    def test_checkpoint_follows_iteration(self, requests_mock):
+        requests_mock.get(
+            "https://my.url/checks",
+            [
+                dict(json=[check("a"), check("b")], headers={"Sensu-Continue": "x"}),
+                dict(json=[check("c")]),
+            ],
+        )
+        resources = ResourceIter(
+            Check,
+            ApiKeyClient("https://my.url", "key"),
+            "/checks",
+            label_selector=Equal("team", "ops"),
+            page_size=2,
+        )
+        items = iter(resources)
+
+        assert resources.checkpoint == Checkpoint("/checks", 2, 'team == "ops"')
+        next(items)
+        assert resources.checkpoint.token == ""
+        assert resources.checkpoint.offset == 1
+        next(items)
+        next(items)
+        assert resources.checkpoint.token == "x"
+        assert resources.checkpoint.offset == 1
+        assert not resources.checkpoint.complete
+        assert list(items) == []
+        assert resources.checkpoint.complete
+
+    def test_resume(self, requests_mock):
+        path = "https://my.url/api/core/v2/namespaces/default/checks"
+        mock = requests_mock.get(
+            path,
+            [
+                dict(json=[check("a"), check("b")], headers={"Sensu-Continue": "x"}),
+                dict(json=[check("c"), check("d")], headers={"Sensu-Continue": "y"}),
+            ],
+        )
+        client = NamespacedClient(
+            ApiKeyClient("https://my.url", "key"), Check, "default"
+        )
+        checks = client.list(label_selector=Equal("team", "ops"), page_size=2)
+        items = iter(checks)
+        for _ in range(3):
+            next(items)
+        data = json.dumps(checks.checkpoint.as_dict())
+        mock = requests_mock.get(
+            path, [dict(json=[check("c"), check("d")]), dict(json=[])]
+        )
+
+        resumed = client.resume(Checkpoint.from_dict(json.loads(data)))
+
+        assert [c.name for c in resumed] == ["d"]
+        assert mock.call_count == 1
+        assert mock.last_request.qs == {
+            "continue": ["x"],
+            "labelselector": ['team == "ops"'],
+            "limit": ["2"],
+        }
+
+    def test_resume_complete(self, requests_mock):
+        mock = requests_mock.get("https://my.url/checks", json=[check("a")])
+        checkpoint = Checkpoint("/checks", 100, complete=True)
+        items = ResourceIter.from_checkpoint(
+            Check, ApiKeyClient("https://my.url", "key"), checkpoint
+        )
+
+        assert list(items) == []
+        assert mock.call_count == 0
+
+    def test_take_after_resume(self, requests_mock):
+        mock = requests_mock.get(
+            "https://my.url/checks",
+            json=[check("a"), check("b"), check("c")],
+            headers={"Sensu-Continue": "y"},
+        )
+        checkpoint = Checkpoint("/checks", 10, token="x", offset=1)
+        items = ResourceIter.from_checkpoint(
+            Check, ApiKeyClient("https://my.url", "key"), checkpoint
+        )
+
+        assert [c.name for c in items.take(2)] == ["b", "c"]
+        assert mock.last_request.qs["limit"] == ["3"]
+
+    @pytest.mark.parametrize("stream", [False, True])
+    def test_page_retry(self, requests_mock, stream):
+        mock = requests_mock.get(
+            "https://my.url/checks",
+            [
+                dict(json=[check("a"), check("b")], headers={"Sensu-Continue": "x"}),
+                dict(status_code=503),
+                dict(
+                    text=json.dumps([check("c")])[:-1] + ", broken",
+                    headers={"Sensu-Continue": "y"},
+                ),
+                dict(json=[check("c"), check("d")], headers={"Sensu-Continue": "y"}),
+                dict(json=[check("e")]),
+            ],
+        )
+        items = ResourceIter(
+            Check,
+            ApiKeyClient("https://my.url", "key"),
+            "/checks",
+            page_size=2,
+            stream=stream,
+            page_retry=RetryPolicy(total=2, backoff_factor=0),
+        )
+
+        # Streamed c comes in before the broken part of the page, but we do not
+        # get it twice.
+        assert [c.name for c in items] == ["a", "b", "c", "d", "e"]
+        assert [r.qs.get("continue") for r in mock.request_history] == [
+            None,
+            ["x"],
+            ["x"],
+            ["x"],
+            ["y"],
+        ]
+
+    def test_page_retry_broken_connection(self, requests_mock):
+        mock = requests_mock.get(
+            "https://my.url/checks",
+            [
+                dict(json=[check("a"), check("b")], headers={"Sensu-Continue": "x"}),
+                dict(exc=requests.exceptions.ChunkedEncodingError),
+                dict(json=[check("c")]),
+            ],
+        )
+        items = ResourceIter(
+            Check,
+            ApiKeyClient("https://my.url", "key"),
+            "/checks",
+            page_size=2,
+            page_retry=RetryPolicy(total=2, backoff_factor=0),
+        )
+
+        assert [c.name for c in items] == ["a", "b", "c"]
+        assert [r.qs.get("continue") for r in mock.request_history] == [
+            None,
+            ["x"],
+            ["x"],
+        ]
+
+    def test_page_retry_gives_up(self, requests_mock):
+        requests_mock.get(
+            "https://my.url/checks",
+            [
+                dict(json=[check("a")], headers={"Sensu-Continue": "x"}),
+                dict(status_code=503),
+                dict(status_code=503),
+            ],
+        )
+        items = iter(
+            ResourceIter(
+                Check,
+                ApiKeyClient("https://my.url", "key"),
+                "/checks",
+                page_retry=RetryPolicy(total=1, backoff_factor=0),
+            )
+        )
+
+        assert next(items).name == "a"
+        with pytest.raises(ResponseError):
+            next(items)
+
+    def test_no_page_retry_by_default(self, requests_mock):
+        mock = requests_mock.get("https://my.url/checks", status_code=503)
+        items = ResourceIter(Check, ApiKeyClient("https://my.url", "key"), "/checks")
+
+        with pytest.raises(ResponseError):
+            list(items)
+        assert mock.call_count == 1
+
+
+class TestResourceClientCache:
+    def test_resources_do_not_modify_cache(self, requests_mock):
+        data = dict(
+            metadata=dict(name="c", namespace="default", labels=dict(a="b")),
+            command="c",
+            subscriptions=["s"],
+        )
+        requests_mock.get(
+            "https://my.url/api/core/v2/namespaces/default/checks/c",
+            [dict(json=data, headers={"ETag": '"v1"'}), dict(status_code=304)],
+        )
+        client = NamespacedClient(
+            ApiKeyClient("https://my.url", "key", cache=ResponseCache()),
+            Check,
+            "default",
+        )
+
+        local = client.get("c")
+        local.metadata["labels"]["a"] = "local edit"
+        local.spec["subscriptions"].append("oops")
+        fresh = client.get("c")
+
+        assert fresh.metadata["labels"] == dict(a="b")
+        assert fresh.spec["subscriptions"] == ["s"]
+
+
+class TestNamespacedClientTimeout:
+    def test_create_timeout_covers_all_requests(self, mocker, requests_mock):
+        monotonic = mocker.patch("time.monotonic", return_value=100.0)
+        path = "https://my.url/api/core/v2/namespaces/default/checks/a"
+
+        def put(request, context):
+            monotonic.return_value = 111.0
+            return None
+
+        requests_mock.get(path, status_code=404)
+        put_mock = requests_mock.put(path, status_code=201, json=put)
+        client = NamespacedClient(
+            ApiKeyClient("https://my.url", "key"), Check, "default"
+        )
+
+        with pytest.raises(RequestTimeoutError):
+            client.create(dict(command="c"), dict(name="a"), timeout=10)
+        assert put_mock.call_count == 1
+
+
+class TestSpans:
+    def test_create(self, requests_mock):
+        path = "https://my.url/api/core/v2/namespaces/default/checks/a"
+        requests_mock.get(path, [dict(status_code=404), dict(json=check("a"))])
+        requests_mock.put(path, status_code=201)
+        requests_mock.get(
+            "https://my.url/api/core/v2/namespaces/default/checks",
+            json=[check("a")],
+        )
+        collector = MetricsCollector()
+        client = NamespacedClient(
+            ApiKeyClient("https://my.url", "key", request_hooks=[collector]),
+            Check,
+            "default",
+        )
+
+        client.create(dict(command="c"), dict(name="a"))
+        list(client.list())
+
+        spans = collector.as_dict()["spans"]
+        assert {name: s["latency"]["count"] for name, s in spans.items()} == {
+            "Resource.reload": 1,
+            "Resource.save": 1,
+            "ResourceClient.create": 1,
+            "ResourceIter.page": 1,
+        }
+
+
+class TestAsyncResourceIter:
+    def test_pagination(self):
+        pages = {
+            "": ([check("a"), check("b")], "next"),
+            "next": ([check("c")], ""),
+        }
+        queries = []
+
+        def handler(request):
+            queries.append(dict(request.url.params))
+            data, cont = pages[request.url.params.get("continue", "")]
+            return httpx.Response(200, json=data, headers={"Sensu-Continue": cont})
+
+        client = async_client(handler)
+        it = AsyncResourceIter(
+            Check,
+            client,
+            "/api/core/v2/namespaces/default/checks",
+            field_selector=Equal("name", "a"),
+        )
+
+        async def collect():
+            return [c.name async for c in it]
+
+        assert ["a", "b", "c"] == asyncio.run(collect())
+        assert queries == [
+            {"limit": "100", "fieldSelector": 'check.name == "a"'},
+            {"limit": "100", "fieldSelector": 'check.name == "a"', "continue": "next"},
+        ]
+
+    def test_bad_status(self):
+        client = async_client(lambda request: httpx.Response(500))
+        it = AsyncResourceIter(Check, client, "/path")
+
+        async def collect():
+            return [c async for c in it]
+
+        with pytest.raises(ResponseError, match="Expected 200"):
+            asyncio.run(collect())
+
+
+class TestAsyncNamespacedClient:
+    def test_create(self):
+        requests = []
+
+        def handler(request):
+            requests.append((request.method, request.url.path))
+            if request.method == "GET" and len(requests) == 1:
+                return httpx.Response(404)
+            if request.method == "PUT":
+                return httpx.Response(201)
+            return httpx.Response(200, json=dict(check("a"), interval=10))
+
+        client = AsyncNamespacedClient(async_client(handler), Check, "default")
+
+        resource = asyncio.run(
+            client.create(spec=dict(command="c"), metadata=dict(name="a"))
+        )
+
+        assert resource.spec["interval"] == 10
+        assert requests == [
+            ("GET", "/api/core/v2/namespaces/default/checks/a"),
+            ("PUT", "/api/core/v2/namespaces/default/checks/a"),
+            ("GET", "/api/core/v2/namespaces/default/checks/a"),
+        ]
+
+    def test_sync_methods_are_rejected(self):
+        client = async_client(lambda request: httpx.Response(200, json=check("a")))
+        resource = asyncio.run(AsyncNamespacedClient(client, Check, "default").get("a"))
+
+        with pytest.raises(TypeError, match="asynchronous"):
+            resource.save()